@@ -0,0 +1,46 @@
+from datetime import date
+from fastapi import APIRouter, Depends, Query, HTTPException, status
+
+from app.models.users import Principal, current_principal
+from app.patterns.business_objects.analytics_bo import AnalyticsBO
+from app.schemas.analytics_schemas import InstructorDashboardRead, RollupRebuildRead
+
+analytics_router = APIRouter(prefix="/analytics", tags=["analytics"])
+"""APIRouter: Router for analytics endpoints."""
+
+
+@analytics_router.get("/instructor", response_model=InstructorDashboardRead)
+async def get_instructor_dashboard(
+    start: date | None = Query(None, description="First day of the period; defaults to 29 days before `end`"),
+    end: date | None = Query(None, description="Last day of the period; defaults to today"),
+    course_id: int | None = Query(None, description="Restrict the dashboard to one course"),
+    bo: AnalyticsBO = Depends(AnalyticsBO.from_depends),
+    current_user: Principal = Depends(current_principal()),
+):
+    """Instructor gets the revenue and enrollments of their courses, per day and payment type."""
+    if not current_user.is_instructor:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only instructors can view the analytics dashboard."
+        )
+    return await bo.get_instructor_dashboard(
+        instructor_id=current_user.id,
+        start=start,
+        end=end,
+        course_id=course_id
+    )
+
+
+@analytics_router.post("/rollups/rebuild", response_model=RollupRebuildRead)
+async def rebuild_rollups(
+    course_id: int | None = Query(None, description="Rebuild only this course; rebuilds every course if omitted"),
+    bo: AnalyticsBO = Depends(AnalyticsBO.from_depends),
+    current_user: Principal = Depends(current_principal()),
+):
+    """Rebuild the daily rollups from the payments table (superuser only)."""
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only superusers can rebuild the analytics rollups."
+        )
+    return await bo.rebuild_rollups(course_id=course_id)
@@ -1,6 +1,6 @@
 from fastapi import Query, Depends, APIRouter, HTTPException, status
 
-from app.models.users import User, fastapi_users
+from app.models.users import Principal, current_principal
 from app.patterns.business_objects.courses_bo import CourseBO
 from app.patterns.business_objects.students_bo import StudentBO
 from app.schemas.response_schemas import PaginatedResponse
@@ -12,7 +12,8 @@ from app.schemas.course_schemas import (
     LessonCreate,
     LessonRead,
     LessonReadPartial,
-    LessonProgressionRead
+    LessonProgressionRead,
+    CourseStatisticsRead
 )
 
 courses_router = APIRouter(prefix="/courses", tags=["courses"])
@@ -23,7 +24,7 @@ courses_router = APIRouter(prefix="/courses", tags=["courses"])
 async def create_course(
     course_data: CourseCreate,
     bo: CourseBO = Depends(CourseBO.from_depends),
-    current_user: User = Depends(fastapi_users.current_user()),
+    current_user: Principal = Depends(current_principal()),
 ):
     """Create a new course with the provided data."""
     if not current_user.is_instructor:
@@ -40,7 +41,7 @@ async def create_course(
 @courses_router.get("/", response_model=PaginatedResponse[CourseReadPartial])
 async def get_all_courses(
     bo: CourseBO = Depends(CourseBO.from_depends),
-    current_user: User = Depends(fastapi_users.current_user()), # noqa
+    current_user: Principal = Depends(current_principal()), # noqa
     page: int = Query(1, ge=1),
     per_page: int = Query(10, le=100),
 ):
@@ -62,18 +63,38 @@ async def get_all_courses(
 async def get_course_by_id(
     course_id: int,
     bo: CourseBO = Depends(CourseBO.from_depends),
-    current_user: User = Depends(fastapi_users.current_user()),  # noqa
+    current_user: Principal = Depends(current_principal()),  # noqa
 ):
     """Get the structure of a course by its ID."""
     return await bo.get_course_by_id(course_id=course_id)
 
 
+@courses_router.get("/{course_id}/statistics", response_model=CourseStatisticsRead)
+async def get_course_statistics(
+    course_id: int,
+    offset: int = Query(0, ge=0, description="Offset of the per-student list"),
+    limit: int = Query(100, ge=1, le=1000, description="Length of the per-student list"),
+    bins: int = Query(10, ge=1, le=100, description="Number of histogram bins"),
+    bo: CourseBO = Depends(CourseBO.from_depends),
+    current_user: Principal = Depends(current_principal()),
+):
+    """Get the completion statistics of a course (its instructor or a superuser)."""
+    return await bo.get_course_statistics(
+        course_id=course_id,
+        requester_id=current_user.id,
+        is_superuser=current_user.is_superuser,
+        offset=offset,
+        limit=limit,
+        bins=bins
+    )
+
+
 @courses_router.patch("/{course_id}", response_model=CourseReadPartial)
 async def update_course(
     course_id: int,
     course_data: CourseUpdate,
     bo: CourseBO = Depends(CourseBO.from_depends),
-    current_user: User = Depends(fastapi_users.current_user()),
+    current_user: Principal = Depends(current_principal()),
 ):
     """Update a course with the given data."""
     if not current_user.is_instructor:
@@ -92,7 +113,7 @@ async def update_course(
 async def delete_course(
     course_id: int,
     bo: CourseBO = Depends(CourseBO.from_depends),
-    current_user: User = Depends(fastapi_users.current_user()),
+    current_user: Principal = Depends(current_principal()),
 ):
     """Delete a course by its ID."""
     if not current_user.is_instructor:
@@ -108,7 +129,7 @@ async def create_lesson(
     course_id: int,
     lesson_data: LessonCreate,
     bo: CourseBO = Depends(CourseBO.from_depends),
-    current_user: User = Depends(fastapi_users.current_user()),
+    current_user: Principal = Depends(current_principal()),
 ):
     """Add a new lesson to a course."""
     if not current_user.is_instructor:
@@ -129,7 +150,7 @@ async def get_lesson_by_id(
     lesson_id: int,
     course_bo: CourseBO = Depends(CourseBO.from_depends),
     student_bo: StudentBO = Depends(StudentBO.from_depends),
-    current_user: User = Depends(fastapi_users.current_user()), # noqa
+    current_user: Principal = Depends(current_principal()), # noqa
 ):
     """Get a lesson by its ID."""
     if current_user.is_student:
@@ -153,7 +174,7 @@ async def delete_lesson(
     course_id: int,
     lesson_id: int,
     bo: CourseBO = Depends(CourseBO.from_depends),
-    current_user: User = Depends(fastapi_users.current_user()),
+    current_user: Principal = Depends(current_principal()),
 ):
     """Delete a lesson from a course."""
     if not current_user.is_instructor:
@@ -175,7 +196,7 @@ async def clone_lesson(
     new_course_id: int,
     new_prerequisite_id: int | None = None,
     bo: CourseBO = Depends(CourseBO.from_depends),
-    current_user: User = Depends(fastapi_users.current_user()),
+    current_user: Principal = Depends(current_principal()),
 ):
     """Clone a lesson within a course."""
     if not current_user.is_instructor:
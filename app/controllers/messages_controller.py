@@ -1,8 +1,8 @@
 from typing import List
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, HTTPException, status
 
-from app.models.users import User, fastapi_users
-from app.schemas.message_schemas import MessageCreate, MessageRead
+from app.models.users import Principal, current_principal
+from app.schemas.message_schemas import MessageCreate, MessageRead, MessageArchiveRead
 from app.patterns.business_objects.messages_bo import MessageBO
 
 messages_router = APIRouter(prefix="/messages", tags=["Messages"])
@@ -11,7 +11,7 @@ messages_router = APIRouter(prefix="/messages", tags=["Messages"])
 @messages_router.post("/", response_model=MessageRead, status_code=status.HTTP_201_CREATED)
 async def send_message(
     message_data: MessageCreate,
-    current_user: User = Depends(fastapi_users.current_user()),
+    current_user: Principal = Depends(current_principal()),
     message_bo: MessageBO = Depends(MessageBO.from_depends),
 ):
     """Sends a message to the course chat."""
@@ -24,11 +24,33 @@ async def send_message(
 @messages_router.get("/course/{course_id}", response_model=List[MessageRead])
 async def get_messages(
     course_id: int,
-    current_user: User = Depends(fastapi_users.current_user()),
+    before_id: int | None = Query(None, description="Return only messages older than this message ID"),
+    limit: int = Query(50, ge=1, le=200),
+    current_user: Principal = Depends(current_principal()),
     message_bo: MessageBO = Depends(MessageBO.from_depends),
 ):
-    """Retrieves all messages from a course chat."""
+    """
+    Retrieves a page of messages from a course chat, in chronological order.
+    Use the ID of the oldest message returned as `before_id` to load the previous page.
+    """
     return await message_bo.get_messages(
             course_id=course_id,
-            user_id=current_user.id
+            user_id=current_user.id,
+            before_id=before_id,
+            limit=limit
     )
+
+
+@messages_router.post("/archive", response_model=MessageArchiveRead)
+async def archive_messages(
+    older_than_days: int | None = Query(None, ge=0),
+    current_user: Principal = Depends(current_principal()),
+    message_bo: MessageBO = Depends(MessageBO.from_depends),
+):
+    """Moves old chat messages into the archive table (superusers only)."""
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have permission to access this resource."
+        )
+    return await message_bo.archive_messages(older_than_days=older_than_days)
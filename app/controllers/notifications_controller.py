@@ -0,0 +1,75 @@
+from typing import List
+from fastapi import APIRouter, Depends, Query, HTTPException, status
+
+from app.models.users import Principal, current_principal
+from app.patterns.business_objects.notifications_bo import NotificationBO
+from app.schemas.notification_schemas import (
+    NotificationJobRead,
+    InboxNotificationRead,
+    NotificationCounterRead,
+    DispatchMetricsRead,
+)
+
+notifications_router = APIRouter(prefix="/notifications", tags=["notifications"])
+"""APIRouter: Router for notification-related endpoints."""
+
+
+@notifications_router.get("/", response_model=List[InboxNotificationRead])
+async def get_inbox(
+    before_id: int | None = Query(None, description="Return only notifications older than this ID"),
+    limit: int = Query(50, ge=1, le=200),
+    bo: NotificationBO = Depends(NotificationBO.from_depends),
+    current_user: Principal = Depends(current_principal()),
+):
+    """Get a page of the current user's inbox, newest first."""
+    return await bo.get_inbox(
+        user_id=current_user.id,
+        before_id=before_id,
+        limit=limit
+    )
+
+
+@notifications_router.get("/unread-count", response_model=NotificationCounterRead)
+async def get_unread_count(
+    bo: NotificationBO = Depends(NotificationBO.from_depends),
+    current_user: Principal = Depends(current_principal()),
+):
+    """Get the number of unread notifications of the current user."""
+    return await bo.get_unread_count(user_id=current_user.id)
+
+
+@notifications_router.post("/read", response_model=NotificationCounterRead)
+async def mark_notifications_read(
+    up_to_id: int = Query(..., ge=1, description="Mark every notification up to this ID as read"),
+    bo: NotificationBO = Depends(NotificationBO.from_depends),
+    current_user: Principal = Depends(current_principal()),
+):
+    """Mark the current user's notifications as read, up to the given ID."""
+    return await bo.mark_read(user_id=current_user.id, up_to_id=up_to_id)
+
+
+@notifications_router.get("/jobs/{job_id}", response_model=NotificationJobRead)
+async def get_notification_job(
+    job_id: int,
+    bo: NotificationBO = Depends(NotificationBO.from_depends),
+    current_user: Principal = Depends(current_principal()),
+):
+    """Get the delivery status of a notification job."""
+    return await bo.get_job(
+        job_id=job_id,
+        user_id=current_user.id,
+        is_superuser=current_user.is_superuser
+    )
+
+
+@notifications_router.get("/metrics", response_model=DispatchMetricsRead)
+async def get_dispatch_metrics(
+    current_user: Principal = Depends(current_principal()),
+):
+    """Get the notification dispatch metrics of this worker process (superusers only)."""
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have permission to access this resource."
+        )
+    return NotificationBO.get_dispatch_metrics()
@@ -1,10 +1,17 @@
-from fastapi import Query, Depends, APIRouter, HTTPException, status
+from typing import List
+from datetime import date
+from fastapi import Query, Header, Depends, APIRouter, HTTPException, status
 
-from app.models.users import User, fastapi_users
+from app.models.users import Principal, current_principal
 from app.patterns.business_objects.payments_bo import PaymentBO
+from app.patterns.business_objects.installments_bo import InstallmentBO
+from app.workers.settlement_worker import settlement_job
 from app.schemas.response_schemas import PaginatedResponse
 from app.schemas.course_schemas import CourseReadPartial
-from app.schemas.payment_schemas import PaymentCreate, PaymentRead
+from app.schemas.payment_schemas import (
+    PaymentCreate, PaymentRead, CourseQuoteRead, BulkEnrollmentCreate, BulkEnrollmentRead,
+    InstallmentRead, SettlementRunRead
+)
 
 
 payments_router = APIRouter(prefix="/payments", tags=["payments"])
@@ -15,7 +22,12 @@ payments_router = APIRouter(prefix="/payments", tags=["payments"])
 async def create_payment(
     course_id: int,
     payment_data: PaymentCreate,
-    current_user: User = Depends(fastapi_users.current_user()),
+    idempotency_key: str | None = Header(
+        None,
+        max_length=255,
+        description="Client-generated key; retries with the same key get the original response"
+    ),
+    current_user: Principal = Depends(current_principal()),
     bo: PaymentBO = Depends(PaymentBO.from_depends)
 ):
     """Create a new payment with the provided data."""
@@ -28,13 +40,75 @@ async def create_payment(
         payment_data=payment_data,
         user_id=current_user.id,
         course_id=course_id,
+        idempotency_key=idempotency_key,
     )
 
 
+@payments_router.post("/course/{course_id}/bulk", response_model=BulkEnrollmentRead)
+async def bulk_enroll(
+    course_id: int,
+    enrollment_data: BulkEnrollmentCreate,
+    current_user: Principal = Depends(current_principal()),
+    bo: PaymentBO = Depends(PaymentBO.from_depends)
+):
+    """
+    Enroll many users in a course at once (course instructor or superuser only).
+    Returns the outcome of every row; rows that cannot be enrolled are reported, not rejected.
+    """
+    return await bo.bulk_enroll(
+        course_id=course_id,
+        enrollment_data=enrollment_data,
+        requester_id=current_user.id,
+        is_superuser=current_user.is_superuser,
+    )
+
+
+@payments_router.get("/quote/{course_id}", response_model=CourseQuoteRead)
+async def get_payment_quotes(
+    course_id: int,
+    bo: PaymentBO = Depends(PaymentBO.from_depends),
+    current_user: Principal = Depends(current_principal()),
+):
+    """Get the amount and installments of every payment method for a course."""
+    return await bo.get_quotes(course_id=course_id)
+
+
+@payments_router.post("/installments/settle", response_model=SettlementRunRead, status_code=status.HTTP_202_ACCEPTED)
+async def settle_installments(
+    as_of: date | None = Query(None, description="Settle installments due up to this date; defaults to today"),
+    current_user: Principal = Depends(current_principal()),
+):
+    """
+    Start the batch settlement of due installments in the background (superuser only).
+    An unfinished run is resumed from its checkpoint instead of starting a new one.
+    """
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only superusers can settle installments."
+        )
+    return await settlement_job.start(as_of or date.today())
+
+
+@payments_router.get("/installments/settlements/{run_id}", response_model=SettlementRunRead)
+async def get_settlement_run(
+    run_id: int,
+    bo: InstallmentBO = Depends(InstallmentBO.from_depends),
+    current_user: Principal = Depends(current_principal()),
+):
+    """Get the progress of a settlement run (superuser only)."""
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only superusers can view settlement runs."
+        )
+    return await bo.get_settlement_run(run_id=run_id)
+
+
 @payments_router.get("/", response_model=PaginatedResponse[PaymentRead[CourseReadPartial]])
 async def get_all_payments(
     bo: PaymentBO = Depends(PaymentBO.from_depends),
-    current_user: User = Depends(fastapi_users.current_user()),
+    current_user: Principal = Depends(current_principal()),
     page: int = Query(1, ge=1),
     per_page: int = Query(10, le=100),
 ):
@@ -57,10 +131,20 @@ async def get_all_payments(
 async def get_payment_by_id(
     payment_id: int,
     bo: PaymentBO = Depends(PaymentBO.from_depends),
-    current_user: User = Depends(fastapi_users.current_user()),
+    current_user: Principal = Depends(current_principal()),
 ):
     """Get a payment by its ID."""
     return await bo.get_payment_by_id(
         payment_id=payment_id,
         user_id=current_user.id
     )
+
+
+@payments_router.get("/{payment_id}/installments", response_model=List[InstallmentRead])
+async def get_payment_installments(
+    payment_id: int,
+    bo: InstallmentBO = Depends(InstallmentBO.from_depends),
+    current_user: Principal = Depends(current_principal()),
+):
+    """Get the installment schedule of one of the current user's payments."""
+    return await bo.get_payment_installments(payment_id=payment_id, user_id=current_user.id)
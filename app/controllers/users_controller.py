@@ -1,10 +1,17 @@
+import asyncio
+from typing import List, Literal
 from fastapi import APIRouter, Depends, Query, HTTPException, status
+from fastapi.responses import PlainTextResponse
 
-from app.models.users import User, UserManager, get_user_manager, fastapi_users
-from app.schemas.response_schemas import PaginatedResponse
+from app.models.users import UserManager, UserTypeEnum, get_user_manager, Principal, current_principal
+from app.schemas.response_schemas import PaginatedResponse, CacheStatsRead, LoginStatsRead
 from app.schemas.user_schemas import UserRead
 from app.schemas.course_schemas import CourseReadPartial, LessonProgressionRead
 from app.patterns.business_objects.students_bo import StudentBO
+from app.utils.cache import cache_stats
+from app.utils.hashing import password_hash_pool, login_limiter
+from app.utils.exceptions import ConflictError
+from app.utils.profiler import SamplingProfiler, profiler_lock, PROFILER_MAX_SECONDS, PROFILER_INTERVAL_MS
 
 users_router = APIRouter(prefix="/users", tags=["users"])
 """APIRouter: Router for user-related endpoints."""
@@ -14,36 +21,106 @@ users_router = APIRouter(prefix="/users", tags=["users"])
 @users_router.get("/", response_model=PaginatedResponse[UserRead])
 async def list_all_users(
         page: int = Query(1, ge=1),
-        per_page: int = Query(10, le=100),
-        user_type: str = Query(None),
+        per_page: int = Query(10, ge=1, le=100),
+        user_type: UserTypeEnum | None = Query(None),
+        q: str | None = Query(None, min_length=1, max_length=100, description="Prefix of the email, first or last name"),
+        is_active: bool | None = Query(None),
+        after_id: int | None = Query(None, ge=0, description="Return users after this ID (keyset pagination); overrides `page`"),
         user_manager: UserManager = Depends(get_user_manager),
-        current_user: User = Depends(fastapi_users.current_user()),
+        current_user: Principal = Depends(current_principal()),
 ):
-    """List all users with pagination and optional user type filter."""
-    offset = (page - 1) * per_page
-
+    """
+    Search users with filters (superuser only). Pass the returned `next_after_id` as `after_id`
+    to page through large results at constant cost; `total` comes from a short-lived count cache.
+    """
     if not current_user.is_superuser:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You do not have permission to access this resource."
         )
 
-    users = await user_manager.get_all(
-        offset=offset,
-        limit=per_page,
-        user_type=user_type
+    users = await user_manager.search_users(
+        query=q,
+        user_type=user_type,
+        is_active=is_active,
+        after_id=after_id,
+        offset=(page - 1) * per_page,
+        limit=per_page
     )
+    total = await user_manager.count_users(query=q, user_type=user_type, is_active=is_active)
     return PaginatedResponse(
         items=users,
-        total=len(users),
+        total=total,
         page=page,
-        per_page=per_page
+        per_page=per_page,
+        next_after_id=users[-1]["id"] if len(users) == per_page else None
+    )
+
+
+@users_router.get("/metrics/caches", response_model=List[CacheStatsRead])
+async def get_cache_stats(
+        current_user: Principal = Depends(current_principal()),
+):
+    """Get the hit ratio and size of the worker's caches, including the principal cache (superuser only)."""
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have permission to access this resource."
+        )
+    return cache_stats()
+
+
+@users_router.get("/metrics/logins", response_model=LoginStatsRead)
+async def get_login_stats(
+        current_user: Principal = Depends(current_principal()),
+):
+    """Get the password hashing pool's queue depth and the login route's load (superuser only)."""
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have permission to access this resource."
+        )
+    return LoginStatsRead(hashing=password_hash_pool.stats(), logins=login_limiter.stats())
+
+
+@users_router.get("/metrics/profile", response_class=PlainTextResponse)
+async def profile_worker(
+        seconds: float = Query(5, gt=0, le=PROFILER_MAX_SECONDS, description="How long to sample for"),
+        mode: Literal["cpu", "wall"] = Query(
+            "wall", description="`cpu` samples the event loop thread, `wall` samples every asyncio task"
+        ),
+        interval_ms: float = Query(PROFILER_INTERVAL_MS, ge=PROFILER_INTERVAL_MS, le=1000),
+        current_user: Principal = Depends(current_principal()),
+):
+    """
+    Profile the worker serving this request for a few seconds and get a collapsed stack file,
+    ready for flamegraph.pl or speedscope (superuser only). Only one profile runs per worker at a time.
+    """
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have permission to access this resource."
+        )
+    if profiler_lock.locked():
+        raise ConflictError("A profile is already running on this worker.")
+
+    async with profiler_lock:
+        profiler = SamplingProfiler(
+            asyncio.get_running_loop(), mode=mode, interval=interval_ms / 1000, exclude=asyncio.current_task()
+        )
+        stacks = await profiler.profile(seconds)
+    return PlainTextResponse(
+        stacks,
+        headers={
+            "Content-Disposition": f'attachment; filename="profile-{mode}.collapsed"',
+            "X-Profile-Samples": str(profiler.samples),
+        }
     )
 
 
 @users_router.get("/my-courses", response_model=PaginatedResponse[CourseReadPartial])
 async def get_my_courses(
-        current_user: User = Depends(fastapi_users.current_user()),
+        current_user: Principal = Depends(current_principal()),
         student_bo: StudentBO = Depends(StudentBO.from_depends),
         page: int = Query(1, ge=1),
         per_page: int = Query(10, le=100),
@@ -72,7 +149,7 @@ async def get_my_courses(
 @users_router.get("/my-course-progression/{course_id}", response_model=PaginatedResponse[LessonProgressionRead])
 async def get_course_progression(
         course_id: int,
-        current_user: User = Depends(fastapi_users.current_user()),
+        current_user: Principal = Depends(current_principal()),
         student_bo: StudentBO = Depends(StudentBO.from_depends),
         page: int = Query(1, ge=1),
         per_page: int = Query(10, le=100),
@@ -105,7 +182,7 @@ async def mark_lesson_completed(
     course_id: int,
     lesson_id: int,
     bo: StudentBO = Depends(StudentBO.from_depends),
-    current_user: User = Depends(fastapi_users.current_user()),
+    current_user: Principal = Depends(current_principal()),
 ):
     """Mark a lesson as completed for the current student."""
     if not current_user.is_student:
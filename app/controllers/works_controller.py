@@ -1,11 +1,13 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Literal
+from fastapi import APIRouter, Depends, Query, HTTPException, status
+from fastapi.responses import StreamingResponse
 
-from app.models.users import User, fastapi_users
+from app.models.users import Principal, current_principal
 from app.patterns.business_objects.works_bo import WorkBO
 from app.schemas.work_schemas import (
     WorkCreate, WorkRead, WorkAnswerCreate, WorkAnswerRead,
-    WorkWithNotifications, WorkAnswerWithNotifications
+    WorkWithNotifications, WorkAnswerWithNotifications,
+    GradeRequest, GradingResultRead, WorkAnswerRevisionRead, WorkAnswerRevisionContentRead
 )
 
 works_router = APIRouter(prefix="/works", tags=["works"])
@@ -15,7 +17,7 @@ works_router = APIRouter(prefix="/works", tags=["works"])
 async def create_work(
     work_data: WorkCreate,
     bo: WorkBO = Depends(WorkBO.from_depends),
-    current_user: User = Depends(fastapi_users.current_user()),
+    current_user: Principal = Depends(current_principal()),
 ):
     """Instructor creates a new work for a course (with student notifications)."""
     if not current_user.is_instructor:
@@ -30,7 +32,7 @@ async def create_work(
 async def delete_work(
     work_id: int,
     bo: WorkBO = Depends(WorkBO.from_depends),
-    current_user: User = Depends(fastapi_users.current_user()),
+    current_user: Principal = Depends(current_principal()),
 ):
     """Instructor deletes a work."""
     if not current_user.is_instructor:
@@ -45,7 +47,7 @@ async def delete_work(
 async def list_works_by_course(
     course_id: int,
     bo: WorkBO = Depends(WorkBO.from_depends),
-    current_user: User = Depends(fastapi_users.current_user()),
+    current_user: Principal = Depends(current_principal()),
 ):
     """
     Lists all works of a course.
@@ -76,16 +78,19 @@ async def list_works_by_course(
 @works_router.get("/{work_id}/answers", response_model=List[WorkAnswerRead])
 async def list_answers_by_work(
     work_id: int,
+    after_id: int | None = Query(None, description="Return only answers with a greater ID"),
+    limit: int = Query(100, ge=1, le=500),
     bo: WorkBO = Depends(WorkBO.from_depends),
-    current_user: User = Depends(fastapi_users.current_user()),
+    current_user: Principal = Depends(current_principal()),
 ):
     """
     Lists answers for a work:
-    - Instructors: Can view all answers of the work.
+    - Instructors: Can view all answers of the work, a page at a time.
+      Use the ID of the last answer returned as `after_id` to load the next page.
     - Students: Can view only their own answer (if enrolled in the course).
     """
     if current_user.is_instructor:
-        return await bo.list_answers_by_work(work_id=work_id)
+        return await bo.list_answers_by_work(work_id=work_id, after_id=after_id, limit=limit)
 
     if current_user.is_student:
         return [await bo.get_my_answer_for_work(
@@ -99,11 +104,53 @@ async def list_answers_by_work(
     )
 
 
+@works_router.get("/{work_id}/answers/export")
+async def export_answers_by_work(
+    work_id: int,
+    export_format: Literal["csv", "ndjson"] = Query("csv", alias="format"),
+    bo: WorkBO = Depends(WorkBO.from_depends),
+    current_user: Principal = Depends(current_principal()),
+):
+    """Instructor streams every answer of one of their works as CSV or NDJSON."""
+    if not current_user.is_instructor:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only instructors can export answers."
+        )
+    stream = await bo.export_answers(
+        work_id=work_id,
+        instructor_id=current_user.id,
+        export_format=export_format
+    )
+    media_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        stream,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="work-{work_id}-answers.{export_format}"'}
+    )
+
+
+@works_router.post("/{work_id}/grade", response_model=GradingResultRead)
+async def grade_work(
+    work_id: int,
+    grade_data: GradeRequest,
+    bo: WorkBO = Depends(WorkBO.from_depends),
+    current_user: Principal = Depends(current_principal()),
+):
+    """Instructor grades every answer of one of their works against an answer key."""
+    if not current_user.is_instructor:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only instructors can grade works."
+        )
+    return await bo.grade_work(work_id=work_id, instructor_id=current_user.id, grade_data=grade_data)
+
+
 @works_router.post("/answer", response_model=WorkAnswerWithNotifications)
 async def submit_or_update_answer(
     answer_data: WorkAnswerCreate,
     bo: WorkBO = Depends(WorkBO.from_depends),
-    current_user: User = Depends(fastapi_users.current_user()),
+    current_user: Principal = Depends(current_principal()),
 ):
     """Student submits or updates their own answer to a work (with instructor notification)."""
     if not current_user.is_student:
@@ -114,11 +161,39 @@ async def submit_or_update_answer(
     return await bo.submit_answer(answer_data=answer_data, student_id=current_user.id)
 
 
+@works_router.get("/answers/{answer_id}/revisions", response_model=List[WorkAnswerRevisionRead])
+async def list_answer_revisions(
+    answer_id: int,
+    after_revision: int = Query(0, ge=0, description="Return only revisions with a greater number"),
+    limit: int = Query(100, ge=1, le=500),
+    bo: WorkBO = Depends(WorkBO.from_depends),
+    current_user: Principal = Depends(current_principal()),
+):
+    """Lists the revision history of an answer (its student or the course's instructor only)."""
+    return await bo.list_answer_revisions(
+        answer_id=answer_id,
+        user_id=current_user.id,
+        after_revision=after_revision,
+        limit=limit
+    )
+
+
+@works_router.get("/answers/{answer_id}/revisions/{revision}", response_model=WorkAnswerRevisionContentRead)
+async def get_answer_revision(
+    answer_id: int,
+    revision: int,
+    bo: WorkBO = Depends(WorkBO.from_depends),
+    current_user: Principal = Depends(current_principal()),
+):
+    """Retrieves the answers as they were at a given revision (its student or the course's instructor only)."""
+    return await bo.get_answer_revision(answer_id=answer_id, revision=revision, user_id=current_user.id)
+
+
 @works_router.get("/{work_id}/my-answer", response_model=WorkAnswerRead)
 async def get_my_answer_for_work(
     work_id: int,
     bo: WorkBO = Depends(WorkBO.from_depends),
-    current_user: User = Depends(fastapi_users.current_user()),
+    current_user: Principal = Depends(current_principal()),
 ):
     """Student retrieves their own answer for a specific work."""
     if not current_user.is_student:
@@ -1,9 +1,13 @@
 import os
 import dotenv
+from typing import Any, Callable, Dict, List
 from collections.abc import AsyncGenerator
 from fastapi_users.db import SQLAlchemyUserDatabase
 
+from sqlalchemy import func, or_
 from sqlalchemy.future import select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
     AsyncSession,
@@ -14,6 +18,10 @@ from sqlalchemy.orm import selectinload
 from app.utils.models import Base
 from app.models.payments import Payment
 from app.models.courses import Course, Lesson, LessonProgression
+from app.utils.completion import completion_matrices
+from app.utils.instrumentation import instrument_engine
+from app.utils.metrics import register_pool_metrics
+from app.utils.tracing import traced_methods
 
 # Load environment variables from .env file
 dotenv.load_dotenv()
@@ -23,15 +31,25 @@ dotenv.load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL")
 """str: Database URL for the application, loaded from environment variables."""
 
-engine = create_async_engine(DATABASE_URL)
+DATABASE_POOL_SIZE = int(os.getenv("DATABASE_POOL_SIZE", "0"))
+"""int: Maximum number of connections the engine opens, without overflow; 0 keeps SQLAlchemy's default pool."""
+
+engine = create_async_engine(
+    DATABASE_URL,
+    **({"pool_size": DATABASE_POOL_SIZE, "max_overflow": 0} if DATABASE_POOL_SIZE > 0 else {})
+)
 """AsyncEngine: SQLAlchemy async engine instance."""
 
+instrument_engine(engine)
+register_pool_metrics(engine)
+
 async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
 """async_sessionmaker: Async session maker for database operations."""
 
 
 # Database Classes and Functions
 # ------------------------------------------------------------------------------
+@traced_methods
 class UserDatabase(SQLAlchemyUserDatabase):
     """Custom user database for the application."""
 
@@ -43,6 +61,92 @@ class UserDatabase(SQLAlchemyUserDatabase):
         result = await self.session.execute(stmt)
         return result.scalars().all()
 
+    def _search_filters(self, query: str | None = None, user_type: str | None = None, is_active: bool | None = None):
+        """
+        Build the filters of an admin user search. `query` is a prefix of the email, first name or last name,
+        so each alternative is a range scan of that column's index.
+        """
+        filters = []
+        if query:
+            prefix = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            filters.append(or_(
+                self.user_table.email.like(prefix, escape="\\"),
+                self.user_table.first_name.like(prefix, escape="\\"),  # type: ignore
+                self.user_table.last_name.like(prefix, escape="\\"),  # type: ignore
+            ))
+        if user_type:
+            filters.append(self.user_table.user_type == user_type)  # type: ignore
+        if is_active is not None:
+            filters.append(self.user_table.is_active == is_active)
+        return filters
+
+    async def search_users(
+            self, query: str | None = None, user_type: str | None = None, is_active: bool | None = None,
+            after_id: int | None = None, offset: int = 0, limit: int = 100
+    ):
+        """
+        Search users for the admin console, ordered by ID.
+        Only the columns of `UserRead` are selected, so no relationship is loaded. With `after_id` the page starts
+        after that user (keyset pagination, constant cost at any depth); otherwise `offset` is used.
+        """
+        stmt = select(
+            self.user_table.id,
+            self.user_table.email,
+            self.user_table.first_name,  # type: ignore
+            self.user_table.last_name,  # type: ignore
+            self.user_table.user_type,  # type: ignore
+            self.user_table.is_active,
+            self.user_table.is_superuser,
+            self.user_table.is_verified
+        ).where(*self._search_filters(query, user_type, is_active)).order_by(self.user_table.id).limit(limit)
+        if after_id is not None:
+            stmt = stmt.where(self.user_table.id > after_id)
+        else:
+            stmt = stmt.offset(offset)
+        result = await self.session.execute(stmt)
+        return result.all()
+
+    async def count_users(
+            self, query: str | None = None, user_type: str | None = None, is_active: bool | None = None
+    ) -> int:
+        """Count the users matching an admin search."""
+        stmt = (
+            select(func.count())
+            .select_from(self.user_table)
+            .where(*self._search_filters(query, user_type, is_active))
+        )
+        return (await self.session.execute(stmt)).scalar_one()
+
+    async def get_courses_teaching(self, instructor_ids: List[int]):
+        """Get the (instructor ID, course) columns of the courses taught by some instructors, in one query."""
+        if not instructor_ids:
+            return []
+        stmt = (
+            select(Course.instructor_id, Course.id, Course.title, Course.price, Course.is_active)
+            .where(Course.instructor_id.in_(instructor_ids))
+            .order_by(Course.id)
+        )
+        result = await self.session.execute(stmt)
+        return result.all()
+
+    async def get_token_version(self, user_id: int) -> int | None:
+        """Get the current token version of a user, or None if the user does not exist."""
+        stmt = select(self.user_table.token_version).where(self.user_table.id == user_id)  # type: ignore
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def get_principal(self, user_id: int):
+        """Get the ID, type, flags and token version of a user, without loading the user or its relationships."""
+        stmt = select(
+            self.user_table.id,
+            self.user_table.user_type,  # type: ignore
+            self.user_table.is_superuser,
+            self.user_table.is_active,
+            self.user_table.token_version  # type: ignore
+        ).where(self.user_table.id == user_id)
+        result = await self.session.execute(stmt)
+        return result.first()
+
     async def get_my_courses(self, user_id: int, offset: int = 0, limit: int = 100):
         """Get all courses for a user with pagination."""
         stmt = (
@@ -81,11 +185,19 @@ class UserDatabase(SQLAlchemyUserDatabase):
         return result.scalars().first()
 
     async def mark_lesson_completed(self, lesson_progression: LessonProgression) -> LessonProgression:
-        """Mark a lesson as completed for the user."""
+        """
+        Mark a lesson as completed for the user.
+        The course's cached completion matrix is updated in place, or dropped if it does not know the user or lesson.
+        """
         lesson_progression.completed = True
         self.session.add(lesson_progression)
         await self.session.commit()
         await self.session.refresh(lesson_progression)
+
+        course_id = lesson_progression.lesson.course_id
+        matrix = completion_matrices.get(course_id)
+        if matrix is not None and not matrix.mark(lesson_progression.user_id, lesson_progression.lesson_id):
+            completion_matrices.delete(course_id)
         return lesson_progression
 
 
@@ -95,6 +207,27 @@ async def create_db_and_tables():
         await conn.run_sync(Base.metadata.create_all)
 
 
+def build_upsert(
+        session: AsyncSession,
+        model: type[Base],
+        conflict_columns: List[str],
+        update: Callable[[Any], Dict[str, Any]],
+):
+    """
+    Build a single-statement upsert for the session's dialect.
+    `update` receives the incoming row (`inserted` on MySQL, `excluded` on SQLite)
+    and returns the columns to set when `conflict_columns` already exist.
+    Built on the table rather than the mapped class, so it executes as a plain Core
+    statement whose compiled form is cached instead of going through the ORM insert path.
+    """
+    if session.bind.dialect.name == "sqlite":
+        stmt = sqlite_insert(model.__table__)
+        return stmt.on_conflict_do_update(index_elements=conflict_columns, set_=update(stmt.excluded))
+
+    stmt = mysql_insert(model.__table__)
+    return stmt.on_duplicate_key_update(**update(stmt.inserted))
+
+
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     """Get an async session for database operations."""
     async with async_session_maker() as session:
@@ -1,10 +1,16 @@
 import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.db.database import create_db_and_tables
+from app.workers.notifications_worker import notification_workers
+from app.workers.settlement_worker import settlement_job
+from app.utils.hashing import password_hash_pool
+from app.utils.instrumentation import QueryStatsMiddleware
+from app.utils.metrics import metrics, app_exceptions
+from app.utils.tracing import TracingMiddleware, exporter
 
 from app.models.users import user_routers
 from app.controllers.users_controller import users_router
@@ -13,13 +19,22 @@ from app.controllers.payments_controller import payments_router
 from app.schemas.user_schemas import UserCreate, UserRead, UserUpdate
 from app.controllers.messages_controller import messages_router
 from app.controllers.works_controller import works_router
-from app.utils.exceptions import NotFoundError, PermissionDeniedError, ValidationError
+from app.controllers.notifications_controller import notifications_router
+from app.controllers.analytics_controller import analytics_router
+from app.utils.exceptions import NotFoundError, PermissionDeniedError, ValidationError, ConflictError
 
 @asynccontextmanager
 async def lifespan(app: FastAPI): # noqa
-    """Lifespan event handler to create database tables."""
+    """Lifespan event handler to create database tables and run the background workers."""
     await create_db_and_tables()
+    await notification_workers.start()
+    await settlement_job.resume()
     yield  # This will run when the app starts and stops
+    await settlement_job.stop()
+    await notification_workers.stop()
+    password_hash_pool.shutdown()
+    if exporter is not None:
+        exporter.shutdown()
 
 
 # FastAPI Configuration
@@ -40,7 +55,10 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allows all methods, adjust as needed
     allow_headers=["*"],  # Allows all headers, adjust as needed
+    expose_headers=["Server-Timing"],
 )
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(TracingMiddleware)
 
 # Logging Configuration
 # ------------------------------------------------------------------------------
@@ -62,6 +80,7 @@ logging.basicConfig(
 @app.exception_handler(NotFoundError)
 async def not_found_exception_handler(request, exc: NotFoundError): # noqa
     """Handle NotFoundError exceptions."""
+    app_exceptions.inc("NotFoundError")
     return JSONResponse(
         status_code=404,
         content={"detail": str(exc)},
@@ -71,6 +90,7 @@ async def not_found_exception_handler(request, exc: NotFoundError): # noqa
 @app.exception_handler(PermissionDeniedError)
 async def permission_denied_exception_handler(request, exc: PermissionDeniedError): # noqa
     """Handle PermissionDeniedError exceptions."""
+    app_exceptions.inc("PermissionDeniedError")
     return JSONResponse(
         status_code=403,
         content={"detail": str(exc)},
@@ -80,18 +100,35 @@ async def permission_denied_exception_handler(request, exc: PermissionDeniedErro
 @app.exception_handler(ValidationError)
 async def validation_exception_handler(request: Request, exc: ValidationError): # noqa
     """Handle ValidationError exceptions."""
+    app_exceptions.inc("ValidationError")
     return JSONResponse(
         status_code=400,
         content={"detail": str(exc)},
     )
 
 
+@app.exception_handler(ConflictError)
+async def conflict_exception_handler(request: Request, exc: ConflictError): # noqa
+    """Handle ConflictError exceptions."""
+    app_exceptions.inc("ConflictError")
+    return JSONResponse(
+        status_code=409,
+        content={"detail": str(exc)},
+    )
+
+
 # App routers
 # ------------------------------------------------------------------------------
 @app.get("/", name="root", tags=["root"])
 async def root():
     return {"welcome": "Course Platform API"}
 
+
+@app.get("/metrics", name="metrics", tags=["root"], response_class=PlainTextResponse, include_in_schema=False)
+async def get_metrics():
+    """Metrics of this worker process in the Prometheus text format."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 app.include_router(
     router=user_routers["auth"],
     prefix="/auth/jwt",
@@ -121,3 +158,5 @@ app.include_router(router=courses_router)
 app.include_router(router=payments_router)
 app.include_router(router=messages_router)
 app.include_router(router=works_router)
+app.include_router(router=notifications_router)
+app.include_router(router=analytics_router)
@@ -0,0 +1,29 @@
+from datetime import date
+
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import ForeignKey, Integer, Numeric, Date, Index, UniqueConstraint, Enum as SQLEnum
+
+from app.models.payments import PaymentTypeEnum
+from app.utils.models import Base
+
+
+class CourseDailyRollup(Base):
+    """
+    Enrollments and revenue of a course for one day and payment type.
+    Incremented with every payment and rebuildable from the payments table by the rollup job.
+    """
+    __tablename__ = "course_daily_rollups"
+    __table_args__ = (
+        UniqueConstraint("course_id", "day", "payment_type", name="uq_course_daily_rollups_course_day_type"),
+        Index("ix_course_daily_rollups_instructor_id_day", "instructor_id", "day"),
+    )
+
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+    course_id: Mapped[int] = mapped_column(ForeignKey("courses.id", ondelete="CASCADE"), nullable=False)
+    instructor_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    payment_type: Mapped[PaymentTypeEnum] = mapped_column(
+        SQLEnum(PaymentTypeEnum, values_callable=lambda x: [e.value for e in x]),
+        nullable=False
+    )
+    enrollments: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    revenue: Mapped[float] = mapped_column(Numeric(14, 2), default=0, nullable=False)  # Amount over all installments
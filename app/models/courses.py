@@ -8,6 +8,7 @@ from sqlalchemy import (
     Numeric,
     Text,
     JSON,
+    UniqueConstraint,
     Enum as SQLEnum,
 )
 
@@ -51,12 +52,13 @@ class Course(Base):
         "Payment", 
         back_populates="course"
     )
-    # Mediator
+    # Mediator: chat history is paged through the MessageDAO, never loaded with the course
     messages = relationship(
-        "Message", 
-        back_populates="course", 
-        cascade="all, delete-orphan", 
-        lazy="selectin"
+        "Message",
+        back_populates="course",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="raise"
     )
     # Observer
     works = relationship(
@@ -153,6 +155,9 @@ class Lesson(Base):
 class LessonProgression(Base):
     """Model to track student progression in lessons."""
     __tablename__ = "lesson_progressions"
+    __table_args__ = (
+        UniqueConstraint("user_id", "lesson_id", name="uq_lesson_progressions_user_id_lesson_id"),
+    )
 
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
     lesson_id: Mapped[int] = mapped_column(ForeignKey("lessons.id"), nullable=False)
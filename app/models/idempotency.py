@@ -0,0 +1,26 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import ForeignKey, String, Integer, JSON, DateTime, UniqueConstraint
+
+from app.utils.models import Base
+
+
+class IdempotencyKey(Base):
+    """
+    Client-supplied `Idempotency-Key` for a state-changing request, scoped to the user who sent it.
+    The stored response is replayed for repeats of the same request until the key expires;
+    a key without a response belongs to a request that is still being processed.
+    """
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        UniqueConstraint("user_id", "key", name="uq_idempotency_keys_user_id_key"),
+    )
+
+    key: Mapped[str] = mapped_column(String(255), nullable=False)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    request_hash: Mapped[str] = mapped_column(String(64), nullable=False)  # SHA-256 of the endpoint and body
+    status_code: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    response: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
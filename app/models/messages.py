@@ -1,5 +1,7 @@
+import zlib
+
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import ForeignKey, Text
+from sqlalchemy import ForeignKey, Text, LargeBinary, Index
 
 from app.utils.models import Base
 
@@ -7,10 +9,18 @@ from app.utils.models import Base
 class Message(Base):
     """Represents a message exchanged in the course (student ↔ instructor)."""
     __tablename__ = "messages"
+    __table_args__ = (
+        Index("ix_messages_course_id_id", "course_id", "id"),
+        Index("ix_messages_created_at", "created_at"),
+        # IDs must never be reused once archived rows leave this table
+        {"sqlite_autoincrement": True},
+    )
 
     content: Mapped[str] = mapped_column(Text, nullable=False)
     sender_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
-    course_id: Mapped[int] = mapped_column(ForeignKey("courses.id"), nullable=False)
+    course_id: Mapped[int] = mapped_column(
+        ForeignKey("courses.id", ondelete="CASCADE"), nullable=False
+    )
 
     # Relationships
     sender = relationship(
@@ -23,3 +33,36 @@ class Message(Base):
         back_populates="messages",
         lazy="selectin"
     )
+
+
+class ArchivedMessage(Base):
+    """Represents a chat message moved to cold storage, with its content compressed."""
+    __tablename__ = "messages_archive"
+    __table_args__ = (
+        Index("ix_messages_archive_course_id_id", "course_id", "id"),
+    )
+
+    compressed_content: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    sender_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    course_id: Mapped[int] = mapped_column(
+        ForeignKey("courses.id", ondelete="CASCADE"), nullable=False
+    )
+
+    @classmethod
+    def from_message(cls, message: Message) -> "ArchivedMessage":
+        """Build an archive row keeping the original message ID and timestamps."""
+        return cls(
+            id=message.id,
+            compressed_content=zlib.compress(message.content.encode("utf-8")),
+            sender_id=message.sender_id,
+            course_id=message.course_id,
+            created_at=message.created_at,
+            updated_at=message.updated_at,
+        )
+
+    @property
+    def content(self) -> str:
+        """Return the decompressed message content."""
+        return zlib.decompress(self.compressed_content).decode("utf-8")
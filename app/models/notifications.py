@@ -0,0 +1,96 @@
+from enum import Enum
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import ForeignKey, String, Text, Integer, DateTime, Index, Enum as SQLEnum
+
+from app.utils.models import Base
+
+
+class OutboxStatusEnum(str, Enum):
+    """Enumeration for the delivery status of an outbox entry."""
+    PENDING = "P"
+    PROCESSING = "R"
+    DONE = "D"
+    FAILED = "F"
+
+    @classmethod
+    def get_choices(cls):
+        return [(choice.value, choice.name) for choice in cls]
+
+
+class NotificationOutbox(Base):
+    """
+    Durable outbox entry for a notification that still has to be fanned out.
+    When `recipient_id` is empty the notification goes to every student enrolled in the course.
+    Digest entries coalesce repeated events for the same recipient and work until `available_at`.
+    """
+    __tablename__ = "notification_outbox"
+    __table_args__ = (
+        Index("ix_notification_outbox_status_id", "status", "id"),
+    )
+
+    message: Mapped[str] = mapped_column(Text, nullable=False)
+    recipient_type: Mapped[str] = mapped_column(String(20), nullable=False)
+    recipient_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), nullable=True
+    )
+    course_id: Mapped[int] = mapped_column(
+        ForeignKey("courses.id", ondelete="CASCADE"), nullable=False
+    )
+    status: Mapped[OutboxStatusEnum] = mapped_column(
+        SQLEnum(OutboxStatusEnum, values_callable=lambda x: [e.value for e in x]),
+        default=OutboxStatusEnum.PENDING,
+        nullable=False
+    )
+    cursor: Mapped[int] = mapped_column(Integer, default=0, nullable=False)  # Last payment ID fanned out
+    delivered: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    # Digest: cleared when the entry is claimed, so later events start a new digest
+    work_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("works.id", ondelete="CASCADE"), nullable=True
+    )
+    digest_key: Mapped[Optional[str]] = mapped_column(String(100), unique=True, nullable=True)
+    digest_message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    event_count: Mapped[int] = mapped_column(Integer, default=1, nullable=False)
+    available_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    def render_message(self) -> str:
+        """Return the message to deliver, summarising every event coalesced into this entry."""
+        if self.event_count > 1 and self.digest_message:
+            return self.digest_message.replace("{count}", str(self.event_count))
+        return self.message
+
+
+class InboxNotification(Base):
+    """A notification delivered to a user's inbox."""
+    __tablename__ = "notification_inbox"
+    __table_args__ = (
+        Index("ix_notification_inbox_recipient_id_id", "recipient_id", "id"),
+    )
+
+    recipient_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    recipient_type: Mapped[str] = mapped_column(String(20), nullable=False)
+    message: Mapped[str] = mapped_column(Text, nullable=False)
+    job_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("notification_outbox.id", ondelete="SET NULL"), nullable=True
+    )
+
+
+class NotificationCounter(Base):
+    """
+    Per-user inbox counters, maintained incrementally on delivery and on read.
+    Notifications with an ID up to `last_read_id` are read.
+    """
+    __tablename__ = "notification_counters"
+
+    recipient_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), unique=True, nullable=False
+    )
+    unread_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    last_read_id: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
@@ -1,6 +1,11 @@
 from enum import Enum
+from datetime import date, datetime
+from typing import Optional
+
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import ForeignKey, Numeric, Integer, Enum as SQLEnum
+from sqlalchemy import (
+    ForeignKey, Numeric, Integer, String, Date, DateTime, Index, UniqueConstraint, Enum as SQLEnum
+)
 
 from app.utils.models import Base
 
@@ -19,6 +24,9 @@ class PaymentTypeEnum(str, Enum):
 class Payment(Base):
     """Represents a payment made by a user for a course."""
     __tablename__ = "payments"
+    __table_args__ = (
+        UniqueConstraint("user_id", "course_id", name="uq_payments_user_id_course_id"),
+    )
 
     user_id: Mapped[int] = mapped_column(
         ForeignKey("users.id", ondelete="CASCADE"), nullable=False
@@ -30,8 +38,10 @@ class Payment(Base):
         SQLEnum(PaymentTypeEnum, values_callable=lambda x: [e.value for e in x]),
         nullable=False
     )
-    amount: Mapped[float] = mapped_column(Numeric(10, 2), nullable=False)
+    amount: Mapped[float] = mapped_column(Numeric(10, 2), nullable=False)  # Per installment
     installments: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    # Exact amount charged, the last installment takes the rounding remainder; null on payments made before it
+    total: Mapped[Optional[float]] = mapped_column(Numeric(10, 2), nullable=True)
 
     # Relationships
     user = relationship(
@@ -44,3 +54,58 @@ class Payment(Base):
         back_populates="payments",
         lazy="selectin"
     )
+
+
+class InstallmentStatusEnum(str, Enum):
+    """Enumeration for the status of a payment installment."""
+    PENDING = "P"
+    SETTLED = "S"
+
+    @classmethod
+    def get_choices(cls):
+        return [(choice.value, choice.name) for choice in cls]
+
+
+class PaymentInstallment(Base):
+    """Scheduled installment of a payment, written when the payment is made and settled by the settlement job."""
+    __tablename__ = "payment_installments"
+    __table_args__ = (
+        UniqueConstraint("payment_id", "number", name="uq_payment_installments_payment_id_number"),
+        Index("ix_payment_installments_status_id", "status", "id"),
+    )
+
+    payment_id: Mapped[int] = mapped_column(
+        ForeignKey("payments.id", ondelete="CASCADE"), nullable=False
+    )
+    number: Mapped[int] = mapped_column(Integer, nullable=False)  # 1-based position in the schedule
+    amount: Mapped[float] = mapped_column(Numeric(10, 2), nullable=False)
+    due_date: Mapped[date] = mapped_column(Date, nullable=False)
+    status: Mapped[InstallmentStatusEnum] = mapped_column(
+        SQLEnum(InstallmentStatusEnum, values_callable=lambda x: [e.value for e in x]),
+        default=InstallmentStatusEnum.PENDING,
+        nullable=False
+    )
+    settled_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+
+class SettlementRun(Base):
+    """
+    Checkpoint of a settlement job run.
+    `last_installment_id` advances with every committed batch, so an interrupted run resumes where it stopped.
+    Only one run is open at a time, and it is settled by the worker holding its lease.
+    """
+    __tablename__ = "settlement_runs"
+    __table_args__ = (
+        UniqueConstraint("open_slot", name="uq_settlement_runs_open_slot"),
+    )
+
+    as_of: Mapped[date] = mapped_column(Date, nullable=False)  # Installments due up to this date are settled
+    last_installment_id: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    settled: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    batches: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    # 1 until the run finishes, then null: the unique key lets a single run be open across all workers
+    open_slot: Mapped[Optional[int]] = mapped_column(Integer, default=1, nullable=True)
+    # Worker settling the run and its last checkpoint; another worker may take the run over once the lease expires
+    owner: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    heartbeat_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
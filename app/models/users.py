@@ -1,16 +1,30 @@
+import os
 from enum import Enum
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
 
-from fastapi import Depends
-from fastapi_users import BaseUserManager, FastAPIUsers
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import OAuth2PasswordRequestForm
+from fastapi_users import BaseUserManager, FastAPIUsers, exceptions, schemas
 from fastapi_users.db import SQLAlchemyBaseUserTable
 
-from sqlalchemy import String, Enum as SQLEnum
+from sqlalchemy import String, Integer, Index, Enum as SQLEnum
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.database import get_async_session, UserDatabase
-from app.utils.token import auth_backend
+from app.utils.token import auth_backend, bearer_transport, jwt_strategy
 from app.utils.models import Base
+from app.utils.principals import create_principal_cache
+from app.utils.hashing import password_hash_pool, login_limiter
+from app.utils.cache import LRUCache
+
+
+USER_COUNT_CACHE_TTL = float(os.getenv("USER_COUNT_CACHE_TTL", "60"))
+"""float: Seconds the total of an admin user search is cached, since counting a large users table is a full scan."""
+
+TOKEN_CLAIM_FIELDS = ("user_type", "is_superuser", "is_active")
+"""tuple: User fields signed into access tokens, which authorization is decided on."""
 
 
 class UserTypeEnum(str, Enum):
@@ -26,6 +40,12 @@ class UserTypeEnum(str, Enum):
 class User(SQLAlchemyBaseUserTable[int], Base):
     """Default custom user model for the application."""
     __tablename__ = "users"
+    __table_args__ = (
+        # Admin search: name prefixes (the email already has a unique index) and the user type filter in ID order
+        Index("ix_users_first_name", "first_name"),
+        Index("ix_users_last_name", "last_name"),
+        Index("ix_users_user_type_id", "user_type", "id"),
+    )
 
     first_name: Mapped[str] = mapped_column(String(length=100), nullable=False)
     last_name: Mapped[str] = mapped_column(String(length=100), nullable=False)
@@ -34,6 +54,8 @@ class User(SQLAlchemyBaseUserTable[int], Base):
         default=UserTypeEnum.STUDENT,
         nullable=False
     )
+    # Incremented to revoke every token issued before (password change, deactivation)
+    token_version: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
 
     # Relationships
     courses_teaching = relationship(
@@ -100,6 +122,36 @@ class UserManager(BaseUserManager[User, int]):
         """Get all users with optional filters."""
         return await self.user_db.get_all(offset=offset, limit=limit, user_type=user_type) # noqa
 
+    async def search_users(
+            self, query: str | None = None, user_type: str | None = None, is_active: bool | None = None,
+            after_id: int | None = None, offset: int = 0, limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """
+        Search users for the admin console, as dictionaries shaped like `UserRead`.
+        The courses taught by the instructors of the page are read with a single extra query.
+        """
+        rows = await self.user_db.search_users( # noqa
+            query=query, user_type=user_type, is_active=is_active, after_id=after_id, offset=offset, limit=limit
+        )
+        users = [{**row._mapping, "courses_teaching": []} for row in rows]
+        instructors = {user["id"]: user for user in users if user["user_type"] == UserTypeEnum.INSTRUCTOR}
+        for course in await self.user_db.get_courses_teaching(list(instructors)): # noqa
+            instructors[course.instructor_id]["courses_teaching"].append({
+                "id": course.id, "title": course.title, "price": course.price, "is_active": course.is_active,
+            })
+        return users
+
+    async def count_users(
+            self, query: str | None = None, user_type: str | None = None, is_active: bool | None = None
+    ) -> int:
+        """Count the users matching an admin search, from the count cache when possible."""
+        key = (query, user_type, is_active)
+        total = user_counts.get(key)
+        if total is None:
+            total = await self.user_db.count_users(query=query, user_type=user_type, is_active=is_active) # noqa
+            user_counts.set(key, total)
+        return total
+
     async def get_my_courses(self, user_id: int, offset: int = 0, limit: int = 100):
         """Get all courses for a user with pagination."""
         return await self.user_db.get_my_courses(user_id=user_id, offset=offset, limit=limit) # noqa
@@ -122,6 +174,85 @@ class UserManager(BaseUserManager[User, int]):
             lesson_progression=lesson_progression,
         )
 
+    async def authenticate(self, credentials: OAuth2PasswordRequestForm) -> Optional[User]:
+        """
+        Authenticate a user by email and password, within the login route's concurrency cap.
+        The password is verified on the hashing pool; unknown emails are hashed too, to mitigate timing attacks.
+        """
+        async with login_limiter.slot():
+            try:
+                user = await self.get_by_email(credentials.username)
+            except exceptions.UserNotExists:
+                await password_hash_pool.run(self.password_helper.hash, credentials.password)
+                return None
+
+            verified, updated_password_hash = await password_hash_pool.run(
+                self.password_helper.verify_and_update, credentials.password, user.hashed_password
+            )
+            if not verified:
+                return None
+            if updated_password_hash is not None:
+                await self.user_db.update(user, {"hashed_password": updated_password_hash})
+            return user
+
+    async def create(
+            self, user_create: schemas.UC, safe: bool = False, request: Optional[Request] = None
+    ) -> User:
+        """Create a user, hashing the password on the hashing pool."""
+        await self.validate_password(user_create.password, user_create)
+
+        existing_user = await self.user_db.get_by_email(user_create.email)
+        if existing_user is not None:
+            raise exceptions.UserAlreadyExists()
+
+        user_dict = user_create.create_update_dict() if safe else user_create.create_update_dict_superuser()
+        password = user_dict.pop("password")
+        user_dict["hashed_password"] = await password_hash_pool.run(self.password_helper.hash, password)
+
+        created_user = await self.user_db.create(user_dict)
+        await self.on_after_register(created_user, request)
+        return created_user
+
+    async def _update(self, user: User, update_dict: Dict[str, Any]) -> User:
+        """
+        Apply an update, revoking the user's tokens when the password or any claim signed into them
+        (`user_type`, `is_superuser`, `is_active`) changes, so the claims of a valid token are always current.
+        A new password is validated and hashed on the hashing pool before the update is applied.
+        """
+        update_dict = dict(update_dict)
+        password = update_dict.pop("password", None)
+        claims_changed = any(
+            field in update_dict and update_dict[field] != getattr(user, field) for field in TOKEN_CLAIM_FIELDS
+        )
+        if password is not None or claims_changed:
+            update_dict["token_version"] = user.token_version + 1
+        if password is not None:
+            await self.validate_password(password, user)
+            update_dict["hashed_password"] = await password_hash_pool.run(self.password_helper.hash, password)
+        return await super()._update(user, update_dict)
+
+    async def on_after_register(self, user: User, request: Optional[Request] = None):
+        """Drop the cached user counts, which no longer include the new user."""
+        user_counts.clear()
+
+    async def on_after_update(self, user: User, update_dict: Dict[str, Any], request: Optional[Request] = None):
+        """
+        Drop the user's cached principal, so changed flags or a revoked token take effect at once,
+        and the cached user counts when a searchable field changed.
+        """
+        await principal_cache.invalidate(user.id)
+        if update_dict.keys() & {"email", "first_name", "last_name", "user_type", "is_active"}:
+            user_counts.clear()
+
+    async def on_after_reset_password(self, user: User, request: Optional[Request] = None):
+        """Drop the user's cached principal; the reset already revoked their tokens."""
+        await principal_cache.invalidate(user.id)
+
+    async def on_after_delete(self, user: User, request: Optional[Request] = None):
+        """Drop the deleted user's cached principal and the cached user counts."""
+        await principal_cache.invalidate(user.id)
+        user_counts.clear()
+
 async def get_user_manager(user_db: UserDatabase = Depends(get_user_db)):
     """Dependency to get the user manager."""
     yield UserManager(user_db)
@@ -137,6 +268,86 @@ fastapi_users = FastAPIUsers[User, int](
 FastAPIUsers: Instance for managing user authentication and authorization.
 """
 
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """Lightweight view of the authenticated user, built from the signed token claims."""
+    id: int
+    user_type: UserTypeEnum
+    is_superuser: bool
+    is_active: bool
+    token_version: int = 0
+
+    @property
+    def is_instructor(self) -> bool:
+        """Check if the user is an instructor."""
+        return self.user_type == UserTypeEnum.INSTRUCTOR
+
+    @property
+    def is_student(self) -> bool:
+        """Check if the user is a student."""
+        return self.user_type == UserTypeEnum.STUDENT
+
+
+user_counts = LRUCache(maxsize=1024, ttl=USER_COUNT_CACHE_TTL, name="user_counts")
+"""LRUCache: Totals of admin user searches, by (query, user type, active) filter."""
+
+principal_cache = create_principal_cache(
+    loads=lambda fields: Principal(**{**fields, "user_type": UserTypeEnum(fields["user_type"])})
+)
+"""LocalPrincipalCache | RedisPrincipalCache: Authenticated principals, by user ID and token version."""
+
+
+def current_principal(active: bool = False, superuser: bool = False):
+    """
+    Dependency factory for the authenticated principal, the counterpart of `fastapi_users.current_user()`
+    for endpoints that only need the user's ID and flags. The principal is built from the signed claims of the
+    token, which are revoked with it whenever they change; only its version is checked against the user's,
+    from the principal cache or, on a miss, the database. A token whose version is behind (revoked by a password
+    change, a deactivation or a change of role) is refused. Tokens issued without claims read the flags instead.
+    Endpoints that need the full user keep using `fastapi_users.current_user()`.
+    """
+    async def dependency(
+            token: str | None = Depends(bearer_transport.scheme),
+            user_db: UserDatabase = Depends(get_user_db),
+    ) -> Principal:
+        claims = jwt_strategy.read_claims(token)
+        if claims is None or claims.get("sub") is None:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+        try:
+            user_id = int(claims["sub"])
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+        token_version = claims.get("ver", 0)
+
+        principal = await principal_cache.get(user_id, token_version)
+        if principal is None:
+            if claims.keys() >= set(TOKEN_CLAIM_FIELDS):
+                if await user_db.get_token_version(user_id) != token_version: # noqa
+                    raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+                principal = Principal(
+                    id=user_id,
+                    user_type=UserTypeEnum(claims["user_type"]),
+                    is_superuser=claims["is_superuser"],
+                    is_active=claims["is_active"],
+                    token_version=token_version,
+                )
+            else:
+                row = await user_db.get_principal(user_id) # noqa
+                if row is None or row.token_version != token_version:
+                    raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+                principal = Principal(**row._mapping)
+            await principal_cache.set(principal)
+
+        if active and not principal.is_active:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+        if superuser and not principal.is_superuser:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+        return principal
+
+    return dependency
+
+
 user_routers = {
     "auth": fastapi_users.get_auth_router(auth_backend),
     "register": fastapi_users.get_register_router,
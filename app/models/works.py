@@ -1,5 +1,8 @@
+from datetime import datetime
+from typing import Optional
+
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import ForeignKey, String, JSON
+from sqlalchemy import ForeignKey, String, JSON, Float, DateTime, Integer, Boolean, UniqueConstraint
 
 from app.utils.models import Base
 
@@ -10,27 +13,52 @@ class Work(Base):
 
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     questions: Mapped[list] = mapped_column(JSON, nullable=False)  # Stored as JSON directly
+    answer_key: Mapped[Optional[list]] = mapped_column(JSON, nullable=True)  # One expected answer per question
     course_id: Mapped[int] = mapped_column(ForeignKey("courses.id", ondelete="CASCADE"), nullable=False)
 
     course = relationship("Course", back_populates="works", lazy="selectin")
+    # Answers are paged or streamed through the WorkAnswerDAO, never loaded with the work
     answers = relationship(
         "WorkAnswer",
         back_populates="work",
         cascade="all, delete-orphan",
-        lazy="selectin"
+        passive_deletes=True,
+        lazy="raise"
     )
 
 
 class WorkAnswer(Base):
     """Represents a student's submission to a work."""
     __tablename__ = "work_answers"
+    __table_args__ = (
+        UniqueConstraint("work_id", "student_id", name="uq_work_answers_work_id_student_id"),
+    )
 
     answers: Mapped[list] = mapped_column(JSON, nullable=False)
     student_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     work_id: Mapped[int] = mapped_column(ForeignKey("works.id", ondelete="CASCADE"), nullable=False)
+    score: Mapped[Optional[float]] = mapped_column(Float, nullable=True)  # Percentage of correct answers
+    graded_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    revision: Mapped[int] = mapped_column(Integer, default=1, nullable=False)  # Latest entry of the revision log
 
     work = relationship(
         "Work",
         back_populates="answers",
-        lazy="selectin"
+        lazy="raise"
+    )
+
+
+class WorkAnswerRevision(Base):
+    """
+    Entry of a work answer's append-only revision log.
+    Snapshots hold the full answers; every other entry holds a delta against the previous revision.
+    """
+    __tablename__ = "work_answer_revisions"
+    __table_args__ = (
+        UniqueConstraint("answer_id", "revision", name="uq_work_answer_revisions_answer_id_revision"),
     )
+
+    answer_id: Mapped[int] = mapped_column(ForeignKey("work_answers.id", ondelete="CASCADE"), nullable=False)
+    revision: Mapped[int] = mapped_column(Integer, nullable=False)
+    is_snapshot: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    content: Mapped[list | dict] = mapped_column(JSON, nullable=False)  # See app.utils.revisions
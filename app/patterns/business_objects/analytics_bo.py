@@ -0,0 +1,117 @@
+import os
+from datetime import date, timedelta
+from decimal import Decimal
+from time import perf_counter
+from fastapi import Depends
+
+from app.patterns.data_access_objects.analytics_dao import AnalyticsDAO, get_analytics_dao
+from app.schemas.analytics_schemas import (
+    InstructorDashboardRead,
+    DailyRollupRead,
+    CourseTotalsRead,
+    PaymentTypeTotalsRead,
+    RollupRebuildRead,
+)
+from app.utils.rollups import RollupAccumulator
+from app.utils.exceptions import ValidationError
+from app.utils.metrics import timed_methods
+from app.utils.tracing import traced_methods
+
+ANALYTICS_REBUILD_CHUNK_SIZE = int(os.getenv("ANALYTICS_REBUILD_CHUNK_SIZE", "10000"))
+"""int: Number of payments aggregated per vectorized chunk of a rollup rebuild."""
+
+ANALYTICS_MAX_DAYS = int(os.getenv("ANALYTICS_MAX_DAYS", "366"))
+"""int: Longest period, in days, a dashboard can cover."""
+
+
+@timed_methods
+@traced_methods
+class AnalyticsBO:
+    """Business Object for revenue and enrollment analytics."""
+
+    def __init__(self, analytics_dao: AnalyticsDAO):
+        self.analytics_dao = analytics_dao
+
+    @classmethod
+    async def from_depends(cls, analytics_dao: AnalyticsDAO = Depends(get_analytics_dao)):
+        """Dependency injection factory method to create a BO instance with DAO dependencies."""
+        return cls(analytics_dao)
+
+    async def get_instructor_dashboard(
+            self, instructor_id: int, start: date | None = None, end: date | None = None, course_id: int | None = None
+    ) -> InstructorDashboardRead:
+        """
+        Build an instructor's dashboard from the precomputed daily rollups (last 30 days by default).
+        The rollups are read with a single indexed query; the totals are summed from them.
+        """
+        end = end or date.today()
+        start = start or end - timedelta(days=29)
+        if start > end:
+            raise ValidationError("The start date must not be after the end date")
+        if (end - start).days >= ANALYTICS_MAX_DAYS:
+            raise ValidationError(f"A dashboard covers at most {ANALYTICS_MAX_DAYS} days")
+
+        rows = await self.analytics_dao.get_instructor_rollups(
+            instructor_id=instructor_id,
+            start=start,
+            end=end,
+            course_id=course_id
+        )
+
+        by_course, by_payment_type = {}, {}
+        for row in rows:
+            course = by_course.setdefault(row.course_id, [row.title, 0, Decimal(0)])
+            course[1] += row.enrollments
+            course[2] += row.revenue
+            payment_type = by_payment_type.setdefault(row.payment_type, [0, Decimal(0)])
+            payment_type[0] += row.enrollments
+            payment_type[1] += row.revenue
+
+        return InstructorDashboardRead(
+            instructor_id=instructor_id,
+            start=start,
+            end=end,
+            enrollments=sum(row.enrollments for row in rows),
+            revenue=sum((row.revenue for row in rows), Decimal(0)),
+            by_course=[
+                CourseTotalsRead(course_id=course_id, title=title, enrollments=enrollments, revenue=revenue)
+                for course_id, (title, enrollments, revenue) in by_course.items()
+            ],
+            by_payment_type=[
+                PaymentTypeTotalsRead(payment_type=payment_type, enrollments=enrollments, revenue=revenue)
+                for payment_type, (enrollments, revenue) in by_payment_type.items()
+            ],
+            daily=[
+                DailyRollupRead(
+                    day=row.day,
+                    course_id=row.course_id,
+                    payment_type=row.payment_type,
+                    enrollments=row.enrollments,
+                    revenue=row.revenue
+                )
+                for row in rows
+            ]
+        )
+
+    async def rebuild_rollups(self, course_id: int | None = None) -> RollupRebuildRead:
+        """
+        Rebuild the daily rollups (of one course, or of every course) from the payments table.
+        Payments are streamed in chunks and aggregated with NumPy, then the rollups are replaced in one transaction.
+        """
+        start = perf_counter()
+        accumulator, payments = RollupAccumulator(), 0
+        async for rows in self.analytics_dao.stream_payment_facts(
+            chunk_size=ANALYTICS_REBUILD_CHUNK_SIZE,
+            course_id=course_id
+        ):
+            accumulator.add_chunk(rows)
+            payments += len(rows)
+
+        rollups = accumulator.rollups()
+        await self.analytics_dao.replace_rollups(rollups, course_id=course_id)
+        return RollupRebuildRead(
+            course_id=course_id,
+            payments=payments,
+            rollups=len(rollups),
+            elapsed_ms=round((perf_counter() - start) * 1000, 3)
+        )
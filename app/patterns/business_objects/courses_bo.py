@@ -1,4 +1,6 @@
 from typing import List, Optional
+
+import numpy as np
 from fastapi import Depends
 
 from app.patterns.data_access_objects.courses_dao import (
@@ -8,6 +10,7 @@ from app.patterns.data_access_objects.courses_dao import (
     get_lesson_dao,
 )
 from app.patterns.data_access_objects.payments_dao import PaymentDAO, get_payment_dao
+from app.patterns.business_objects.payments_bo import PaymentBO, payment_quotes
 from app.schemas.course_schemas import (
     CourseCreate,
     CourseRead,
@@ -16,10 +19,20 @@ from app.schemas.course_schemas import (
     LessonRead,
     LessonReadPartial,
     CourseReadPartial,
+    CourseStatisticsRead,
+    LessonCompletionRead,
+    StudentCompletionRead,
+    PrerequisiteStepRead,
+    CompletionHistogramBinRead,
 )
+from app.utils.completion import CompletionMatrix, completion_matrices
 from app.utils.exceptions import NotFoundError, PermissionDeniedError, ValidationError
+from app.utils.metrics import timed_methods
+from app.utils.tracing import traced_methods
 
 
+@timed_methods
+@traced_methods
 class CourseBO:
     """Business Object for Course operations with Composite and Chain of Responsibility patterns"""
 
@@ -48,6 +61,7 @@ class CourseBO:
         course_data_dict.update({"instructor_id": instructor_id})
 
         course = await self.course_dao.create_course(course_data=course_data_dict)
+        PaymentBO.refresh_quotes(course)
         return CourseRead(
             id=course.id,
             title=course.title,
@@ -121,7 +135,17 @@ class CourseBO:
             course=course,
             course_data=course_data.model_dump()
         )
-        return CourseReadPartial.model_validate(updated_course)
+        if course_data.price is not None:
+            PaymentBO.refresh_quotes(updated_course)
+        return CourseReadPartial(
+            id=updated_course.id,
+            title=updated_course.title,
+            description=updated_course.description,
+            price=updated_course.price,
+            is_active=updated_course.is_active,
+            instructor_id=updated_course.instructor_id,
+            instructor_name=updated_course.instructor.full_name
+        )
 
     async def delete_course(self, course_id: int, instructor_id: int):
         """Delete a course by its ID."""
@@ -131,6 +155,8 @@ class CourseBO:
         if course.instructor_id != instructor_id:
             raise PermissionDeniedError("You do not have permission to delete this course")
         await self.course_dao.delete_course(course=course)
+        payment_quotes.delete(course_id)
+        completion_matrices.delete(course_id)
 
     async def create_lessons(self, course_id: int, instructor_id: int, lesson_data: LessonCreate) -> LessonRead:
         """Add a new content item to a course."""
@@ -173,6 +199,7 @@ class CourseBO:
         lesson = await self.lesson_dao.create_lesson(
             lesson_data=lesson_data,
         )
+        completion_matrices.delete(course_id)
         return LessonRead.model_validate(lesson)
 
     async def get_lesson_by_id(self, course_id: int, lesson_id: int) -> Optional[LessonRead[LessonReadPartial]]:
@@ -208,6 +235,7 @@ class CourseBO:
                 "You do not have permission to delete lessons in this course"
             )
         await self.lesson_dao.delete_lesson(lesson=lesson)
+        completion_matrices.delete(course_id)
 
     async def clone_lesson(
         self, course_id: int, lesson_id: int, new_course_id: int, new_prerequisite_id: int,  instructor_id: int
@@ -233,4 +261,64 @@ class CourseBO:
             new_course_id=new_course_id,
             new_prerequisite_id=new_prerequisite_id
         )
+        completion_matrices.delete(new_course_id)
         return LessonRead.model_validate(cloned_lesson)
+
+    async def get_course_statistics(
+            self, course_id: int, requester_id: int, is_superuser: bool = False,
+            offset: int = 0, limit: int = 100, bins: int = 10
+    ) -> CourseStatisticsRead:
+        """
+        Get the completion statistics of a course, for its instructor or a superuser.
+        They are computed from the course's cached completion matrix, which is built with three
+        column-only queries on a miss and kept current by `mark_lesson_completed`.
+        """
+        course = await self.course_dao.get_course_by_id(course_id=course_id)
+        if not course:
+            raise NotFoundError("Course not found")
+        if course.instructor_id != requester_id and not is_superuser:
+            raise PermissionDeniedError("You do not have permission to view the statistics of this course")
+
+        matrix = completion_matrices.get(course_id)
+        if matrix is None or matrix.expired:
+            lessons, student_ids, completions = await self.lesson_dao.get_completion_facts(course_id=course_id)
+            matrix = CompletionMatrix(lessons=lessons, student_ids=student_ids, completions=completions)
+            completion_matrices.set(course_id, matrix)
+
+        students, lessons = len(matrix.student_ids), len(matrix.lesson_ids)
+        lesson_counts = matrix.lesson_counts().tolist()
+        student_counts = matrix.student_counts()
+        return CourseStatisticsRead(
+            course_id=course_id,
+            students=students,
+            lessons=lessons,
+            average_progress=round(float(student_counts.mean()) * 100 / lessons, 2) if students and lessons else 0.0,
+            completed_course=int(np.count_nonzero(student_counts == lessons)) if lessons else 0,
+            per_lesson=[
+                LessonCompletionRead(
+                    lesson_id=lesson_id,
+                    title=title,
+                    prerequisite_id=prerequisite_id,
+                    completed=count,
+                    completion_percentage=round(count * 100 / students, 2) if students else 0.0
+                )
+                for lesson_id, title, prerequisite_id, count in zip(
+                    matrix.lesson_ids, matrix.titles, matrix.prerequisite_ids, lesson_counts
+                )
+            ],
+            per_student=[
+                StudentCompletionRead(
+                    user_id=user_id,
+                    completed=count,
+                    progress_percentage=round(count * 100 / lessons, 2) if lessons else 0.0
+                )
+                for user_id, count in zip(
+                    matrix.student_ids[offset:offset + limit], student_counts[offset:offset + limit].tolist()
+                )
+            ],
+            prerequisite_chain=[PrerequisiteStepRead(**step) for step in matrix.chain()],
+            histogram=[
+                CompletionHistogramBinRead(lower=lower, upper=upper, students=count)
+                for lower, upper, count in matrix.histogram(bins=bins)
+            ]
+        )
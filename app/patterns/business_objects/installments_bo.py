@@ -0,0 +1,94 @@
+import logging
+from datetime import date, datetime, timedelta
+from typing import List
+from fastapi import Depends
+from sqlalchemy.exc import IntegrityError
+
+from app.models.payments import SettlementRun
+from app.patterns.data_access_objects.installments_dao import InstallmentDAO, get_installment_dao
+from app.schemas.payment_schemas import InstallmentRead, SettlementRunRead
+from app.utils.exceptions import NotFoundError, ConflictError
+from app.utils.metrics import timed_methods
+from app.utils.tracing import traced_methods
+
+
+@timed_methods
+@traced_methods
+class InstallmentBO:
+    """Business Object for the installments ledger and its batch settlement."""
+
+    def __init__(self, installment_dao: InstallmentDAO):
+        self.installment_dao = installment_dao
+
+    @classmethod
+    async def from_depends(cls, installment_dao: InstallmentDAO = Depends(get_installment_dao)):
+        """Dependency injection factory method to create a BO instance with DAO dependencies."""
+        return cls(installment_dao)
+
+    async def get_payment_installments(self, payment_id: int, user_id: int) -> List[InstallmentRead]:
+        """Get the installment schedule of one of the user's payments."""
+        installments = await self.installment_dao.get_installments_by_payment(
+            payment_id=payment_id,
+            user_id=user_id
+        )
+        if not installments:
+            raise NotFoundError("Payment not found")
+        return [InstallmentRead.model_validate(installment) for installment in installments]
+
+    async def get_settlement_run(self, run_id: int) -> SettlementRunRead:
+        """Get the progress of a settlement run."""
+        run = await self.installment_dao.get_run(run_id)
+        if not run:
+            raise NotFoundError("Settlement run not found")
+        return SettlementRunRead.model_validate(run)
+
+    async def open_settlement_run(self, as_of: date, owner: str, lease_seconds: int) -> SettlementRun:
+        """
+        Get the unfinished settlement run to resume it, or start a new one for `as_of`, and take its lease for `owner`.
+        Raises a ConflictError while another worker holds the lease and keeps checkpointing within `lease_seconds`.
+        """
+        run = await self.installment_dao.get_open_run()
+        if run is None:
+            try:
+                run = await self.installment_dao.create_run(as_of)
+            except IntegrityError:
+                # Another worker opened a run in the meantime
+                run = await self.installment_dao.get_open_run()
+        if run is None or not await self.installment_dao.claim_run(
+            run,
+            owner=owner,
+            expired_before=datetime.now() - timedelta(seconds=lease_seconds)
+        ):
+            raise ConflictError("A settlement run is already in progress")
+        return run
+
+    async def settle(self, run_id: int, batch_size: int, owner: str) -> SettlementRun:
+        """
+        Settle every installment due by the run's date, one keyset batch at a time.
+        Each batch is a single range UPDATE committed together with the run's checkpoint,
+        so an interrupted run picks up after the last committed batch.
+        Stops without settling further if `owner` loses the run's lease to another worker.
+        """
+        run = await self.installment_dao.get_run(run_id)
+        if not run:
+            raise NotFoundError("Settlement run not found")
+
+        while (upper_id := await self.installment_dao.get_batch_upper_bound(
+            as_of=run.as_of,
+            after_id=run.last_installment_id,
+            limit=batch_size
+        )) is not None:
+            if await self.installment_dao.settle_batch(
+                run, upper_id=upper_id, settled_at=datetime.now(), owner=owner
+            ) is None:
+                logging.warning(f"Settlement run {run_id} was taken over by another worker")
+                # The rollback expired the run, so read the new holder's progress back instead
+                return await self.installment_dao.get_run(run_id)
+
+        run = await self.installment_dao.finish_run(run, owner=owner)
+        logging.info(f"Settlement run {run.id} settled {run.settled} installments in {run.batches} batches")
+        return run
+
+    async def release_settlement_run(self, run_id: int, owner: str) -> None:
+        """Give up the lease of a settlement run, so another worker can resume it without waiting for it to expire."""
+        await self.installment_dao.release_run(run_id, owner=owner)
@@ -1,18 +1,31 @@
+import os
+from datetime import datetime, timedelta
 from fastapi import Depends
 from typing import List
 
 from app.models.users import UserManager, get_user_manager
 from app.patterns.data_access_objects.messages_dao import MessageDAO, get_message_dao
 from app.patterns.data_access_objects.courses_dao import CourseDAO, get_course_dao
-from app.schemas.message_schemas import MessageCreate, MessageRead
+from app.schemas.message_schemas import MessageCreate, MessageRead, MessageArchiveRead
 from app.patterns.mediator import CourseChatMediator
+from app.utils.metrics import timed_methods
+from app.utils.tracing import traced_methods
 
+MESSAGE_ARCHIVE_AFTER_DAYS = int(os.getenv("MESSAGE_ARCHIVE_AFTER_DAYS", "90"))
+"""int: Age in days after which chat messages are moved to the archive table."""
 
+MESSAGE_ARCHIVE_BATCH_SIZE = int(os.getenv("MESSAGE_ARCHIVE_BATCH_SIZE", "1000"))
+"""int: Number of messages moved to the archive per transaction."""
+
+
+@timed_methods
+@traced_methods
 class MessageBO:
     """Business Object that delegates to the Mediator for message exchange."""
 
-    def __init__(self, mediator: CourseChatMediator):
+    def __init__(self, mediator: CourseChatMediator, message_dao: MessageDAO):
         self.mediator = mediator
+        self.message_dao = message_dao
 
     @classmethod
     async def from_depends(
@@ -27,14 +40,37 @@ class MessageBO:
             user_manager=user_manager,
             course_dao=course_dao
         )
-        return cls(mediator)
+        return cls(mediator, message_dao)
 
     async def send_message(self, message_data: MessageCreate, sender_id: int) -> MessageRead:
         """Sends a message to the course chat."""
         message = await self.mediator.send_message(message_data, sender_id)
         return MessageRead.model_validate(message)
 
-    async def get_messages(self, course_id: int, user_id: int) -> List[MessageRead]:
-        """Retrieves all messages from a course chat."""
-        messages = await self.mediator.get_messages(course_id, user_id)
+    async def get_messages(
+            self, course_id: int, user_id: int, before_id: int | None = None, limit: int = 50
+    ) -> List[MessageRead]:
+        """Retrieves a page of messages from a course chat."""
+        messages = await self.mediator.get_messages(
+            course_id=course_id,
+            user_id=user_id,
+            before_id=before_id,
+            limit=limit
+        )
         return [MessageRead.model_validate(m) for m in messages]
+
+    async def archive_messages(self, older_than_days: int | None = None) -> MessageArchiveRead:
+        """Move every message older than the given age into the archive, batch by batch."""
+        days = older_than_days if older_than_days is not None else MESSAGE_ARCHIVE_AFTER_DAYS
+        cutoff = datetime.now() - timedelta(days=days)
+
+        archived = 0
+        while True:
+            moved = await self.message_dao.archive_messages_before(
+                cutoff=cutoff,
+                batch_size=MESSAGE_ARCHIVE_BATCH_SIZE
+            )
+            if not moved:
+                break
+            archived += moved
+        return MessageArchiveRead(archived=archived, cutoff=cutoff)
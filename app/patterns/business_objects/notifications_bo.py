@@ -0,0 +1,219 @@
+import os
+import logging
+from datetime import datetime, timedelta
+from typing import List, Dict, Tuple
+from fastapi import Depends
+
+from app.models.notifications import NotificationOutbox
+from app.patterns.data_access_objects.notifications_dao import NotificationDAO, get_notification_dao
+from app.patterns.data_access_objects.courses_dao import CourseDAO, get_course_dao
+from app.patterns.data_access_objects.payments_dao import PaymentDAO, get_payment_dao
+from app.patterns.observer import (
+    NotificationCenter, StudentObserver, InstructorObserver, dispatch_metrics
+)
+from app.schemas.notification_schemas import (
+    NotificationJobRead,
+    InboxNotificationRead,
+    NotificationCounterRead,
+    DispatchMetricsRead,
+)
+from app.utils.exceptions import NotFoundError, PermissionDeniedError
+from app.utils.metrics import timed_methods
+from app.utils.tracing import traced_methods
+
+NOTIFICATION_MAX_ATTEMPTS = int(os.getenv("NOTIFICATION_MAX_ATTEMPTS", "5"))
+"""int: Number of times an outbox entry is retried before it is marked as failed."""
+
+NOTIFICATION_RETRY_BACKOFF = float(os.getenv("NOTIFICATION_RETRY_BACKOFF", "30"))
+"""float: Seconds before a failed outbox entry is retried, doubled after every further failed attempt."""
+
+NOTIFICATION_RETRY_BACKOFF_MAX = float(os.getenv("NOTIFICATION_RETRY_BACKOFF_MAX", "3600"))
+"""float: Longest delay, in seconds, before a failed outbox entry is retried."""
+
+NOTIFICATION_DISPATCH_CONCURRENCY = int(os.getenv("NOTIFICATION_DISPATCH_CONCURRENCY", "100"))
+"""int: Maximum number of observers updated concurrently by a fan-out."""
+
+NOTIFICATION_DISPATCH_TIMEOUT = float(os.getenv("NOTIFICATION_DISPATCH_TIMEOUT", "5.0"))
+"""float: Seconds a single observer update may take before it is retried."""
+
+NOTIFICATION_DISPATCH_RETRIES = int(os.getenv("NOTIFICATION_DISPATCH_RETRIES", "2"))
+"""int: Number of retries for a failing observer update."""
+
+NOTIFICATION_DISPATCH_BACKOFF = float(os.getenv("NOTIFICATION_DISPATCH_BACKOFF", "0.1"))
+"""float: Initial backoff in seconds between retries, doubled on every attempt."""
+
+OBSERVER_TYPES = {
+    "student": StudentObserver,
+    "instructor": InstructorObserver,
+}
+"""dict: Observer class used for each recipient type of an outbox entry."""
+
+
+@timed_methods
+@traced_methods
+class NotificationBO:
+    """Business Object for the notification outbox and its Observer fan-out."""
+
+    def __init__(self, notification_dao: NotificationDAO, payment_dao: PaymentDAO, course_dao: CourseDAO):
+        self.notification_dao = notification_dao
+        self.payment_dao = payment_dao
+        self.course_dao = course_dao
+
+    @classmethod
+    async def from_depends(
+        cls,
+        notification_dao: NotificationDAO = Depends(get_notification_dao),
+        payment_dao: PaymentDAO = Depends(get_payment_dao),
+        course_dao: CourseDAO = Depends(get_course_dao),
+    ):
+        """Dependency injection factory method to create a BO instance with DAO dependencies."""
+        return cls(notification_dao, payment_dao, course_dao)
+
+    async def get_job(self, job_id: int, user_id: int, is_superuser: bool = False) -> NotificationJobRead:
+        """Get the delivery status of a notification job."""
+        entry = await self.notification_dao.get_outbox_entry(job_id)
+        if not entry:
+            raise NotFoundError("Notification job not found")
+
+        if not is_superuser and entry.recipient_id != user_id:
+            course = await self.course_dao.get_course_by_id(entry.course_id)
+            if not course or course.instructor_id != user_id:
+                raise PermissionDeniedError("You do not have permission to view this notification job")
+        return NotificationJobRead.model_validate(entry)
+
+    @staticmethod
+    def get_dispatch_metrics() -> DispatchMetricsRead:
+        """Get the fan-out counters and latency percentiles of this worker process."""
+        return DispatchMetricsRead(**dispatch_metrics.snapshot())
+
+    async def process_next_outbox_entry(self, batch_size: int = 500) -> bool:
+        """
+        Claim the next pending outbox entry and fan it out batch by batch.
+        Progress is checkpointed after every batch, so a retried entry resumes where it stopped; recipients
+        of a batch that could not be notified are re-queued as entries of their own. An entry for a single
+        recipient that could not be notified is released, to be retried after a backoff, instead of completed.
+        Returns True when an entry was fanned out, False when there was nothing to process or the entry failed.
+        """
+        entry = await self.notification_dao.claim_next_outbox_entry()
+        if not entry:
+            return False
+
+        try:
+            if entry.recipient_id is not None:
+                notifications, failed = await self._notify(entry, [entry.recipient_id])
+                if failed:
+                    raise RuntimeError(f"Recipient {entry.recipient_id} could not be notified")
+                await self.deliver(entry, notifications, cursor=entry.cursor)
+            else:
+                while batch := await self.payment_dao.get_enrolled_user_ids(
+                    course_id=entry.course_id,
+                    after_payment_id=entry.cursor,
+                    limit=batch_size
+                ):
+                    notifications, failed = await self._notify(entry, [user_id for _, user_id in batch])
+                    await self.deliver(entry, notifications, cursor=batch[-1][0], failed_recipient_ids=failed)
+            await self.notification_dao.complete_outbox_entry(entry)
+        except Exception as e:  # noqa
+            entry_id, attempts = entry.id, entry.attempts
+            logging.exception(f"Failed to fan out notification job {entry_id}")
+            await self.notification_dao.release_outbox_entry(
+                entry,
+                error=str(e),
+                max_attempts=NOTIFICATION_MAX_ATTEMPTS,
+                retry_at=datetime.now() + timedelta(seconds=self.retry_backoff(attempts))
+            )
+            return False
+        return True
+
+    @staticmethod
+    def retry_backoff(attempts: int) -> float:
+        """Seconds before an entry that failed its `attempts`-th attempt is retried."""
+        return min(NOTIFICATION_RETRY_BACKOFF * 2 ** (attempts - 1), NOTIFICATION_RETRY_BACKOFF_MAX)
+
+    async def requeue_stale_entries(self, stale_after: int) -> int:
+        """Hand entries left in processing by a worker that died back to the pending queue and return how many."""
+        return await self.notification_dao.requeue_stale_outbox_entries(
+            older_than=datetime.now() - timedelta(seconds=stale_after)
+        )
+
+    @staticmethod
+    async def _notify(entry: NotificationOutbox, recipient_ids: List[int]) -> Tuple[List[Dict], List[int]]:
+        """Run one batch of recipients through the Observer pattern; returns the notifications and failed recipients."""
+        observer_class = OBSERVER_TYPES[entry.recipient_type]
+        notification_center = NotificationCenter(
+            max_concurrency=NOTIFICATION_DISPATCH_CONCURRENCY,
+            timeout=NOTIFICATION_DISPATCH_TIMEOUT,
+            retries=NOTIFICATION_DISPATCH_RETRIES,
+            backoff=NOTIFICATION_DISPATCH_BACKOFF,
+        )
+        observers = [observer_class(recipient_id) for recipient_id in recipient_ids]
+        for observer in observers:
+            notification_center.attach(observer)
+        notifications = await notification_center.notify(entry.render_message())
+        failed = set(notification_center.failed)
+        return notifications, [
+            recipient_id for recipient_id, observer in zip(recipient_ids, observers) if observer in failed
+        ]
+
+    async def deliver(
+            self, entry: NotificationOutbox, notifications: List[Dict], cursor: int,
+            failed_recipient_ids: List[int] | None = None
+    ):
+        """
+        Deliver a batch of notifications produced by the observers to the recipients' inboxes,
+        re-queuing the recipients that could not be notified.
+        """
+        delivered = await self.notification_dao.deliver_to_inbox(
+            notifications, entry=entry, cursor=cursor, failed_recipient_ids=failed_recipient_ids
+        )
+        if failed_recipient_ids:
+            logging.warning(
+                f"Notification job {entry.id}: re-queued {len(failed_recipient_ids)} recipients that failed"
+            )
+        logging.debug(f"Notification job {entry.id}: delivered {delivered} notifications")
+
+    async def get_inbox(
+            self, user_id: int, before_id: int | None = None, limit: int = 50
+    ) -> List[InboxNotificationRead]:
+        """Get a page of the user's inbox, newest first."""
+        counter = await self.notification_dao.get_counter(user_id)
+        last_read_id = counter.last_read_id if counter else 0
+
+        notifications = await self.notification_dao.get_inbox(
+            recipient_id=user_id,
+            before_id=before_id,
+            limit=limit
+        )
+        return [
+            InboxNotificationRead(
+                id=notification.id,
+                recipient_type=notification.recipient_type,
+                message=notification.message,
+                job_id=notification.job_id,
+                created_at=notification.created_at,
+                is_read=notification.id <= last_read_id,
+            )
+            for notification in notifications
+        ]
+
+    async def get_unread_count(self, user_id: int) -> NotificationCounterRead:
+        """Get the user's unread counter, without scanning the inbox."""
+        counter = await self.notification_dao.get_counter(user_id)
+        if not counter:
+            return NotificationCounterRead(unread_count=0, last_read_id=0)
+        return NotificationCounterRead.model_validate(counter)
+
+    async def mark_read(self, user_id: int, up_to_id: int) -> NotificationCounterRead:
+        """Mark every notification of the user up to the given ID as read."""
+        counter = await self.notification_dao.mark_read_up_to(recipient_id=user_id, up_to_id=up_to_id)
+        if not counter:
+            return NotificationCounterRead(unread_count=0, last_read_id=0)
+        return NotificationCounterRead.model_validate(counter)
+
+    async def reconcile_counters(self, batch_size: int = 1000) -> int:
+        """Recount every user's unread counter from their inbox in keyset batches; returns how many had drifted."""
+        fixed, after_id = 0, 0
+        while after_id is not None:
+            after_id, drifted = await self.notification_dao.reconcile_counters(after_id=after_id, limit=batch_size)
+            fixed += drifted
+        return fixed
@@ -1,57 +1,124 @@
+import os
+import json
+import hashlib
+from types import SimpleNamespace
 from typing import List, Optional, Any
 from decimal import Decimal
+from datetime import datetime, timedelta
 from fastapi import Depends
+from sqlalchemy.exc import IntegrityError
 
-from app.models.payments import PaymentTypeEnum
-from app.patterns.strategy import (
-    PaymentContext,
-    CreditCardPaymentStrategy,
-    BilletPaymentStrategy,
-    PixPaymentStrategy
-)
+from app.models.courses import Course
+from app.patterns.strategy import payment_strategies
 from app.patterns.data_access_objects.courses_dao import CourseDAO, get_course_dao
 from app.patterns.data_access_objects.payments_dao import PaymentDAO, get_payment_dao
-from app.schemas.payment_schemas import PaymentCreate, PaymentRead, CourseReadPartial
-from app.utils.exceptions import NotFoundError, ValidationError
+from app.patterns.data_access_objects.idempotency_dao import IdempotencyDAO, get_idempotency_dao
+from app.patterns.data_access_objects.analytics_dao import AnalyticsDAO, get_analytics_dao
+from app.models.idempotency import IdempotencyKey
+from app.schemas.payment_schemas import (
+    PaymentCreate, PaymentRead, CourseReadPartial, CourseQuoteRead,
+    BulkEnrollmentCreate, BulkEnrollmentRead, BulkEnrollmentRowRead, BULK_ENROLLMENT_MAX_ROWS
+)
+from app.utils.cache import LRUCache
+from app.utils.completion import completion_matrices
+from app.utils.exceptions import NotFoundError, ValidationError, ConflictError, PermissionDeniedError
+from app.utils.metrics import timed_methods
+from app.utils.tracing import traced_methods
+
+IDEMPOTENCY_KEY_TTL = int(os.getenv("IDEMPOTENCY_KEY_TTL", "86400"))
+"""int: Seconds during which a repeated request with the same Idempotency-Key gets the stored response."""
+
+PAYMENT_QUOTE_CACHE_SIZE = int(os.getenv("PAYMENT_QUOTE_CACHE_SIZE", "4096"))
+"""int: Maximum number of courses whose quote table is kept in memory."""
+
+PAYMENT_QUOTE_CACHE_TTL = int(os.getenv("PAYMENT_QUOTE_CACHE_TTL", "60"))
+"""int: Seconds a cached quote table is served; bounds how stale another worker's table can be after a price change."""
+
+BULK_ENROLLMENT_BATCH_SIZE = int(os.getenv("BULK_ENROLLMENT_BATCH_SIZE", "1000"))
+"""int: Number of rows validated and inserted per batched statement of a bulk enrollment."""
+
+INSTALLMENT_PERIOD_DAYS = int(os.getenv("INSTALLMENT_PERIOD_DAYS", "30"))
+"""int: Days between two installments of a payment's schedule."""
 
+payment_quotes = LRUCache(maxsize=PAYMENT_QUOTE_CACHE_SIZE, ttl=PAYMENT_QUOTE_CACHE_TTL, name="payment_quotes")
+"""
+LRUCache: Quote table of each course, by course ID. It is per worker: a price change rebuilds the table of the
+worker that made it, while the other workers serve theirs until it expires. Payments are always charged
+on the current price, so a stale table only affects what is displayed.
+"""
 
+
+@timed_methods
+@traced_methods
 class PaymentBO:
     """Business Object for Payment operations."""
 
-    def __init__(self, payment_dao: PaymentDAO, course_dao: CourseDAO):
+    def __init__(
+            self, payment_dao: PaymentDAO, course_dao: CourseDAO, idempotency_dao: IdempotencyDAO,
+            analytics_dao: AnalyticsDAO
+    ):
         self.payment_dao = payment_dao
         self.course_dao = course_dao
+        self.idempotency_dao = idempotency_dao
+        self.analytics_dao = analytics_dao
 
     @classmethod
     async def from_depends(cls,
             payment_dao: PaymentDAO = Depends(get_payment_dao),
-            course_dao: CourseDAO = Depends(get_course_dao)
+            course_dao: CourseDAO = Depends(get_course_dao),
+            idempotency_dao: IdempotencyDAO = Depends(get_idempotency_dao),
+            analytics_dao: AnalyticsDAO = Depends(get_analytics_dao)
     ):
         """Dependency injection factory method to create a BO instance with DAO dependencies."""
-        return cls(payment_dao, course_dao)
+        return cls(payment_dao, course_dao, idempotency_dao, analytics_dao)
 
     @staticmethod
     async def apply_payment_strategy(amount: Decimal, payment_type) -> dict[str, Any]:
-        """Apply the appropriate payment strategy based on the payment type."""
-        match payment_type:
-            case PaymentTypeEnum.CREDIT_CARD:
-                strategy = CreditCardPaymentStrategy()
-            case PaymentTypeEnum.BILLET:
-                strategy = BilletPaymentStrategy()
-            case PaymentTypeEnum.PIX:
-                strategy = PixPaymentStrategy()
-            case _:
-                raise ValidationError(f"Unsupported payment type: {payment_type}")
-
-        context = PaymentContext(strategy)
-        return context.process_payment(
-            amount=float(amount),
-            payment_type=payment_type
-        )
+        """Apply the payment strategy registered for the payment type."""
+        try:
+            return payment_strategies.process_payment(amount=Decimal(amount), payment_type=payment_type)
+        except KeyError:
+            raise ValidationError(f"Unsupported payment type: {payment_type}")
+
+    @staticmethod
+    def refresh_quotes(course: Course) -> CourseQuoteRead:
+        """Precompute and cache the quote table of a course; called whenever its price is set."""
+        quotes = payment_strategies.quote(Decimal(str(course.price))) if course.price is not None else []
+        quote_table = CourseQuoteRead(course_id=course.id, price=course.price, quotes=quotes)
+        payment_quotes.set(course.id, quote_table)
+        return quote_table
+
+    async def get_quotes(self, course_id: int) -> CourseQuoteRead:
+        """
+        Get every payment option of a course from the quote cache.
+        On a miss (cache evicted, or a course priced by another process) the table is rebuilt once.
+        """
+        quote_table = payment_quotes.get(course_id)
+        if quote_table is not None:
+            return quote_table
+
+        course = await self.course_dao.get_course_by_id(course_id=course_id)
+        if not course:
+            raise NotFoundError("Course not found")
+        return self.refresh_quotes(course)
 
     async def create_payment(
-            self, payment_data: PaymentCreate, user_id: int, course_id: int
+            self, payment_data: PaymentCreate, user_id: int, course_id: int, idempotency_key: str | None = None
     ) -> PaymentRead[CourseReadPartial]:
+        """
+        Create a payment for a course.
+        With an idempotency key, repeats of the same request get the stored response from a single lookup;
+        otherwise the key is claimed in the same transaction as the payment, so both commit together.
+        Duplicate payments are rejected by the (user, course) unique key rather than a prior SELECT.
+        The course's daily analytics rollup is incremented in the same transaction.
+        """
+        record = None
+        if idempotency_key is not None:
+            request_hash = self._request_hash(f"POST /payments/course/{course_id}", payment_data)
+            stored = await self.idempotency_dao.get_key(user_id=user_id, key=idempotency_key)
+            if stored is not None:
+                return self._replay_payment(stored, request_hash)
+
         course = await self.course_dao.get_course_by_id(course_id=course_id)
         if not course:
             raise NotFoundError("Course not found")
@@ -59,27 +126,45 @@ class PaymentBO:
         if payment_data.amount != course.price:
             raise ValidationError("Payment amount does not match course price")
 
-        already_paid = await self.payment_dao.get_payment_get_by_course_id(
-            course_id=course_id,
-            user_id=user_id
-        )
-        if already_paid:
-            raise ValidationError("Payment for this course has already been made")
-
         strategy = await self.apply_payment_strategy(
             amount=payment_data.amount,
             payment_type=payment_data.payment_type
         )
 
+        if idempotency_key is not None:
+            record = await self.idempotency_dao.claim_key(
+                user_id=user_id,
+                key=idempotency_key,
+                request_hash=request_hash,
+                expires_at=datetime.now() + timedelta(seconds=IDEMPOTENCY_KEY_TTL)
+            )
+            if record is None:
+                stored = await self.idempotency_dao.get_key(user_id=user_id, key=idempotency_key)
+                if stored is None or stored.response is None:
+                    raise ConflictError("A request with this Idempotency-Key is still being processed")
+                return self._replay_payment(stored, request_hash)
+
         payment_data_dict = payment_data.model_dump()
         payment_data_dict.update({
             "user_id": user_id,
             "course_id": course_id,
             "amount": strategy["amount"],
             "installments": strategy["installments"],
+            "total": strategy["total"],
         })
 
-        payment = await self.payment_dao.create_payment(payment_data=payment_data_dict)
+        try:
+            payment = await self.payment_dao.create_payment(
+                payment_data=payment_data_dict,
+                commit=False,
+                installment_period_days=INSTALLMENT_PERIOD_DAYS
+            )
+        except IntegrityError:
+            raise ValidationError("Payment for this course has already been made")
+        await self.analytics_dao.add_enrollments(
+            self._enrollment_rollups(course, [payment]),
+            commit=record is None
+        )
 
         payment_dict = payment.__dict__.copy()
         payment_dict.update(
@@ -93,7 +178,161 @@ class PaymentBO:
                 instructor_name=course.instructor.full_name
             )
         )
-        return PaymentRead[CourseReadPartial](**payment_dict)
+        response = PaymentRead[CourseReadPartial](**payment_dict)
+
+        if record is not None:
+            await self.idempotency_dao.save_response(
+                record,
+                status_code=200,
+                response=response.model_dump(mode="json")
+            )
+        # Only dropped once the payment is committed, or a concurrent read could cache a matrix without it
+        completion_matrices.delete(course_id)
+        return response
+
+    async def bulk_enroll(
+            self, course_id: int, enrollment_data: BulkEnrollmentCreate, requester_id: int, is_superuser: bool = False
+    ) -> BulkEnrollmentRead:
+        """
+        Enroll many users in a course at the course price, for its instructor or a superuser.
+        Rows are validated with set-based queries and the valid ones are inserted in batches in one
+        transaction, together with the course's analytics rollups; the report has the outcome of every row.
+        Repeated users only count once.
+        """
+        rows = enrollment_data.enrollments
+        # The schema already refuses larger requests; this guards callers building the schema themselves
+        if len(rows) > BULK_ENROLLMENT_MAX_ROWS:
+            raise ValidationError(f"A bulk enrollment accepts at most {BULK_ENROLLMENT_MAX_ROWS} rows")
+
+        course = await self.course_dao.get_course_by_id(course_id=course_id)
+        if not course:
+            raise NotFoundError("Course not found")
+        if course.instructor_id != requester_id and not is_superuser:
+            raise PermissionDeniedError("You do not have permission to enroll users in this course")
+        if course.price is None:
+            raise ValidationError("This course has no price")
+
+        user_ids = list(dict.fromkeys(row.user_id for row in rows))
+        active_ids = await self.payment_dao.get_active_user_ids(user_ids, batch_size=BULK_ENROLLMENT_BATCH_SIZE)
+        paid_ids = await self.payment_dao.get_paid_user_ids(
+            course_id=course_id,
+            user_ids=user_ids,
+            batch_size=BULK_ENROLLMENT_BATCH_SIZE
+        )
+
+        # The strategy runs once per payment type, not once per row
+        price = Decimal(str(course.price))
+        charges = {
+            payment_type: await self.apply_payment_strategy(amount=price, payment_type=payment_type)
+            for payment_type in {row.payment_type for row in rows}
+        }
+
+        statuses, payments, seen = [], [], set()
+        for row in rows:
+            if row.user_id in seen:
+                statuses.append("duplicate")
+            elif row.user_id not in active_ids:
+                statuses.append("user_not_found")
+            elif row.user_id in paid_ids:
+                statuses.append("already_enrolled")
+            else:
+                statuses.append("enrolled")
+                payments.append({
+                    "user_id": row.user_id,
+                    "course_id": course_id,
+                    "payment_type": row.payment_type,
+                    "amount": charges[row.payment_type]["amount"],
+                    "installments": charges[row.payment_type]["installments"],
+                    "total": charges[row.payment_type]["total"],
+                })
+            seen.add(row.user_id)
+
+        try:
+            created = await self.payment_dao.bulk_create_payments(
+                course_id=course_id,
+                payments=payments,
+                batch_size=BULK_ENROLLMENT_BATCH_SIZE,
+                installment_period_days=INSTALLMENT_PERIOD_DAYS,
+                commit=False
+            ) if payments else {}
+        except IntegrityError as exc:
+            if await self._enrollment_changed(course_id, [payment["user_id"] for payment in payments]):
+                raise ConflictError(
+                    "Some of these users were enrolled or removed by another request; retry the enrollment"
+                ) from exc
+            raise
+        if payments:
+            await self.analytics_dao.add_enrollments(self._enrollment_rollups(
+                course,
+                [
+                    SimpleNamespace(created_at=created[payment["user_id"]].created_at, **payment)
+                    for payment in payments
+                ]
+            ), commit=True)
+            # Only dropped once the payments are committed, or a concurrent read could cache a matrix without them
+            completion_matrices.delete(course_id)
+
+        results = []
+        for index, (row, status) in enumerate(zip(rows, statuses)):
+            enrolled = status == "enrolled"
+            results.append(BulkEnrollmentRowRead(
+                index=index,
+                user_id=row.user_id,
+                status=status,
+                payment_id=created[row.user_id].id if enrolled else None,
+                amount=charges[row.payment_type]["amount"] if enrolled else None,
+                installments=charges[row.payment_type]["installments"] if enrolled else None,
+            ))
+        return BulkEnrollmentRead(
+            course_id=course_id,
+            enrolled=len(payments),
+            skipped=len(rows) - len(payments),
+            results=results
+        )
+
+    async def _enrollment_changed(self, course_id: int, user_ids: List[int]) -> bool:
+        """
+        Whether users validated for a bulk enrollment have since paid for the course or been removed,
+        in which case a retry reports them correctly; the rejected insert is checked again, not its error message.
+        """
+        paid_ids = await self.payment_dao.get_paid_user_ids(
+            course_id=course_id,
+            user_ids=user_ids,
+            batch_size=BULK_ENROLLMENT_BATCH_SIZE
+        )
+        active_ids = await self.payment_dao.get_active_user_ids(user_ids, batch_size=BULK_ENROLLMENT_BATCH_SIZE)
+        return bool(paid_ids) or len(active_ids) < len(user_ids)
+
+    @staticmethod
+    def _enrollment_rollups(course: Course, payments: List[Any]) -> List[dict[str, Any]]:
+        """Group new payments of a course into increments of its daily rollups, by payment day and type."""
+        rollups = {}
+        for payment in payments:
+            key = (payment.created_at.date(), payment.payment_type)
+            rollup = rollups.setdefault(key, {
+                "day": key[0],
+                "course_id": course.id,
+                "instructor_id": course.instructor_id,
+                "payment_type": key[1],
+                "enrollments": 0,
+                "revenue": Decimal(0),
+            })
+            rollup["enrollments"] += 1
+            rollup["revenue"] += Decimal(str(payment.total))
+        return list(rollups.values())
+
+    @staticmethod
+    def _request_hash(endpoint: str, payload: PaymentCreate) -> str:
+        """Fingerprint a request, so a key reused for a different request can be told apart from a retry."""
+        body = json.dumps({"endpoint": endpoint, "body": payload.model_dump(mode="json")}, sort_keys=True)
+        return hashlib.sha256(body.encode()).hexdigest()
+
+    @staticmethod
+    def _replay_payment(stored: IdempotencyKey, request_hash: str) -> PaymentRead[CourseReadPartial]:
+        """Return the stored response of a repeated request."""
+        if stored.request_hash != request_hash:
+            raise ValidationError("This Idempotency-Key was already used for a different request")
+        return PaymentRead[CourseReadPartial].model_validate(stored.response)
 
     async def get_payment_by_id(self, payment_id: int, user_id: int) -> Optional[PaymentRead[CourseReadPartial]]:
         """Get a payment by its ID."""
@@ -7,8 +7,12 @@ from app.patterns.chain_of_responsability import ConcreteLessonProgressHandler
 from app.patterns.data_access_objects.courses_dao import LessonDAO, get_lesson_dao
 from app.patterns.data_access_objects.payments_dao import PaymentDAO, get_payment_dao
 from app.utils.exceptions import PermissionDeniedError, NotFoundError
+from app.utils.metrics import timed_methods
+from app.utils.tracing import traced_methods
 
 
+@timed_methods
+@traced_methods
 class StudentBO:
     """Business Object for Student operations."""
 
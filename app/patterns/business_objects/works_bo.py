@@ -1,22 +1,50 @@
+import io
+import os
+import csv
+import json
+import asyncio
+from time import perf_counter
+from datetime import datetime, timedelta
 from fastapi import Depends
-from typing import List
+from typing import List, AsyncIterator
 
+from app.db.database import async_session_maker
 from app.models.users import UserManager, get_user_manager
 from app.schemas.work_schemas import (
     WorkCreate, WorkRead, WorkAnswerCreate, WorkAnswerRead,
-    WorkWithNotifications, WorkAnswerWithNotifications, NotificationRead
+    WorkWithNotifications, WorkAnswerWithNotifications, NotificationRead,
+    GradeRequest, GradingResultRead, WorkAnswerRevisionRead, WorkAnswerRevisionContentRead
 )
 from app.patterns.data_access_objects.works_dao import (
     WorkDAO, WorkAnswerDAO, get_work_dao, get_work_answer_dao
 )
 from app.patterns.data_access_objects.courses_dao import CourseDAO, get_course_dao
 from app.patterns.data_access_objects.payments_dao import PaymentDAO, get_payment_dao
-from app.patterns.observer import (
-    NotificationCenter, StudentObserver, InstructorObserver
-)
+from app.patterns.data_access_objects.notifications_dao import NotificationDAO, get_notification_dao
+from app.patterns.observer import NotificationCenter, InstructorObserver
+from app.schemas.notification_schemas import NotificationJobRead
+from app.utils.grading import AnswerGrader
+from app.utils.revisions import replay
 from app.utils.exceptions import ValidationError, NotFoundError, PermissionDeniedError
+from app.workers.notifications_worker import notification_workers
+from app.utils.metrics import timed_methods
+from app.utils.tracing import traced_methods
+
+NOTIFICATION_DIGEST_WINDOW = int(os.getenv("NOTIFICATION_DIGEST_WINDOW", "300"))
+"""int: Seconds during which answer notifications for the same work are coalesced into one."""
+
+GRADING_CHUNK_SIZE = int(os.getenv("GRADING_CHUNK_SIZE", "5000"))
+"""int: Number of answers scored and persisted per batch of a grading job."""
+
+ANSWER_EXPORT_CHUNK_SIZE = int(os.getenv("ANSWER_EXPORT_CHUNK_SIZE", "1000"))
+"""int: Number of answers fetched from the server-side cursor per chunk of an export."""
 
+ANSWER_SNAPSHOT_INTERVAL = int(os.getenv("ANSWER_SNAPSHOT_INTERVAL", "10"))
+"""int: Every how many revisions an answer is stored as a full snapshot instead of a delta."""
 
+
+@timed_methods
+@traced_methods
 class WorkBO:
     """Business Object for handling works and answers with Observer notifications."""
 
@@ -26,12 +54,14 @@ class WorkBO:
         work_answer_dao: WorkAnswerDAO,
         course_dao: CourseDAO,
         payment_dao: PaymentDAO,
+        notification_dao: NotificationDAO,
         user_manager: UserManager
     ):
         self.work_dao = work_dao
         self.work_answer_dao = work_answer_dao
         self.course_dao = course_dao
         self.payment_dao = payment_dao
+        self.notification_dao = notification_dao
         self.user_manager = user_manager
 
     @classmethod
@@ -41,13 +71,17 @@ class WorkBO:
         work_answer_dao: WorkAnswerDAO = Depends(get_work_answer_dao),
         course_dao: CourseDAO = Depends(get_course_dao),
         payment_dao: PaymentDAO = Depends(get_payment_dao),
+        notification_dao: NotificationDAO = Depends(get_notification_dao),
         user_manager: UserManager = Depends(get_user_manager),
     ):
         """Dependency injection factory method to create a WorkBO instance with DAO dependencies."""
-        return cls(work_dao, work_answer_dao, course_dao, payment_dao, user_manager)
+        return cls(work_dao, work_answer_dao, course_dao, payment_dao, notification_dao, user_manager)
 
     async def create_work(self, work_data: WorkCreate, instructor_id: int) -> WorkWithNotifications:
-        """Instructor posts a new work and students are notified."""
+        """
+        Instructor posts a new work and students are notified.
+        The notification is written to the outbox and fanned out by the background workers.
+        """
         course = await self.course_dao.get_course_by_id(work_data.course_id)
         if not course:
             raise NotFoundError("Course not found")
@@ -59,14 +93,12 @@ class WorkBO:
         work_dict = work_data.model_dump()
         work = await self.work_dao.create_work(work_dict)
 
-        payments, _ = await self.payment_dao.get_all_payments_by_course(course.id)
-        notification_center = NotificationCenter()
-        for payment in payments:
-            notification_center.attach(StudentObserver(payment.user_id))
-
-        messages = await notification_center.notify(
-            f"New work posted in course '{course.title}': {work.title}"
-        )
+        outbox_entry = await self.notification_dao.create_outbox_entry({
+            "message": f"New work posted in course '{course.title}': {work.title}",
+            "recipient_type": "student",
+            "course_id": course.id,
+        })
+        notification_workers.wake()
 
         return WorkWithNotifications(
             work=WorkRead(
@@ -75,7 +107,7 @@ class WorkBO:
                 questions=work.questions,
                 course_id=work.course_id
             ),
-            notifications=[NotificationRead(**msg) for msg in messages]
+            notification_job=NotificationJobRead.model_validate(outbox_entry)
         )
 
     async def delete_work(self, work_id: int, instructor_id: int):
@@ -110,7 +142,10 @@ class WorkBO:
             "answers": answer_data.answers
         }
 
-        answer = await self.work_answer_dao.submit_or_update_answer(answer_dict)
+        answer = await self.work_answer_dao.submit_or_update_answer(
+            answer_dict,
+            snapshot_interval=ANSWER_SNAPSHOT_INTERVAL
+        )
 
         # Notify the instructor about the new or updated answer
         course = await self.course_dao.get_course_by_id(work.course_id)
@@ -120,6 +155,14 @@ class WorkBO:
         messages = await notification_center.notify(
             f"Student {student_id} submitted/updated an answer to work '{work.title}'."
         )
+        # Digest stage: resubmits within the window reach the instructor as a single notification
+        await self.notification_dao.queue_digest(
+            notifications=messages,
+            course_id=work.course_id,
+            work_id=work.id,
+            digest_message=f"{{count}} new/updated answers to work '{work.title}'.",
+            available_at=datetime.now() + timedelta(seconds=NOTIFICATION_DIGEST_WINDOW),
+        )
 
         return WorkAnswerWithNotifications(
             answer=WorkAnswerRead(
@@ -127,7 +170,9 @@ class WorkBO:
                 work_id=answer.work_id,
                 student_id=answer.student_id,
                 answers=answer.answers,
-                updated_at=answer.updated_at
+                updated_at=answer.updated_at,
+                score=answer.score,
+                revision=answer.revision
             ),
             notifications=[NotificationRead(**msg) for msg in messages]
         )
@@ -145,20 +190,80 @@ class WorkBO:
             for w in works
         ]
 
-    async def list_answers_by_work(self, work_id: int) -> List[WorkAnswerRead]:
-        """Retrieve all answers submitted for a specific work."""
-        answers = await self.work_answer_dao.get_answers_by_work(work_id)
+    async def list_answers_by_work(
+            self, work_id: int, after_id: int | None = None, limit: int = 100
+    ) -> List[WorkAnswerRead]:
+        """Retrieve a page of answers submitted for a specific work."""
+        answers = await self.work_answer_dao.get_answers_by_work(
+            work_id=work_id,
+            after_id=after_id,
+            limit=limit
+        )
         return [
             WorkAnswerRead(
                 id=a.id,
                 work_id=a.work_id,
                 student_id=a.student_id,
                 answers=a.answers,
-                updated_at=a.updated_at
+                updated_at=a.updated_at,
+                score=a.score,
+                revision=a.revision
             )
             for a in answers
         ]
-    
+
+    async def export_answers(self, work_id: int, instructor_id: int, export_format: str) -> AsyncIterator[str]:
+        """
+        Check the instructor owns the work and return a stream of its answers as CSV or NDJSON.
+        The stream uses its own session, since request-scoped sessions close before a streamed body is sent.
+        """
+        work = await self.work_dao.get_work_by_id(work_id)
+        if not work:
+            raise NotFoundError("Work not found")
+        course = await self.course_dao.get_course_by_id(work.course_id)
+        if course.instructor_id != instructor_id:
+            raise PermissionDeniedError("You do not have permission to export answers for this work")
+
+        formatter = self._format_csv_chunk if export_format == "csv" else self._format_ndjson_chunk
+
+        async def stream() -> AsyncIterator[str]:
+            if export_format == "csv":
+                yield "id,work_id,student_id,answers,score,updated_at\r\n"
+            async with async_session_maker() as session:
+                async for rows in WorkAnswerDAO(session).stream_answers_by_work(
+                    work_id=work_id,
+                    chunk_size=ANSWER_EXPORT_CHUNK_SIZE
+                ):
+                    yield formatter(work_id, rows)
+
+        return stream()
+
+    @staticmethod
+    def _format_csv_chunk(work_id: int, rows) -> str:
+        """Format a chunk of answer rows as CSV lines."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerows(
+            (row.id, work_id, row.student_id, json.dumps(row.answers), row.score, row.updated_at.isoformat())
+            for row in rows
+        )
+        return buffer.getvalue()
+
+    @staticmethod
+    def _format_ndjson_chunk(work_id: int, rows) -> str:
+        """Format a chunk of answer rows as newline-delimited JSON."""
+        return "".join(
+            json.dumps({
+                "id": row.id,
+                "work_id": work_id,
+                "student_id": row.student_id,
+                "answers": row.answers,
+                "score": row.score,
+                "updated_at": row.updated_at.isoformat(),
+            }) + "\n"
+            for row in rows
+        )
+
     async def get_my_answer_for_work(self, work_id: int, student_id: int) -> WorkAnswerRead:
         """Retrieve the student's own answer for a specific work."""
         work = await self.work_dao.get_work_by_id(work_id)
@@ -183,7 +288,99 @@ class WorkBO:
             work_id=answer.work_id,
             student_id=answer.student_id,
             answers=answer.answers,
-            updated_at=answer.updated_at
+            updated_at=answer.updated_at,
+            score=answer.score,
+            revision=answer.revision
+        )
+
+    async def list_answer_revisions(
+            self, answer_id: int, user_id: int, after_revision: int = 0, limit: int = 100
+    ) -> List[WorkAnswerRevisionRead]:
+        """List a page of an answer's revision log, for the student who owns it or the course's instructor."""
+        await self._get_readable_answer(answer_id=answer_id, user_id=user_id)
+        revisions = await self.work_answer_dao.get_revisions(
+            answer_id=answer_id,
+            after_revision=after_revision,
+            limit=limit
+        )
+        return [WorkAnswerRevisionRead.model_validate(revision) for revision in revisions]
+
+    async def get_answer_revision(self, answer_id: int, revision: int, user_id: int) -> WorkAnswerRevisionContentRead:
+        """Rebuild the answers of a given revision by replaying deltas from the nearest snapshot."""
+        await self._get_readable_answer(answer_id=answer_id, user_id=user_id)
+        chain = await self.work_answer_dao.get_revision_chain(answer_id=answer_id, revision=revision)
+        if not chain or chain[-1].revision != revision:
+            raise NotFoundError("Revision not found")
+
+        return WorkAnswerRevisionContentRead(
+            answer_id=answer_id,
+            revision=revision,
+            answers=replay(chain),
+            created_at=chain[-1].created_at,
+            replayed=len(chain) - 1
+        )
+
+    async def _get_readable_answer(self, answer_id: int, user_id: int):
+        """Get an answer, checking the user is the student who submitted it or the course's instructor."""
+        answer = await self.work_answer_dao.get_answer_by_id(answer_id)
+        if not answer:
+            raise NotFoundError("Answer not found")
+        if answer.student_id == user_id:
+            return answer
+
+        work = await self.work_dao.get_work_by_id(answer.work_id)
+        course = await self.course_dao.get_course_by_id(work.course_id)
+        if course.instructor_id != user_id:
+            raise PermissionDeniedError("You do not have permission to view this answer")
+        return answer
+
+    async def grade_work(self, work_id: int, instructor_id: int, grade_data: GradeRequest) -> GradingResultRead:
+        """
+        Grade every answer of a work against its answer key.
+        Answers are read in chunks, scored as a batch in a worker thread, to keep the event loop responsive,
+        and persisted with one bulk UPDATE per chunk.
+        """
+        start = perf_counter()
+        work = await self.work_dao.get_work_by_id(work_id)
+        if not work:
+            raise NotFoundError("Work not found")
+        course = await self.course_dao.get_course_by_id(work.course_id)
+        if course.instructor_id != instructor_id:
+            raise PermissionDeniedError("You do not have permission to grade this work")
+
+        if grade_data.answer_key is not None:
+            if len(grade_data.answer_key) != len(work.questions):
+                raise ValidationError("The answer key must have one answer per question")
+            work = await self.work_dao.set_answer_key(work, grade_data.answer_key)
+        if not work.answer_key:
+            raise ValidationError("This work has no answer key")
+
+        grader = AnswerGrader(
+            answer_key=work.answer_key,
+            case_sensitive=grade_data.case_sensitive,
+            strip=grade_data.strip
+        )
+        graded, score_total, after_id = 0, 0.0, 0
+        while rows := await self.work_answer_dao.get_answers_to_grade(
+            work_id=work_id,
+            after_id=after_id,
+            limit=GRADING_CHUNK_SIZE
+        ):
+            scores = await asyncio.to_thread(grader.score_list, [row.answers for row in rows])
+            graded_at = datetime.now()
+            await self.work_answer_dao.save_scores([
+                {"answer_id": row.id, "score": score, "graded_at": graded_at}
+                for row, score in zip(rows, scores)
+            ])
+            graded += len(rows)
+            score_total += sum(scores)
+            after_id = rows[-1].id
+
+        return GradingResultRead(
+            work_id=work_id,
+            graded=graded,
+            mean_score=round(score_total / graded, 2) if graded else None,
+            elapsed_ms=round((perf_counter() - start) * 1000, 3)
         )
 
     async def check_student_enrollment(self, student_id: int, course_id: int) -> bool:
@@ -0,0 +1,107 @@
+from datetime import date
+from typing import List, Dict, Any, AsyncIterator
+from fastapi import Depends
+from sqlalchemy import select, delete, insert, func, Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.database import get_async_session, build_upsert
+from app.models.analytics import CourseDailyRollup
+from app.models.courses import Course
+from app.models.payments import Payment
+from app.utils.tracing import traced_methods
+
+
+@traced_methods
+class AnalyticsDAO:
+    """Data Access Object for the analytics rollups."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def add_enrollments(self, rollups: List[Dict[str, Any]], commit: bool = True) -> None:
+        """
+        Increment daily rollups with one upsert per row; each row holds `day`, `course_id`, `instructor_id`,
+        `payment_type`, `enrollments` and `revenue`. With `commit=False` the increments join the caller's transaction.
+        """
+        if rollups:
+            await self.session.execute(
+                build_upsert(
+                    self.session,
+                    CourseDailyRollup,
+                    conflict_columns=["course_id", "day", "payment_type"],
+                    update=lambda incoming: {
+                        "enrollments": CourseDailyRollup.enrollments + incoming.enrollments,
+                        "revenue": CourseDailyRollup.revenue + incoming.revenue,
+                        "updated_at": func.now(),
+                    }
+                ),
+                rollups
+            )
+        if commit:
+            await self.session.commit()
+
+    async def get_instructor_rollups(
+            self, instructor_id: int, start: date, end: date, course_id: int | None = None
+    ) -> List[Row]:
+        """
+        Get an instructor's daily rollups between two dates, with the course titles,
+        in one range scan of the (instructor_id, day) index.
+        """
+        stmt = (
+            select(
+                CourseDailyRollup.day,
+                CourseDailyRollup.course_id,
+                Course.title,
+                CourseDailyRollup.payment_type,
+                CourseDailyRollup.enrollments,
+                CourseDailyRollup.revenue
+            )
+            .join(Course, Course.id == CourseDailyRollup.course_id)
+            .where(
+                CourseDailyRollup.instructor_id == instructor_id,
+                CourseDailyRollup.day.between(start, end)
+            )
+            .order_by(CourseDailyRollup.day, CourseDailyRollup.course_id)
+        )
+        if course_id is not None:
+            stmt = stmt.where(CourseDailyRollup.course_id == course_id)
+        result = await self.session.execute(stmt)
+        return list(result.all())
+
+    async def stream_payment_facts(self, chunk_size: int = 10000, course_id: int | None = None) -> AsyncIterator[List[Row]]:
+        """Stream the columns the rollups are built from, for every payment, through a server-side cursor."""
+        stmt = (
+            select(
+                Payment.course_id,
+                Course.instructor_id,
+                Payment.payment_type,
+                Payment.amount,
+                Payment.installments,
+                Payment.total,
+                Payment.created_at
+            )
+            .join(Course, Course.id == Payment.course_id)
+            .execution_options(yield_per=chunk_size)
+        )
+        if course_id is not None:
+            stmt = stmt.where(Payment.course_id == course_id)
+        result = await self.session.stream(stmt)
+        async for partition in result.partitions():
+            yield partition
+
+    async def replace_rollups(
+            self, rollups: List[Dict[str, Any]], course_id: int | None = None, batch_size: int = 5000
+    ) -> None:
+        """Replace the rollups (of one course, or all of them) in a single transaction."""
+        stmt = delete(CourseDailyRollup)
+        if course_id is not None:
+            stmt = stmt.where(CourseDailyRollup.course_id == course_id)
+        await self.session.execute(stmt)
+        for start in range(0, len(rollups), batch_size):
+            await self.session.execute(insert(CourseDailyRollup.__table__), rollups[start:start + batch_size])
+        await self.session.commit()
+
+
+async def get_analytics_dao(session: AsyncSession = Depends(get_async_session)):
+    """Dependency to get the AnalyticsDAO instance."""
+    yield AnalyticsDAO(session)
@@ -1,15 +1,18 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 from fastapi import Depends
-from sqlalchemy import select
+from sqlalchemy import select, Row
 from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.users import User
-from app.models.courses import Course, Lesson
+from app.models.courses import Course, Lesson, LessonProgression
+from app.models.payments import Payment
 from app.patterns.prototype import LessonPrototype
 from app.db.database import get_async_session
+from app.utils.tracing import traced_methods
 
 
+@traced_methods
 class CourseDAO:
     """Data Access Object for Course operations."""
 
@@ -21,7 +24,7 @@ class CourseDAO:
         course = Course(**course_data)
         self.session.add(course)
         await self.session.commit()
-        await self.session.refresh(course)
+        await self.session.refresh(course, attribute_names=["instructor"])
         return course
 
     async def get_course_by_id(self, course_id: int) -> Course | None:
@@ -74,6 +77,7 @@ class CourseDAO:
         await self.session.commit()
 
 
+@traced_methods
 class LessonDAO:
     """Data Access Object for Lesson operations."""
 
@@ -136,6 +140,26 @@ class LessonDAO:
         result = await self.session.execute(stmt)
         return result.scalars().first() is not None
 
+    async def get_completion_facts(self, course_id: int) -> Tuple[List[Row], List[int], List[Tuple[int, int]]]:
+        """
+        Get what a course's completion matrix is built from, reading only the needed columns:
+        its lessons (id, title, prerequisite_id), its enrolled user IDs and the completed (user ID, lesson ID) pairs.
+        """
+        lessons = await self.session.execute(
+            select(Lesson.id, Lesson.title, Lesson.prerequisite_id)
+            .where(Lesson.course_id == course_id)
+            .order_by(Lesson.id)
+        )
+        students = await self.session.execute(
+            select(Payment.user_id).where(Payment.course_id == course_id).order_by(Payment.user_id)
+        )
+        completions = await self.session.execute(
+            select(LessonProgression.user_id, LessonProgression.lesson_id)
+            .join(Lesson, Lesson.id == LessonProgression.lesson_id)
+            .where(Lesson.course_id == course_id, LessonProgression.completed.is_(True))
+        )
+        return list(lessons.all()), list(students.scalars().all()), [tuple(row) for row in completions.all()]
+
     async def delete_lesson(self, lesson: Lesson) -> None:
         """Delete a lesson by its ID."""
         await self.session.delete(lesson)
@@ -0,0 +1,67 @@
+from datetime import datetime
+from typing import Dict, Any
+from fastapi import Depends
+from sqlalchemy import select, delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.database import get_async_session
+from app.models.idempotency import IdempotencyKey
+from app.utils.tracing import traced_methods
+
+
+@traced_methods
+class IdempotencyDAO:
+    """
+    Data Access Object for idempotency keys.
+    Claims and stored responses are flushed into the caller's transaction,
+    so they commit or roll back together with the work they protect.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_key(self, user_id: int, key: str) -> IdempotencyKey | None:
+        """Get a user's idempotency key, if it has not expired."""
+        stmt = select(IdempotencyKey).where(
+            IdempotencyKey.user_id == user_id,
+            IdempotencyKey.key == key,
+            IdempotencyKey.expires_at > datetime.now()
+        )
+        result = await self.session.execute(stmt)
+        return result.scalars().first()
+
+    async def claim_key(
+            self, user_id: int, key: str, request_hash: str, expires_at: datetime
+    ) -> IdempotencyKey | None:
+        """
+        Record a key as in progress, without committing.
+        Expired keys of the user are purged first, so an expired key can be reused.
+        Returns None if another request already holds the key; on MySQL the insert waits
+        for that request to finish, so its response can be read right after.
+        """
+        await self.session.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.user_id == user_id,
+                IdempotencyKey.expires_at <= datetime.now()
+            )
+        )
+        record = IdempotencyKey(user_id=user_id, key=key, request_hash=request_hash, expires_at=expires_at)
+        self.session.add(record)
+        try:
+            await self.session.flush()
+        except IntegrityError:
+            await self.session.rollback()
+            return None
+        return record
+
+    async def save_response(self, record: IdempotencyKey, status_code: int, response: Dict[str, Any]) -> None:
+        """Store the response of a claimed key and commit the whole unit of work."""
+        record.status_code = status_code
+        record.response = response
+        await self.session.commit()
+
+
+async def get_idempotency_dao(session: AsyncSession = Depends(get_async_session)):
+    """Dependency to get the IdempotencyDAO instance."""
+    yield IdempotencyDAO(session)
@@ -0,0 +1,159 @@
+from datetime import date, datetime
+from typing import List
+from fastapi import Depends
+from sqlalchemy import select, update, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.database import get_async_session
+from app.models.payments import Payment, PaymentInstallment, InstallmentStatusEnum, SettlementRun
+from app.utils.tracing import traced_methods
+
+
+@traced_methods
+class InstallmentDAO:
+    """Data Access Object for the installments ledger and its settlement runs."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_installments_by_payment(self, payment_id: int, user_id: int) -> List[PaymentInstallment]:
+        """Get the installment schedule of one of the user's payments, in order."""
+        stmt = (
+            select(PaymentInstallment)
+            .join(Payment, Payment.id == PaymentInstallment.payment_id)
+            .where(PaymentInstallment.payment_id == payment_id, Payment.user_id == user_id)
+            .order_by(PaymentInstallment.number)
+        )
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def get_open_run(self) -> SettlementRun | None:
+        """Get the latest settlement run that has not finished, if any."""
+        stmt = (
+            select(SettlementRun)
+            .where(SettlementRun.finished_at.is_(None))
+            .order_by(SettlementRun.id.desc())
+            .limit(1)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalars().first()
+
+    async def get_run(self, run_id: int) -> SettlementRun | None:
+        """Get a settlement run by its ID."""
+        return await self.session.get(SettlementRun, run_id, populate_existing=True)
+
+    async def create_run(self, as_of: date) -> SettlementRun:
+        """
+        Start a new settlement run.
+        Raises IntegrityError if another run is still open, as one may be started concurrently by another worker.
+        """
+        run = SettlementRun(as_of=as_of)
+        self.session.add(run)
+        try:
+            await self.session.commit()
+        except IntegrityError:
+            await self.session.rollback()
+            raise
+        await self.session.refresh(run)
+        return run
+
+    async def claim_run(self, run: SettlementRun, owner: str, expired_before: datetime) -> bool:
+        """
+        Take the lease of an open run with one conditional UPDATE: it succeeds if the run is unowned,
+        already held by `owner`, or its holder did not checkpoint since `expired_before`.
+        """
+        result = await self.session.execute(
+            update(SettlementRun)
+            .where(
+                SettlementRun.id == run.id,
+                SettlementRun.finished_at.is_(None),
+                or_(
+                    SettlementRun.owner.is_(None),
+                    SettlementRun.owner == owner,
+                    SettlementRun.heartbeat_at < expired_before
+                )
+            )
+            .values(owner=owner, heartbeat_at=datetime.now())
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.commit()
+        return result.rowcount == 1
+
+    async def release_run(self, run_id: int, owner: str) -> None:
+        """Give up the lease of a run, if `owner` still holds it, so another worker can resume it right away."""
+        await self.session.execute(
+            update(SettlementRun)
+            .where(SettlementRun.id == run_id, SettlementRun.owner == owner)
+            .values(owner=None)
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.commit()
+
+    async def get_batch_upper_bound(self, as_of: date, after_id: int, limit: int) -> int | None:
+        """
+        Get the ID closing the next batch of due installments after `after_id`, or None when none are left.
+        Only IDs are read, from the (status, id) index.
+        """
+        stmt = (
+            select(PaymentInstallment.id)
+            .where(
+                PaymentInstallment.status == InstallmentStatusEnum.PENDING,
+                PaymentInstallment.id > after_id,
+                PaymentInstallment.due_date <= as_of
+            )
+            .order_by(PaymentInstallment.id)
+            .limit(limit)
+        )
+        ids = (await self.session.execute(stmt)).scalars().all()
+        return ids[-1] if ids else None
+
+    async def settle_batch(self, run: SettlementRun, upper_id: int, settled_at: datetime, owner: str) -> int | None:
+        """
+        Settle the due installments with an ID in (checkpoint, upper_id] with a single range UPDATE,
+        and advance the run's checkpoint in the same transaction. Returns the number of installments settled,
+        or None (with nothing settled) when `owner` no longer holds the run's lease.
+        The run's row is locked first, so a worker taking the lease over waits for the batch to commit.
+        """
+        holder = await self.session.execute(
+            select(SettlementRun.owner).where(SettlementRun.id == run.id).with_for_update()
+        )
+        if holder.scalar_one() != owner:
+            await self.session.rollback()
+            return None
+
+        stmt = (
+            update(PaymentInstallment)
+            .where(
+                PaymentInstallment.status == InstallmentStatusEnum.PENDING,
+                PaymentInstallment.id > run.last_installment_id,
+                PaymentInstallment.id <= upper_id,
+                PaymentInstallment.due_date <= run.as_of
+            )
+            .values(status=InstallmentStatusEnum.SETTLED, settled_at=settled_at)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(stmt)
+        run.last_installment_id = upper_id
+        run.settled += result.rowcount
+        run.batches += 1
+        run.heartbeat_at = settled_at
+        await self.session.commit()
+        return result.rowcount
+
+    async def finish_run(self, run: SettlementRun, owner: str) -> SettlementRun:
+        """Mark a settlement run as finished and free the open run slot, if `owner` still holds its lease."""
+        await self.session.execute(
+            update(SettlementRun)
+            .where(SettlementRun.id == run.id, SettlementRun.owner == owner)
+            .values(finished_at=datetime.now(), open_slot=None, owner=None)
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.commit()
+        await self.session.refresh(run)
+        return run
+
+
+async def get_installment_dao(session: AsyncSession = Depends(get_async_session)):
+    """Dependency to get the InstallmentDAO instance."""
+    yield InstallmentDAO(session)
@@ -1,12 +1,16 @@
+from datetime import datetime
 from typing import List
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, delete
+from sqlalchemy.orm import raiseload
 
 from app.db.database import get_async_session
-from app.models.messages import Message
+from app.models.messages import Message, ArchivedMessage
+from app.utils.tracing import traced_methods
 
 
+@traced_methods
 class MessageDAO:
     """Data Access Object for handling messages."""
 
@@ -21,12 +25,77 @@ class MessageDAO:
         await self.session.refresh(message)
         return message
 
-    async def get_messages_by_course(self, course_id: int) -> List[Message]:
-        """Get all messages in a course."""
-        stmt = select(Message).where(Message.course_id == course_id).order_by(Message.created_at)
+    async def get_messages_by_course(
+            self, course_id: int, before_id: int | None = None, limit: int = 50
+    ) -> List[Message | ArchivedMessage]:
+        """
+        Get a page of messages in a course, newest first, older than `before_id`.
+        Pages past the end of the hot table continue transparently into the archive.
+        """
+        stmt = (
+            select(Message)
+            .where(Message.course_id == course_id)
+            .order_by(Message.id.desc())
+            .limit(limit)
+            .options(raiseload("*"))
+        )
+        if before_id is not None:
+            stmt = stmt.where(Message.id < before_id)
         result = await self.session.execute(stmt)
-        messages =  result.scalars().all()
-        return list[Message](messages)
+        messages: List[Message | ArchivedMessage] = list(result.scalars().all())
+
+        if len(messages) < limit:
+            archive_before_id = messages[-1].id if messages else before_id
+            archived = await self.get_archived_messages_by_course(
+                course_id=course_id,
+                before_id=archive_before_id,
+                limit=limit - len(messages)
+            )
+            messages.extend(archived)
+        return messages
+
+    async def get_archived_messages_by_course(
+            self, course_id: int, before_id: int | None = None, limit: int = 50
+    ) -> List[ArchivedMessage]:
+        """Get a page of archived messages in a course, newest first, older than `before_id`."""
+        stmt = (
+            select(ArchivedMessage)
+            .where(ArchivedMessage.course_id == course_id)
+            .order_by(ArchivedMessage.id.desc())
+            .limit(limit)
+        )
+        if before_id is not None:
+            stmt = stmt.where(ArchivedMessage.id < before_id)
+        result = await self.session.execute(stmt)
+        return list[ArchivedMessage](result.scalars().all())
+
+    async def archive_messages_before(self, cutoff: datetime, batch_size: int = 1000) -> int:
+        """
+        Move one batch of messages created before `cutoff` into the archive table.
+        Returns the number of messages archived, 0 when nothing is left to move.
+        """
+        stmt = (
+            select(Message)
+            .where(Message.created_at < cutoff)
+            .order_by(Message.id)
+            .limit(batch_size)
+            .options(raiseload("*"))
+        )
+        result = await self.session.execute(stmt)
+        messages = result.scalars().all()
+        if not messages:
+            return 0
+
+        self.session.add_all([ArchivedMessage.from_message(message) for message in messages])
+        await self.session.execute(
+            delete(Message)
+            .where(Message.id.in_([message.id for message in messages]))
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.commit()
+        for message in messages:
+            self.session.expunge(message)
+        return len(messages)
 
 
 async def get_message_dao(session: AsyncSession = Depends(get_async_session)):
@@ -0,0 +1,314 @@
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Any, List, Tuple
+from fastapi import Depends
+from sqlalchemy import select, update, insert, func, or_, case
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.database import get_async_session, build_upsert
+from app.models.notifications import (
+    NotificationOutbox,
+    OutboxStatusEnum,
+    InboxNotification,
+    NotificationCounter,
+)
+from app.utils.tracing import traced_methods
+
+
+@traced_methods
+class NotificationDAO:
+    """Data Access Object for the notification outbox and the users' inboxes."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def create_outbox_entry(self, outbox_data: Dict[str, Any]) -> NotificationOutbox:
+        """Write a new notification to the outbox."""
+        entry = NotificationOutbox(**outbox_data)
+        self.session.add(entry)
+        await self.session.commit()
+        await self.session.refresh(entry)
+        return entry
+
+    async def queue_digest(
+            self,
+            notifications: List[Dict[str, Any]],
+            course_id: int,
+            work_id: int,
+            digest_message: str,
+            available_at: datetime,
+    ) -> None:
+        """
+        Coalesce notifications into pending digest entries, one per (recipient, work).
+        Each event is a single upsert bumping `event_count`; the delivery window starts
+        with the first event and is not extended by later ones.
+        """
+        for notification in notifications:
+            await self.session.execute(
+                build_upsert(
+                    self.session,
+                    NotificationOutbox,
+                    conflict_columns=["digest_key"],
+                    update=lambda incoming: {
+                        "event_count": NotificationOutbox.event_count + incoming.event_count,
+                        "message": incoming.message,
+                        "updated_at": func.now(),
+                    }
+                ),
+                {
+                    "message": notification["message"],
+                    "recipient_type": notification["recipient_type"],
+                    "recipient_id": notification["recipient_id"],
+                    "course_id": course_id,
+                    "work_id": work_id,
+                    "digest_key": (
+                        f"work:{work_id}:{notification['recipient_type']}:{notification['recipient_id']}"
+                    ),
+                    "digest_message": digest_message,
+                    "event_count": 1,
+                    "available_at": available_at,
+                }
+            )
+        await self.session.commit()
+
+    async def get_outbox_entry(self, entry_id: int) -> NotificationOutbox | None:
+        """Get an outbox entry by its ID."""
+        stmt = select(NotificationOutbox).where(NotificationOutbox.id == entry_id)
+        result = await self.session.execute(stmt)
+        return result.scalars().first()
+
+    async def claim_next_outbox_entry(self, candidates: int = 10) -> NotificationOutbox | None:
+        """
+        Claim the oldest pending outbox entry for processing.
+        The claim is a conditional UPDATE, so concurrent workers never process the same entry.
+        """
+        stmt = (
+            select(NotificationOutbox.id)
+            .where(NotificationOutbox.status == OutboxStatusEnum.PENDING)
+            .where(or_(
+                NotificationOutbox.available_at.is_(None),
+                NotificationOutbox.available_at <= datetime.now()
+            ))
+            .order_by(NotificationOutbox.id)
+            .limit(candidates)
+        )
+        result = await self.session.execute(stmt)
+        for entry_id in result.scalars().all():
+            claimed = await self.session.execute(
+                update(NotificationOutbox)
+                .where(
+                    NotificationOutbox.id == entry_id,
+                    NotificationOutbox.status == OutboxStatusEnum.PENDING
+                )
+                .values(
+                    status=OutboxStatusEnum.PROCESSING,
+                    attempts=NotificationOutbox.attempts + 1,
+                    digest_key=None
+                )
+            )
+            await self.session.commit()
+            if claimed.rowcount == 1:
+                return await self.get_outbox_entry(entry_id)
+        await self.session.commit()
+        return None
+
+    async def deliver_to_inbox(
+            self,
+            notifications: List[Dict[str, Any]],
+            entry: NotificationOutbox | None = None,
+            cursor: int | None = None,
+            failed_recipient_ids: List[int] | None = None,
+    ) -> int:
+        """
+        Insert a batch of notifications into the recipients' inboxes and bump their unread counters.
+        When delivering for an outbox entry, its checkpoint is committed in the same transaction,
+        so a retried entry never delivers the same batch twice. The recipients of the batch whose delivery
+        failed are re-queued in that transaction too, as one entry each, retried until they run out of attempts.
+        """
+        if notifications:
+            await self.session.execute(
+                insert(InboxNotification),
+                [
+                    {
+                        "recipient_id": notification["recipient_id"],
+                        "recipient_type": notification["recipient_type"],
+                        "message": notification["message"],
+                        "job_id": entry.id if entry else None,
+                    }
+                    for notification in notifications
+                ]
+            )
+            unread = Counter(notification["recipient_id"] for notification in notifications)
+            await self.session.execute(
+                build_upsert(
+                    self.session,
+                    NotificationCounter,
+                    conflict_columns=["recipient_id"],
+                    update=lambda incoming: {
+                        "unread_count": NotificationCounter.unread_count + incoming.unread_count,
+                        "updated_at": func.now(),
+                    }
+                ),
+                [
+                    {"recipient_id": recipient_id, "unread_count": count, "last_read_id": 0}
+                    for recipient_id, count in unread.items()
+                ]
+            )
+
+        if entry is not None and failed_recipient_ids:
+            await self.session.execute(
+                insert(NotificationOutbox),
+                [
+                    {
+                        "message": entry.render_message(),
+                        "recipient_type": entry.recipient_type,
+                        "recipient_id": recipient_id,
+                        "course_id": entry.course_id,
+                        "status": OutboxStatusEnum.PENDING,
+                    }
+                    for recipient_id in failed_recipient_ids
+                ]
+            )
+
+        if entry is not None:
+            entry.cursor = cursor if cursor is not None else entry.cursor
+            entry.delivered += len(notifications)
+        await self.session.commit()
+        return len(notifications)
+
+    async def get_inbox(
+            self, recipient_id: int, before_id: int | None = None, limit: int = 50
+    ) -> List[InboxNotification]:
+        """Get a page of a user's inbox, newest first, older than `before_id`."""
+        stmt = (
+            select(InboxNotification)
+            .where(InboxNotification.recipient_id == recipient_id)
+            .order_by(InboxNotification.id.desc())
+            .limit(limit)
+        )
+        if before_id is not None:
+            stmt = stmt.where(InboxNotification.id < before_id)
+        result = await self.session.execute(stmt)
+        return list[InboxNotification](result.scalars().all())
+
+    async def get_counter(self, recipient_id: int) -> NotificationCounter | None:
+        """Get a user's inbox counters."""
+        stmt = select(NotificationCounter).where(NotificationCounter.recipient_id == recipient_id)
+        result = await self.session.execute(stmt)
+        return result.scalars().first()
+
+    async def mark_read_up_to(self, recipient_id: int, up_to_id: int) -> NotificationCounter | None:
+        """
+        Mark every notification of a user up to `up_to_id` as read.
+        Only the newly read range of the inbox index is counted; no row is updated but the counter.
+        """
+        counter = await self.get_counter(recipient_id)
+        if not counter or up_to_id <= counter.last_read_id:
+            return counter
+
+        last_read_id = counter.last_read_id
+        stmt = (
+            select(func.max(InboxNotification.id))
+            .where(InboxNotification.recipient_id == recipient_id)
+            .where(InboxNotification.id > last_read_id)
+            .where(InboxNotification.id <= up_to_id)
+        )
+        max_id = (await self.session.execute(stmt)).scalar()
+        if max_id is None:
+            return counter
+
+        # Counted by the UPDATE itself, so a delivery committed in between is subtracted with the range it falls in
+        newly_read = (
+            select(func.count(InboxNotification.id))
+            .where(InboxNotification.recipient_id == recipient_id)
+            .where(InboxNotification.id > last_read_id)
+            .where(InboxNotification.id <= max_id)
+            .scalar_subquery()
+        )
+        unread_count = NotificationCounter.unread_count - newly_read
+        # Guarded on the previous watermark, so concurrent calls never subtract the same range twice.
+        # Clamped at zero: a drift left by a delivery committed behind the watermark is fixed by `reconcile_counters`
+        await self.session.execute(
+            update(NotificationCounter)
+            .where(
+                NotificationCounter.recipient_id == recipient_id,
+                NotificationCounter.last_read_id == last_read_id
+            )
+            .values(
+                last_read_id=max_id,
+                unread_count=case((unread_count > 0, unread_count), else_=0)
+            )
+        )
+        await self.session.commit()
+        await self.session.refresh(counter)
+        return counter
+
+    async def reconcile_counters(self, after_id: int, limit: int) -> Tuple[int | None, int]:
+        """
+        Recount the unread notifications of the next `limit` counters after the counter `after_id`,
+        with one UPDATE fixing only the counters that drifted from their inbox.
+        Returns the ID of the last counter checked (None when none are left) and the number of counters fixed.
+        """
+        ids = (await self.session.execute(
+            select(NotificationCounter.id)
+            .where(NotificationCounter.id > after_id)
+            .order_by(NotificationCounter.id)
+            .limit(limit)
+        )).scalars().all()
+        if not ids:
+            return None, 0
+
+        unread = (
+            select(func.count(InboxNotification.id))
+            .where(InboxNotification.recipient_id == NotificationCounter.recipient_id)
+            .where(InboxNotification.id > NotificationCounter.last_read_id)
+            .scalar_subquery()
+        )
+        result = await self.session.execute(
+            update(NotificationCounter)
+            .where(NotificationCounter.id.between(ids[0], ids[-1]), NotificationCounter.unread_count != unread)
+            .values(unread_count=unread)
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.commit()
+        return ids[-1], result.rowcount
+
+    async def complete_outbox_entry(self, entry: NotificationOutbox) -> NotificationOutbox:
+        """Mark an outbox entry as fully delivered."""
+        entry.status = OutboxStatusEnum.DONE
+        entry.last_error = None
+        await self.session.commit()
+        return entry
+
+    async def release_outbox_entry(
+            self, entry: NotificationOutbox, error: str, max_attempts: int, retry_at: datetime | None = None
+    ) -> NotificationOutbox:
+        """Put a failed entry back in the queue, claimable again from `retry_at`, or mark it failed once out of attempts."""
+        await self.session.rollback()
+        await self.session.refresh(entry)
+        entry.last_error = error
+        if entry.attempts >= max_attempts:
+            entry.status = OutboxStatusEnum.FAILED
+        else:
+            entry.status = OutboxStatusEnum.PENDING
+            entry.available_at = retry_at
+        await self.session.commit()
+        return entry
+
+    async def requeue_stale_outbox_entries(self, older_than: datetime) -> int:
+        """Return entries left in processing by a crashed worker to the pending queue."""
+        result = await self.session.execute(
+            update(NotificationOutbox)
+            .where(
+                NotificationOutbox.status == OutboxStatusEnum.PROCESSING,
+                NotificationOutbox.updated_at < older_than
+            )
+            .values(status=OutboxStatusEnum.PENDING)
+        )
+        await self.session.commit()
+        return result.rowcount
+
+
+async def get_notification_dao(session: AsyncSession = Depends(get_async_session)):
+    """Dependency to get the NotificationDAO instance."""
+    yield NotificationDAO(session)
@@ -1,42 +1,73 @@
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Set, Sequence
+from datetime import date, timedelta
 
 from fastapi import Depends
-from sqlalchemy import select
+from sqlalchemy import select, insert, literal, Row
 from sqlalchemy.orm import selectinload
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.payments import Payment
-from app.models.courses import LessonProgression
+from app.models.payments import Payment, PaymentInstallment
+from app.models.courses import Lesson, LessonProgression
+from app.models.users import User
 from app.db.database import get_async_session
+from app.utils.tracing import traced_methods
 
 
+@traced_methods
 class PaymentDAO:
     """Data Access Object for Payment operations."""
 
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def create_payment(self, payment_data: Dict[str, Any]) -> Payment:
-        """Create a new payment with the provided data."""
+    async def create_payment(
+            self, payment_data: Dict[str, Any], commit: bool = True, installment_period_days: int = 30
+    ) -> Payment:
+        """
+        Create a new payment, its installment schedule and the user's lesson progressions in a single transaction.
+        The progressions are copied from the course's lessons with one INSERT ... SELECT.
+        Raises IntegrityError if the user already paid for the course.
+        With `commit=False` the work is only flushed, so the caller can commit it with its own writes.
+        """
         payment = Payment(**payment_data)
         self.session.add(payment)
-        await self.session.commit()
-        await self.session.refresh(payment)
+        await self.session.flush()
 
-        course_lessons = payment.course.lessons
-        if course_lessons:
-            # Initialize lesson progression for the user
-            for lesson in course_lessons:
-                progression = LessonProgression(
-                    user_id=payment.user_id,
-                    lesson_id=lesson.id,
-                    completed=False
-                )
-                self.session.add(progression)
+        await self._create_installments(
+            [(payment.id, payment.amount, payment.installments, payment.total)],
+            period_days=installment_period_days
+        )
+        lessons = select(literal(payment.user_id), Lesson.id).where(Lesson.course_id == payment.course_id)
+        await self.session.execute(
+            insert(LessonProgression.__table__).from_select(["user_id", "lesson_id"], lessons)
+        )
 
+        if commit:
             await self.session.commit()
+        await self.session.refresh(payment)
         return payment
 
+    async def _create_installments(self, payments: List[Tuple[int, Any, int, Any]], period_days: int) -> None:
+        """
+        Write the installment schedule of (payment ID, amount, installments, total) tuples with one executemany
+        INSERT. The first installment is due today and each following one `period_days` later; the last one
+        takes the rounding remainder, so the installments add up to the total exactly.
+        """
+        today = date.today()
+        rows = [
+            {
+                "payment_id": payment_id,
+                "number": number,
+                "amount": amount if number < installments or total is None else total - amount * (installments - 1),
+                "due_date": today + timedelta(days=period_days * (number - 1)),
+            }
+            for payment_id, amount, installments, total in payments
+            for number in range(1, installments + 1)
+        ]
+        if rows:
+            await self.session.execute(insert(PaymentInstallment.__table__), rows)
+
     async def get_payment_by_id(self, payment_id: int, user_id: int) -> Payment | None:
         """Get a payment by its ID."""
         stmt = (select(Payment)
@@ -91,6 +122,93 @@ class PaymentDAO:
         payments = result.scalars().all()
         return list[Payment](payments), len(payments)
 
+    async def get_enrolled_user_ids(
+            self, course_id: int, after_payment_id: int = 0, limit: int = 500
+    ) -> List[Tuple[int, int]]:
+        """
+        Get a batch of (payment ID, user ID) pairs for a course, ordered by payment ID.
+        Only the two columns are read, so large courses can be walked with keyset pagination.
+        """
+        stmt = (
+            select(Payment.id, Payment.user_id)
+            .where(Payment.course_id == course_id)
+            .where(Payment.id > after_payment_id)
+            .order_by(Payment.id)
+            .limit(limit)
+        )
+        result = await self.session.execute(stmt)
+        return [(payment_id, user_id) for payment_id, user_id in result.all()]
+
+    async def get_active_user_ids(self, user_ids: Sequence[int], batch_size: int = 1000) -> Set[int]:
+        """Get which of the given user IDs belong to active users, with one IN query per batch."""
+        found = set()
+        for start in range(0, len(user_ids), batch_size):
+            stmt = select(User.id).where(User.id.in_(user_ids[start:start + batch_size]), User.is_active.is_(True))
+            found.update((await self.session.execute(stmt)).scalars().all())
+        return found
+
+    async def get_paid_user_ids(self, course_id: int, user_ids: Sequence[int], batch_size: int = 1000) -> Set[int]:
+        """Get which of the given user IDs already paid for a course, with one IN query per batch."""
+        found = set()
+        for start in range(0, len(user_ids), batch_size):
+            stmt = select(Payment.user_id).where(
+                Payment.course_id == course_id,
+                Payment.user_id.in_(user_ids[start:start + batch_size])
+            )
+            found.update((await self.session.execute(stmt)).scalars().all())
+        return found
+
+    async def bulk_create_payments(
+            self, course_id: int, payments: List[Dict[str, Any]], batch_size: int = 1000,
+            installment_period_days: int = 30, commit: bool = True
+    ) -> Dict[int, Row]:
+        """
+        Create payments for many users of a course, with their installments and lesson progressions,
+        in one transaction. Each batch costs four statements: an executemany INSERT of the payments,
+        an INSERT ... SELECT of the progressions, a SELECT of the new payment IDs and an executemany
+        INSERT of the installments. Returns the (id, created_at) row of each user's payment.
+        Raises IntegrityError, after rolling back, if any user paid for the course concurrently.
+        With `commit=False` the payments are left in the transaction for the caller to commit.
+        """
+        payment_ids = {}
+        try:
+            for start in range(0, len(payments), batch_size):
+                batch = payments[start:start + batch_size]
+                user_ids = [payment["user_id"] for payment in batch]
+                await self.session.execute(insert(Payment.__table__), batch)
+
+                progressions = (
+                    select(Payment.user_id, Lesson.id)
+                    .join(Lesson, Lesson.course_id == Payment.course_id)
+                    .where(Payment.course_id == course_id, Payment.user_id.in_(user_ids))
+                )
+                await self.session.execute(
+                    insert(LessonProgression.__table__).from_select(["user_id", "lesson_id"], progressions)
+                )
+
+                created = await self.session.execute(
+                    select(Payment.user_id, Payment.id, Payment.created_at)
+                    .where(Payment.course_id == course_id, Payment.user_id.in_(user_ids))
+                )
+                batch_ids = {row.user_id: row for row in created.all()}
+                await self._create_installments(
+                    [
+                        (
+                            batch_ids[payment["user_id"]].id, payment["amount"], payment["installments"],
+                            payment["total"]
+                        )
+                        for payment in batch
+                    ],
+                    period_days=installment_period_days
+                )
+                payment_ids.update(batch_ids)
+            if commit:
+                await self.session.commit()
+        except IntegrityError:
+            await self.session.rollback()
+            raise
+        return payment_ids
+
 
 async def get_payment_dao(session: AsyncSession = Depends(get_async_session)):
     """Dependency to get the PaymentDAO instance."""
@@ -1,12 +1,16 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update, bindparam, func, Row
+from sqlalchemy.orm import raiseload
 
-from app.db.database import get_async_session
-from app.models.works import Work, WorkAnswer
+from app.db.database import get_async_session, build_upsert
+from app.models.works import Work, WorkAnswer, WorkAnswerRevision
+from app.utils.revisions import diff_answers
+from app.utils.tracing import traced_methods
 
 
+@traced_methods
 class WorkDAO:
     """Data Access Object for Work (assignments)."""
 
@@ -27,6 +31,12 @@ class WorkDAO:
         result = await self.session.execute(stmt)
         return result.scalars().first()
 
+    async def set_answer_key(self, work: Work, answer_key: List[str]) -> Work:
+        """Store the answer key used to grade a work."""
+        work.answer_key = answer_key
+        await self.session.commit()
+        return work
+
     async def delete_work(self, work: Work) -> None:
         """Delete a work from the database."""
         await self.session.delete(work)
@@ -40,54 +50,209 @@ class WorkDAO:
         return list[Work](works)
 
 
+@traced_methods
 class WorkAnswerDAO:
     """Data Access Object for Work answers (students' submissions)."""
 
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def submit_or_update_answer(self, answer_data: Dict[str, Any]) -> WorkAnswer:
-        """Insert a new answer or update existing one for the same student/work."""
-        stmt = select(WorkAnswer).where(
-            WorkAnswer.student_id == answer_data["student_id"],
-            WorkAnswer.work_id == answer_data["work_id"]
+    async def submit_or_update_answer(self, answer_data: Dict[str, Any], snapshot_interval: int = 10) -> WorkAnswer:
+        """
+        Insert a new answer or update existing one for the same student/work.
+        A single upsert against the (work_id, student_id) unique key, so concurrent
+        resubmits can never create duplicate rows.
+        Each submission also appends to the revision log in the same transaction: a delta against
+        the previous answers, or a full snapshot every `snapshot_interval` revisions.
+        """
+        previous_stmt = (
+            select(WorkAnswer.answers, WorkAnswer.revision)
+            .where(
+                WorkAnswer.work_id == answer_data["work_id"],
+                WorkAnswer.student_id == answer_data["student_id"]
+            )
+            .with_for_update()
         )
-        result = await self.session.execute(stmt)
-        existing = result.scalars().first()
+        previous = (await self.session.execute(previous_stmt)).first()
+
+        stmt = build_upsert(
+            self.session,
+            WorkAnswer,
+            conflict_columns=["work_id", "student_id"],
+            update=lambda incoming: {
+                "answers": incoming.answers,
+                "score": None,  # The previous grade no longer applies
+                "graded_at": None,
+                "revision": WorkAnswer.revision + 1,
+                "updated_at": func.now(),
+            }
+        )
+        await self.session.execute(stmt, {
+            "work_id": answer_data["work_id"],
+            "student_id": answer_data["student_id"],
+            "answers": answer_data["answers"],
+            "revision": 1,
+        })
 
-        if existing:
-            existing.answers = answer_data["answers"]
-            await self.session.commit()
-            await self.session.refresh(existing)
-            return existing
+        # MySQL has no RETURNING, so read the row back inside the same transaction
+        answer = await self.get_answer_by_student_and_work(
+            work_id=answer_data["work_id"],
+            student_id=answer_data["student_id"]
+        )
 
-        answer = WorkAnswer(**answer_data)
-        self.session.add(answer)
+        # A delta is only valid against the revision right before it; anything else gets a snapshot
+        is_snapshot = (
+            previous is None
+            or previous.revision != answer.revision - 1
+            or (answer.revision - 1) % snapshot_interval == 0
+        )
+        self.session.add(WorkAnswerRevision(
+            answer_id=answer.id,
+            revision=answer.revision,
+            is_snapshot=is_snapshot,
+            content=answer.answers if is_snapshot else diff_answers(previous.answers, answer.answers)
+        ))
         await self.session.commit()
-        await self.session.refresh(answer)
         return answer
 
-    async def get_answers_by_work(self, work_id: int) -> List[WorkAnswer]:
-        """Retrieve all answers submitted for a specific work."""
-        stmt = select(WorkAnswer).where(
-            WorkAnswer.work_id == work_id
+    async def get_answers_by_work(
+            self, work_id: int, after_id: int | None = None, limit: int = 100
+    ) -> List[WorkAnswer]:
+        """Retrieve a page of answers submitted for a specific work, ordered by ID."""
+        stmt = (
+            select(WorkAnswer)
+            .where(WorkAnswer.work_id == work_id)
+            .order_by(WorkAnswer.id)
+            .limit(limit)
+            .options(raiseload("*"))
         )
+        if after_id is not None:
+            stmt = stmt.where(WorkAnswer.id > after_id)
         result = await self.session.execute(stmt)
         work_answers =  result.scalars().all()
         return list[WorkAnswer](work_answers)
+
+    async def stream_answers_by_work(self, work_id: int, chunk_size: int = 1000) -> AsyncIterator[List[Row]]:
+        """
+        Stream every answer of a work in chunks of rows, through a server-side cursor.
+        Only the exported columns are read, so memory stays bounded by the chunk size.
+        """
+        stmt = (
+            select(
+                WorkAnswer.id,
+                WorkAnswer.student_id,
+                WorkAnswer.answers,
+                WorkAnswer.score,
+                WorkAnswer.updated_at
+            )
+            .where(WorkAnswer.work_id == work_id)
+            .order_by(WorkAnswer.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        result = await self.session.stream(stmt)
+        async for partition in result.partitions():
+            yield partition
     
+    async def get_answers_to_grade(self, work_id: int, after_id: int = 0, limit: int = 5000) -> List[Row]:
+        """Get a chunk of (ID, answers) rows of a work, ordered by ID, for batch grading."""
+        stmt = (
+            select(WorkAnswer.id, WorkAnswer.answers)
+            .where(WorkAnswer.work_id == work_id)
+            .where(WorkAnswer.id > after_id)
+            .order_by(WorkAnswer.id)
+            .limit(limit)
+        )
+        result = await self.session.execute(stmt)
+        return list(result.all())
+
+    async def save_scores(self, scores: List[Dict[str, Any]]) -> None:
+        """
+        Persist a batch of scores in a single executemany UPDATE.
+        Each item holds `answer_id`, `score` and `graded_at`; `updated_at` is left untouched,
+        since grading is not a change to the student's answer.
+        """
+        if scores:
+            table = WorkAnswer.__table__
+            stmt = (
+                update(table)
+                .where(table.c.id == bindparam("answer_id"))
+                .values(
+                    score=bindparam("score"),
+                    graded_at=bindparam("graded_at"),
+                    updated_at=table.c.updated_at,
+                )
+            )
+            await self.session.execute(stmt, scores)
+        await self.session.commit()
+
     async def get_answer_by_student_and_work(self, work_id: int, student_id: int) -> WorkAnswer | None:
         """
         Retrieve a specific student's answer for a given work.
         Returns None if no answer is found.
         """
-        stmt = select(WorkAnswer).where(
-            WorkAnswer.work_id == work_id,
-            WorkAnswer.student_id == student_id
+        stmt = (
+            select(WorkAnswer)
+            .where(
+                WorkAnswer.work_id == work_id,
+                WorkAnswer.student_id == student_id
+            )
+            .options(raiseload("*"))
+            .execution_options(populate_existing=True)
         )
         result = await self.session.execute(stmt)
         return result.scalars().first()
 
+    async def get_answer_by_id(self, answer_id: int) -> WorkAnswer | None:
+        """Retrieve an answer by its ID."""
+        stmt = select(WorkAnswer).where(WorkAnswer.id == answer_id).options(raiseload("*"))
+        result = await self.session.execute(stmt)
+        return result.scalars().first()
+
+    async def get_revisions(self, answer_id: int, after_revision: int = 0, limit: int = 100) -> List[Row]:
+        """Get a page of (revision, is_snapshot, created_at) rows of an answer's revision log."""
+        stmt = (
+            select(WorkAnswerRevision.revision, WorkAnswerRevision.is_snapshot, WorkAnswerRevision.created_at)
+            .where(
+                WorkAnswerRevision.answer_id == answer_id,
+                WorkAnswerRevision.revision > after_revision
+            )
+            .order_by(WorkAnswerRevision.revision)
+            .limit(limit)
+        )
+        result = await self.session.execute(stmt)
+        return list(result.all())
+
+    async def get_revision_chain(self, answer_id: int, revision: int) -> List[Row]:
+        """
+        Get the revisions needed to rebuild `revision`: the nearest snapshot at or before it,
+        followed by every delta up to it, in order.
+        """
+        nearest_snapshot = (
+            select(func.max(WorkAnswerRevision.revision))
+            .where(
+                WorkAnswerRevision.answer_id == answer_id,
+                WorkAnswerRevision.is_snapshot.is_(True),
+                WorkAnswerRevision.revision <= revision
+            )
+            .scalar_subquery()
+        )
+        stmt = (
+            select(
+                WorkAnswerRevision.revision,
+                WorkAnswerRevision.is_snapshot,
+                WorkAnswerRevision.content,
+                WorkAnswerRevision.created_at
+            )
+            .where(
+                WorkAnswerRevision.answer_id == answer_id,
+                WorkAnswerRevision.revision >= nearest_snapshot,
+                WorkAnswerRevision.revision <= revision
+            )
+            .order_by(WorkAnswerRevision.revision)
+        )
+        result = await self.session.execute(stmt)
+        return list(result.all())
+
 
 async def get_work_dao(session: AsyncSession = Depends(get_async_session)):
     """Dependency to get the WorkDAO."""
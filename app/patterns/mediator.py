@@ -3,7 +3,7 @@ from abc import ABC, abstractmethod
 from typing import List
 
 from app.schemas.message_schemas import MessageCreate
-from app.models.messages import Message
+from app.models.messages import Message, ArchivedMessage
 from app.models.users import UserManager
 from app.patterns.data_access_objects.messages_dao import MessageDAO
 from app.patterns.data_access_objects.courses_dao import CourseDAO
@@ -20,8 +20,10 @@ class ChatMediator(ABC):
         raise NotImplementedError("This method should be overridden in subclasses")
 
     @abstractmethod
-    async def get_messages(self, course_id: int, user_id: int) -> List[Message]:
-        """Retrieve all messages from a course chat."""
+    async def get_messages(
+            self, course_id: int, user_id: int, before_id: int | None = None, limit: int = 50
+    ) -> List[Message | ArchivedMessage]:
+        """Retrieve a page of messages from a course chat."""
         raise NotImplementedError("This method should be overridden in subclasses")
 
 
@@ -50,8 +52,10 @@ class CourseChatMediator(ChatMediator):
         message_dict.update({"sender_id": sender_id})
         return await self.message_dao.create_message(message_dict)
 
-    async def get_messages(self, course_id: int, user_id: int) -> List[Message]:
-        """Coordinate retrieving all messages from a course chat."""
+    async def get_messages(
+            self, course_id: int, user_id: int, before_id: int | None = None, limit: int = 50
+    ) -> List[Message | ArchivedMessage]:
+        """Coordinate retrieving a page of messages from a course chat, in chronological order."""
         course = await self.course_dao.get_course_by_id(course_id=course_id)
         if not course:
             raise NotFoundError("Course not found")
@@ -63,5 +67,9 @@ class CourseChatMediator(ChatMediator):
             if course.id not in course_ids:
                 raise PermissionDeniedError("You do not have access to this course")
 
-        messages = await self.message_dao.get_messages_by_course(course_id)
-        return list(messages) if not isinstance(messages, list) else messages
+        messages = await self.message_dao.get_messages_by_course(
+            course_id=course_id,
+            before_id=before_id,
+            limit=limit
+        )
+        return list(reversed(messages))
@@ -1,5 +1,9 @@
+import asyncio
+import logging
+from time import perf_counter
+from collections import deque
 from abc import ABC, abstractmethod
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 
 # Observer Pattern for Notifications
@@ -12,14 +16,81 @@ class Observer(ABC):
         raise NotImplementedError("Subclasses must implement this method.")
 
 
+class DispatchMetrics:
+    """Collects delivery counters and latency samples from NotificationCenter fan-outs."""
+
+    def __init__(self, max_samples: int = 10000):
+        self.fan_outs = 0
+        self.deliveries = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.retries = 0
+        self._fan_out_latencies: deque[float] = deque(maxlen=max_samples)
+        self._delivery_latencies: deque[float] = deque(maxlen=max_samples)
+
+    def record_delivery(self, seconds: float):
+        """Record the latency of one successful observer update."""
+        self.deliveries += 1
+        self._delivery_latencies.append(seconds)
+
+    def record_fan_out(self, seconds: float):
+        """Record the latency of a whole notify() call."""
+        self.fan_outs += 1
+        self._fan_out_latencies.append(seconds)
+
+    @staticmethod
+    def percentiles(samples: deque[float]) -> Dict[str, float]:
+        """Return the p50, p95 and p99 of the samples, in milliseconds."""
+        if not samples:
+            return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+        ordered = sorted(samples)
+        last = len(ordered) - 1
+        return {
+            name: round(ordered[min(last, int(last * quantile))] * 1000, 3)
+            for name, quantile in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99))
+        }
+
+    def snapshot(self) -> Dict:
+        """Return the current counters and latency percentiles."""
+        return {
+            "fan_outs": self.fan_outs,
+            "deliveries": self.deliveries,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "retries": self.retries,
+            "fan_out_latency_ms": self.percentiles(self._fan_out_latencies),
+            "delivery_latency_ms": self.percentiles(self._delivery_latencies),
+        }
+
+
+dispatch_metrics = DispatchMetrics()
+"""DispatchMetrics: Process-wide metrics shared by every NotificationCenter."""
+
+
 class NotificationCenter:
     """
     Subject in the Observer pattern.
     Manages observers (students and instructors) and returns JSON notifications.
+    Observers are updated by at most `max_concurrency` workers pulling from the attached observers, so a fan-out
+    never holds more than that many updates in flight; each update has its own timeout and retries, and a failing
+    observer never blocks the others. Observers that still failed after their retries are left in `failed`.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        max_concurrency: int = 100,
+        timeout: float = 5.0,
+        retries: int = 2,
+        backoff: float = 0.1,
+        metrics: Optional[DispatchMetrics] = None,
+    ):
         self._observers: List[Observer] = []
+        self.failed: List[Observer] = []
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.metrics = metrics or dispatch_metrics
 
     def attach(self, observer: Observer):
         """Attach a new observer."""
@@ -33,14 +104,47 @@ class NotificationCenter:
     async def notify(self, message: str) -> List[Dict]:
         """
         Notify all observers with the given message.
-        Returns a list of JSON notifications.
+        Returns a list of JSON notifications, in the order the observers were attached, one per observer
+        that was updated successfully; the others are listed in `failed`.
         """
-        notifications = []
-        for observer in self._observers:
-            notifications.append(await observer.update(message))
-
-        self._observers.clear()  # Clear observers after notification to avoid duplicates
-        return notifications
+        start = perf_counter()
+        observers = self._observers
+        self._observers = []  # Cleared before notifying to avoid duplicates
+        results: List[Dict | None] = [None] * len(observers)
+        pending = iter(enumerate(observers))
+
+        async def worker():
+            for index, observer in pending:
+                results[index] = await self._dispatch(observer, message)
+
+        await asyncio.gather(*(worker() for _ in range(min(self.max_concurrency, len(observers)))))
+        self.failed = [observer for observer, result in zip(observers, results) if result is None]
+        self.metrics.record_fan_out(perf_counter() - start)
+        return [result for result in results if result is not None]
+
+    async def _dispatch(self, observer: Observer, message: str) -> Dict | None:
+        """Update a single observer, retrying with exponential backoff; returns None if it keeps failing."""
+        error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self.metrics.retries += 1
+                await asyncio.sleep(self.backoff * 2 ** (attempt - 1))
+
+            start = perf_counter()
+            try:
+                async with asyncio.timeout(self.timeout):
+                    notification = await observer.update(message)
+                self.metrics.record_delivery(perf_counter() - start)
+                return notification
+            except TimeoutError:
+                self.metrics.timeouts += 1
+                error = f"timed out after {self.timeout}s"
+            except Exception as e:  # noqa
+                error = repr(e)
+
+        self.metrics.failures += 1
+        logging.warning(f"Observer {observer!r} failed after {self.retries + 1} attempts: {error}")
+        return None
 
 
 class StudentObserver(Observer):
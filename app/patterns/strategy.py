@@ -1,5 +1,11 @@
-from typing import Dict, Any
+from typing import Dict, Any, List
 from abc import ABC, abstractmethod
+from decimal import Decimal, ROUND_HALF_UP
+
+from app.models.payments import PaymentTypeEnum
+
+CENT = Decimal("0.01")
+"""Decimal: Smallest currency unit; every amount is rounded half up to it."""
 
 
 # Strategy Pattern for Payment Processing
@@ -7,52 +13,86 @@ class PaymentStrategy(ABC):
     """Abstract base class for payment strategies."""
 
     @abstractmethod
-    def process_payment(self, amount: float, payment_type) -> Dict[str, Any]:
-        """Process the payment and return True if successful, False otherwise."""
+    def process_payment(self, amount: Decimal, payment_type) -> Dict[str, Any]:
+        """
+        Process the payment and return the amount per installment, the number of installments and the total.
+        The total is exact: when the amount does not split evenly, the last installment is `total - amount * (n - 1)`.
+        """
         raise NotImplementedError("Subclasses must implement this method.")
 
 
 class CreditCardPaymentStrategy(PaymentStrategy):
     """Concrete strategy for processing credit card payments."""
 
-    def process_payment(self, amount: float, payment_type) -> Dict[str, Any]:
+    INSTALLMENTS = 3
+
+    def process_payment(self, amount: Decimal, payment_type) -> Dict[str, Any]:
         """Process a credit card payment."""
-        amount /= 3 # applying 3x installments
-        installments = 3
-        return {"amount": amount, "installments": installments}
+        total = amount.quantize(CENT, rounding=ROUND_HALF_UP)
+        amount = (total / self.INSTALLMENTS).quantize(CENT, rounding=ROUND_HALF_UP)  # applying 3x installments
+        return {"amount": amount, "installments": self.INSTALLMENTS, "total": total}
 
 
 class PixPaymentStrategy(PaymentStrategy):
     """Concrete strategy for processing Pix payments."""
 
-    def process_payment(self, amount: float, payment_type) -> Dict[str, Any]:
+    DISCOUNT = Decimal("0.95")
+
+    def process_payment(self, amount: Decimal, payment_type) -> Dict[str, Any]:
         """Process a Pix payment."""
-        amount *= 0.95  # applying 5% discount
-        installments = 1
-        return {"amount": amount, "installments": installments}
+        amount = (amount * self.DISCOUNT).quantize(CENT, rounding=ROUND_HALF_UP)  # applying 5% discount
+        return {"amount": amount, "installments": 1, "total": amount}
 
 
 class BilletPaymentStrategy(PaymentStrategy):
     """Concrete strategy for processing billet payments."""
 
-    def process_payment(self, amount: float, payment_type) -> Dict[str, Any]:
+    def process_payment(self, amount: Decimal, payment_type) -> Dict[str, Any]:
         """Process a billet payment."""
-        return {"amount": amount, "installments": 1}
-
-
-class PaymentContext:
-    """Context for using a payment strategy."""
-
-    def __init__(self, strategy: PaymentStrategy):
-        self._strategy = strategy
-
-    def set_strategy(self, strategy: PaymentStrategy):
-        """Set a new payment strategy."""
-        self._strategy = strategy
-
-    def process_payment(self, amount: float, payment_type) -> Dict[str, Any]:
-        """Process the payment using the current strategy."""
-        return self._strategy.process_payment(
-            payment_type=payment_type,
-            amount=amount
-        )
+        amount = amount.quantize(CENT, rounding=ROUND_HALF_UP)
+        return {"amount": amount, "installments": 1, "total": amount}
+
+
+class PaymentStrategyRegistry:
+    """
+    Registry of stateless payment strategies, keyed by payment type.
+    Strategies are registered once and shared, so no strategy or context is built per payment.
+    """
+
+    def __init__(self):
+        self._strategies: Dict[PaymentTypeEnum, PaymentStrategy] = {}
+
+    def register(self, payment_type: PaymentTypeEnum, strategy: PaymentStrategy):
+        """Register the strategy used for a payment type, replacing any previous one."""
+        self._strategies[payment_type] = strategy
+
+    def get(self, payment_type: PaymentTypeEnum) -> PaymentStrategy | None:
+        """Get the strategy registered for a payment type."""
+        return self._strategies.get(payment_type)
+
+    def process_payment(self, amount: Decimal, payment_type: PaymentTypeEnum) -> Dict[str, Any]:
+        """Process a payment with the strategy registered for its type."""
+        strategy = self._strategies.get(payment_type)
+        if strategy is None:
+            raise KeyError(payment_type)
+        return strategy.process_payment(amount=amount, payment_type=payment_type)
+
+    def quote(self, price: Decimal) -> List[Dict[str, Any]]:
+        """Compute the payment options for a price with every registered strategy."""
+        quotes = []
+        for payment_type, strategy in self._strategies.items():
+            result = strategy.process_payment(amount=price, payment_type=payment_type)
+            quotes.append({
+                "payment_type": payment_type,
+                "amount": result["amount"],
+                "installments": result["installments"],
+                "total": result["total"],
+            })
+        return quotes
+
+
+payment_strategies = PaymentStrategyRegistry()
+"""PaymentStrategyRegistry: Process-wide registry of the available payment strategies."""
+payment_strategies.register(PaymentTypeEnum.PIX, PixPaymentStrategy())
+payment_strategies.register(PaymentTypeEnum.CREDIT_CARD, CreditCardPaymentStrategy())
+payment_strategies.register(PaymentTypeEnum.BILLET, BilletPaymentStrategy())
@@ -0,0 +1,50 @@
+from datetime import date
+from decimal import Decimal
+from typing import List
+from pydantic import BaseModel, Field
+
+from app.models.payments import PaymentTypeEnum
+
+
+class DailyRollupRead(BaseModel):
+    """Schema for reading the rollup of a course for one day and payment type."""
+    day: date = Field(..., description="Day of the rollup")
+    course_id: int = Field(..., description="ID of the course")
+    payment_type: PaymentTypeEnum = Field(..., description="Type of payment method")
+    enrollments: int = Field(..., description="Number of enrollments")
+    revenue: Decimal = Field(..., description="Revenue over all installments")
+
+
+class CourseTotalsRead(BaseModel):
+    """Schema for reading the totals of a course over a period."""
+    course_id: int = Field(..., description="ID of the course")
+    title: str = Field(..., description="Title of the course")
+    enrollments: int = Field(..., description="Number of enrollments")
+    revenue: Decimal = Field(..., description="Revenue over all installments")
+
+
+class PaymentTypeTotalsRead(BaseModel):
+    """Schema for reading the totals of a payment type over a period."""
+    payment_type: PaymentTypeEnum = Field(..., description="Type of payment method")
+    enrollments: int = Field(..., description="Number of enrollments")
+    revenue: Decimal = Field(..., description="Revenue over all installments")
+
+
+class InstructorDashboardRead(BaseModel):
+    """Schema for reading an instructor's revenue and enrollment dashboard."""
+    instructor_id: int = Field(..., description="ID of the instructor")
+    start: date = Field(..., description="First day of the period")
+    end: date = Field(..., description="Last day of the period")
+    enrollments: int = Field(..., description="Number of enrollments in the period")
+    revenue: Decimal = Field(..., description="Revenue in the period")
+    by_course: List[CourseTotalsRead] = Field(default_factory=list, description="Totals per course")
+    by_payment_type: List[PaymentTypeTotalsRead] = Field(default_factory=list, description="Totals per payment type")
+    daily: List[DailyRollupRead] = Field(default_factory=list, description="Daily rollups, oldest first")
+
+
+class RollupRebuildRead(BaseModel):
+    """Schema for reading the result of a rollup rebuild."""
+    course_id: int | None = Field(None, description="ID of the rebuilt course, or empty if every course was rebuilt")
+    payments: int = Field(..., description="Number of payments aggregated")
+    rollups: int = Field(..., description="Number of rollup rows written")
+    elapsed_ms: float = Field(..., description="Time taken by the rebuild, in milliseconds")
@@ -135,3 +135,48 @@ class LessonProgressionRead(BaseModel):
     completed: bool = Field(..., description="Whether the lesson has been completed by the user")
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class LessonCompletionRead(BaseModel):
+    """Schema for reading how many students completed a lesson."""
+    lesson_id: int = Field(..., description="ID of the lesson")
+    title: str = Field(..., description="Title of the lesson")
+    prerequisite_id: int | None = Field(None, description="ID of the prerequisite lesson if applicable")
+    completed: int = Field(..., description="Number of students who completed the lesson")
+    completion_percentage: float = Field(..., ge=0, le=100, description="Percentage of students who completed the lesson")
+
+
+class StudentCompletionRead(BaseModel):
+    """Schema for reading how many lessons of a course a student completed."""
+    user_id: int = Field(..., description="ID of the student")
+    completed: int = Field(..., description="Number of lessons completed")
+    progress_percentage: float = Field(..., ge=0, le=100, description="Percentage of the course completed")
+
+
+class PrerequisiteStepRead(BaseModel):
+    """Schema for reading one lesson of a prerequisite chain and the students lost before it."""
+    lesson_id: int = Field(..., description="ID of the lesson")
+    prerequisite_id: int | None = Field(None, description="ID of the prerequisite lesson, empty for the first lesson of a chain")
+    depth: int = Field(..., ge=0, description="Position of the lesson in its chain, starting at 0")
+    reached: int = Field(..., description="Students who completed this lesson and every lesson before it")
+    drop_off: int = Field(..., description="Students who reached the previous lesson but not this one")
+
+
+class CompletionHistogramBinRead(BaseModel):
+    """Schema for reading one bin of the distribution of students by progress."""
+    lower: float = Field(..., description="Lower bound of the bin, in percent")
+    upper: float = Field(..., description="Upper bound of the bin, in percent")
+    students: int = Field(..., description="Number of students in the bin")
+
+
+class CourseStatisticsRead(BaseModel):
+    """Schema for reading the completion statistics of a course."""
+    course_id: int = Field(..., description="ID of the course")
+    students: int = Field(..., description="Number of enrolled students")
+    lessons: int = Field(..., description="Number of lessons")
+    average_progress: float = Field(..., ge=0, le=100, description="Average percentage of the course completed")
+    completed_course: int = Field(..., description="Number of students who completed every lesson")
+    per_lesson: List[LessonCompletionRead] = Field(default_factory=list, description="Completion of each lesson")
+    per_student: List[StudentCompletionRead] = Field(default_factory=list, description="Progress of each student, paginated")
+    prerequisite_chain: List[PrerequisiteStepRead] = Field(default_factory=list, description="Drop-off along the prerequisite chains")
+    histogram: List[CompletionHistogramBinRead] = Field(default_factory=list, description="Distribution of students by progress")
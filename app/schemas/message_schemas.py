@@ -17,3 +17,9 @@ class MessageRead(BaseModel):
     created_at: datetime = Field(..., description="Timestamp of when the message was sent")
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class MessageArchiveRead(BaseModel):
+    """Schema for reading the result of a message archival run."""
+    archived: int = Field(..., description="Number of messages moved to the archive")
+    cutoff: datetime = Field(..., description="Messages created before this timestamp were archived")
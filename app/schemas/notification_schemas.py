@@ -0,0 +1,52 @@
+from datetime import datetime
+from pydantic import BaseModel, Field, ConfigDict
+
+from app.models.notifications import OutboxStatusEnum
+
+
+class NotificationJobRead(BaseModel):
+    """Schema for reading the delivery status of a notification fan-out job."""
+    id: int = Field(..., description="Unique identifier of the notification job")
+    status: OutboxStatusEnum = Field(..., description="Delivery status of the job")
+    recipient_type: str = Field(..., description="Type of recipient: 'student' or 'instructor'")
+    course_id: int = Field(..., description="ID of the course the notification belongs to")
+    delivered: int = Field(..., description="Number of notifications delivered so far")
+    created_at: datetime = Field(..., description="Timestamp of when the job was queued")
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class InboxNotificationRead(BaseModel):
+    """Schema for reading a notification in the user's inbox."""
+    id: int = Field(..., description="Unique identifier of the notification")
+    recipient_type: str = Field(..., description="Type of recipient: 'student' or 'instructor'")
+    message: str = Field(..., description="Notification message")
+    job_id: int | None = Field(None, description="ID of the job that delivered the notification")
+    created_at: datetime = Field(..., description="Timestamp of when the notification was delivered")
+    is_read: bool = Field(..., description="Whether the notification has been read")
+
+
+class NotificationCounterRead(BaseModel):
+    """Schema for reading the user's inbox counters."""
+    unread_count: int = Field(..., ge=0, description="Number of unread notifications")
+    last_read_id: int = Field(..., description="ID of the newest notification marked as read")
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class LatencyPercentilesRead(BaseModel):
+    """Schema for reading latency percentiles, in milliseconds."""
+    p50: float = Field(..., description="Median latency")
+    p95: float = Field(..., description="95th percentile latency")
+    p99: float = Field(..., description="99th percentile latency")
+
+
+class DispatchMetricsRead(BaseModel):
+    """Schema for reading the NotificationCenter dispatch metrics of a worker process."""
+    fan_outs: int = Field(..., description="Number of notify() calls")
+    deliveries: int = Field(..., description="Number of successful observer updates")
+    failures: int = Field(..., description="Number of observers that failed after every retry")
+    timeouts: int = Field(..., description="Number of observer updates that timed out")
+    retries: int = Field(..., description="Number of retried observer updates")
+    fan_out_latency_ms: LatencyPercentilesRead = Field(..., description="Latency of whole fan-outs")
+    delivery_latency_ms: LatencyPercentilesRead = Field(..., description="Latency of single observer updates")
@@ -1,12 +1,17 @@
-from typing import Generic, TypeVar
+import os
+from typing import Generic, TypeVar, List, Literal
 from decimal import Decimal
+from datetime import date, datetime
 from pydantic import BaseModel, ConfigDict, Field
 
-from app.models.payments import PaymentTypeEnum
+from app.models.payments import PaymentTypeEnum, InstallmentStatusEnum
 from app.schemas.course_schemas import CourseReadPartial
 
 T = TypeVar('T')
 
+BULK_ENROLLMENT_MAX_ROWS = int(os.getenv("BULK_ENROLLMENT_MAX_ROWS", "10000"))
+"""int: Maximum number of rows accepted by a single bulk enrollment request."""
+
 
 class PaymentCreate(BaseModel):
     """Schema for creating a payment."""
@@ -17,7 +22,8 @@ class PaymentCreate(BaseModel):
 class PaymentRead(BaseModel, Generic[T]):
     """Schema for reading a payment."""
     id: int = Field(..., description="Unique identifier for the payment")
-    amount: Decimal = Field(..., ge=0, description="Total amount paid")
+    amount: Decimal = Field(..., ge=0, description="Amount of each installment")
+    total: Decimal | None = Field(None, ge=0, description="Total amount paid over all installments")
     payment_type: PaymentTypeEnum = Field(..., description="Type of payment method used")
     installments: int = Field(..., ge=1, description="Number of installments for the payment")
     user_id: int = Field(..., description="ID of the user who made the payment")
@@ -25,3 +31,77 @@ class PaymentRead(BaseModel, Generic[T]):
     course: CourseReadPartial = Field(..., description="Details of the course associated with the payment")
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class PaymentQuoteRead(BaseModel):
+    """Schema for reading one payment option of a course."""
+    payment_type: PaymentTypeEnum = Field(..., description="Type of payment method")
+    amount: Decimal = Field(..., ge=0, description="Amount of each installment")
+    installments: int = Field(..., ge=1, description="Number of installments")
+    total: Decimal = Field(..., ge=0, description="Total amount paid over all installments")
+
+
+class CourseQuoteRead(BaseModel):
+    """Schema for reading every payment option of a course."""
+    course_id: int = Field(..., description="ID of the course")
+    price: Decimal | None = Field(None, description="Price of the course")
+    quotes: List[PaymentQuoteRead] = Field(default_factory=list, description="Payment options, one per payment type")
+
+
+class BulkEnrollmentItem(BaseModel):
+    """Schema for one row of a bulk enrollment."""
+    user_id: int = Field(..., description="ID of the user to enroll")
+    payment_type: PaymentTypeEnum = Field(..., description="Type of payment method used")
+
+
+class BulkEnrollmentCreate(BaseModel):
+    """Schema for enrolling many users in a course at once; each row is charged the course price."""
+    enrollments: List[BulkEnrollmentItem] = Field(
+        ..., min_length=1, max_length=BULK_ENROLLMENT_MAX_ROWS, description="Users to enroll"
+    )
+
+
+class BulkEnrollmentRowRead(BaseModel):
+    """Schema for reading the outcome of one bulk enrollment row."""
+    index: int = Field(..., description="Position of the row in the request")
+    user_id: int = Field(..., description="ID of the user")
+    status: Literal["enrolled", "already_enrolled", "duplicate", "user_not_found"] = Field(
+        ..., description="Outcome of the row"
+    )
+    payment_id: int | None = Field(None, description="ID of the created payment, if enrolled")
+    amount: Decimal | None = Field(None, description="Amount of each installment, if enrolled")
+    installments: int | None = Field(None, description="Number of installments, if enrolled")
+
+
+class BulkEnrollmentRead(BaseModel):
+    """Schema for reading the report of a bulk enrollment."""
+    course_id: int = Field(..., description="ID of the course")
+    enrolled: int = Field(..., description="Number of users enrolled")
+    skipped: int = Field(..., description="Number of rows not enrolled")
+    results: List[BulkEnrollmentRowRead] = Field(..., description="Outcome of each row, in request order")
+
+
+class InstallmentRead(BaseModel):
+    """Schema for reading an installment of a payment's schedule."""
+    id: int = Field(..., description="Unique identifier for the installment")
+    payment_id: int = Field(..., description="ID of the payment")
+    number: int = Field(..., ge=1, description="Position of the installment in the schedule")
+    amount: Decimal = Field(..., ge=0, description="Amount of the installment")
+    due_date: date = Field(..., description="Date when the installment is due")
+    status: InstallmentStatusEnum = Field(..., description="Whether the installment is pending or settled")
+    settled_at: datetime | None = Field(None, description="Date when the installment was settled")
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class SettlementRunRead(BaseModel):
+    """Schema for reading the progress of a settlement run."""
+    id: int = Field(..., description="Unique identifier for the run")
+    as_of: date = Field(..., description="Installments due up to this date are settled")
+    last_installment_id: int = Field(..., description="Checkpoint: ID of the last installment processed")
+    settled: int = Field(..., description="Number of installments settled so far")
+    batches: int = Field(..., description="Number of batches committed so far")
+    created_at: datetime = Field(..., description="Date when the run started")
+    finished_at: datetime | None = Field(None, description="Date when the run finished, if it did")
+
+    model_config = ConfigDict(from_attributes=True)
@@ -10,3 +10,38 @@ class PaginatedResponse(BaseModel, Generic[T]):
     per_page: int = Field(..., ge=1, description="Number of items per page")
     total: int | None = Field(None, description="Total number of items")
     items: List[T] = Field(..., description="List of items on the current page")
+    next_after_id: int | None = Field(None, description="Cursor of the next page for keyset pagination, if supported")
+
+
+class CacheStatsRead(BaseModel):
+    """Schema for reading the statistics of an in-process or shared cache."""
+    name: str = Field(..., description="Name the cache is registered under")
+    size: int | None = Field(None, description="Number of entries, when the cache can tell")
+    hits: int = Field(..., description="Lookups answered from the cache")
+    misses: int = Field(..., description="Lookups that missed")
+    hit_ratio: float = Field(..., ge=0, le=1, description="Fraction of lookups answered from the cache")
+
+
+class PasswordHashingStatsRead(BaseModel):
+    """Schema for reading the state of the password hashing pool."""
+    workers: int = Field(..., description="Hashing threads; 0 when hashing runs on the event loop")
+    in_flight: int = Field(..., description="Hashing jobs queued or running")
+    queue_depth: int = Field(..., description="Hashing jobs waiting for a thread")
+    max_queue_depth: int = Field(..., description="Deepest the queue has been")
+    completed: int = Field(..., description="Hashing jobs completed")
+    mean_wait_ms: float = Field(..., description="Mean time a job waited for a thread, in milliseconds")
+    mean_hash_ms: float = Field(..., description="Mean time spent hashing, in milliseconds")
+
+
+class LoginLimiterStatsRead(BaseModel):
+    """Schema for reading the load of the login route."""
+    concurrency: int = Field(..., description="Logins verified at the same time, at most")
+    active: int = Field(..., description="Logins being verified")
+    waiting: int = Field(..., description="Logins waiting for a slot")
+    rejected: int = Field(..., description="Logins refused because too many were waiting")
+
+
+class LoginStatsRead(BaseModel):
+    """Schema for reading the login throughput metrics."""
+    hashing: PasswordHashingStatsRead = Field(..., description="Password hashing pool")
+    logins: LoginLimiterStatsRead = Field(..., description="Login route")
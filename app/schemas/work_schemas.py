@@ -1,6 +1,8 @@
 from datetime import datetime
 from pydantic import BaseModel, Field, ConfigDict
-from typing import List
+from typing import Annotated, List
+
+from app.schemas.notification_schemas import NotificationJobRead
 
 
 # Work Schemas
@@ -21,11 +23,20 @@ class WorkRead(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+ANSWER_MAX_LENGTH = 5000
+"""int: Longest answer to a single question, in characters."""
+
+MAX_ANSWERS = 500
+"""int: Most answers a submission or an answer key can hold."""
+
+Answer = Annotated[str, Field(max_length=ANSWER_MAX_LENGTH)]
+
+
 # Work Answer Schemas
 class WorkAnswerCreate(BaseModel):
     """Schema for submitting or updating a student's answer."""
     work_id: int = Field(..., description="ID of the work")
-    answers: List[str] = Field(..., description="List of student's answers")
+    answers: List[Answer] = Field(..., max_length=MAX_ANSWERS, description="List of student's answers")
 
 
 class WorkAnswerRead(BaseModel):
@@ -35,10 +46,50 @@ class WorkAnswerRead(BaseModel):
     student_id: int = Field(..., description="ID of the student")
     answers: List[str] = Field(..., description="List of student's answers")
     updated_at: datetime = Field(..., description="Date when the answer was last updated")
+    score: float | None = Field(None, description="Percentage of correct answers, once graded")
+    revision: int = Field(1, description="Number of the latest revision of the answer")
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class WorkAnswerRevisionRead(BaseModel):
+    """Schema for reading an entry of an answer's revision log."""
+    revision: int = Field(..., description="Revision number, starting at 1")
+    is_snapshot: bool = Field(..., description="Whether the revision is stored as a full copy rather than a delta")
+    created_at: datetime = Field(..., description="Date when the revision was submitted")
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class WorkAnswerRevisionContentRead(BaseModel):
+    """Schema for reading the answers of a specific revision."""
+    answer_id: int = Field(..., description="ID of the answer")
+    revision: int = Field(..., description="Revision number")
+    answers: List[str] = Field(..., description="List of student's answers at this revision")
+    created_at: datetime = Field(..., description="Date when the revision was submitted")
+    replayed: int = Field(..., description="Number of deltas applied on top of the nearest snapshot")
+
+
+# Grading Schemas
+class GradeRequest(BaseModel):
+    """Schema for grading every answer of a work."""
+    answer_key: List[Answer] | None = Field(
+        None,
+        max_length=MAX_ANSWERS,
+        description="Expected answer for each question; stored for later runs. Uses the stored key if omitted"
+    )
+    case_sensitive: bool = Field(False, description="Whether answers must match the key's letter case")
+    strip: bool = Field(True, description="Whether leading and trailing whitespace is ignored")
+
+
+class GradingResultRead(BaseModel):
+    """Schema for reading the result of a grading job."""
+    work_id: int = Field(..., description="ID of the graded work")
+    graded: int = Field(..., description="Number of answers graded")
+    mean_score: float | None = Field(None, description="Mean score of the graded answers")
+    elapsed_ms: float = Field(..., description="Time taken by the grading job, in milliseconds")
+
+
 # Notification Schemas
 class NotificationRead(BaseModel):
     """Schema for reading notifications (Observer events)."""
@@ -50,11 +101,11 @@ class NotificationRead(BaseModel):
 
 # Combined Response Schemas
 class WorkWithNotifications(BaseModel):
-    """Response when a work is created or updated, including notifications."""
+    """Response when a work is created or updated, including the notification job."""
     work: WorkRead = Field(..., description="Created or updated work data")
-    notifications: List[NotificationRead] = Field(
-        default_factory=list,
-        description="List of notifications generated by this action"
+    notification_job: NotificationJobRead = Field(
+        ...,
+        description="Background job delivering the notifications generated by this action"
     )
 
 
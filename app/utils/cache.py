@@ -0,0 +1,86 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List
+
+
+class LRUCache:
+    """
+    Small in-process least-recently-used cache, with an optional time to live per entry.
+    Not shared between worker processes: entries must be safe to rebuild from the database on a miss.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float | None = None, name: str | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[float | None, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        if name is not None:
+            register_cache(name, self)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get an entry, marking it as the most recently used. Expired entries count as misses."""
+        try:
+            expires_at, value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store an entry, evicting the least recently used one when full."""
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        """Remove an entry, if present."""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_ratio(self) -> float:
+        """Fraction of lookups answered from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+# Cache Registry
+# ------------------------------------------------------------------------------
+caches: Dict[str, Any] = {}
+"""dict: Caches reporting their statistics, by name. Anything exposing `hits`, `misses` and `hit_ratio` can register."""
+
+
+def register_cache(name: str, cache: Any) -> None:
+    """Register a cache under a name, replacing any cache registered under it before."""
+    caches[name] = cache
+
+
+def cache_stats() -> List[Dict[str, Any]]:
+    """Get the statistics of every registered cache."""
+    return [
+        {
+            "name": name,
+            "size": len(cache) if hasattr(cache, "__len__") else None,
+            "hits": cache.hits,
+            "misses": cache.misses,
+            "hit_ratio": round(cache.hit_ratio, 4),
+        }
+        for name, cache in caches.items()
+    ]
@@ -0,0 +1,124 @@
+import os
+import time
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from app.utils.cache import LRUCache
+
+COMPLETION_MATRIX_CACHE_SIZE = int(os.getenv("COMPLETION_MATRIX_CACHE_SIZE", "256"))
+"""int: Maximum number of courses whose completion matrix is kept in memory."""
+
+COMPLETION_MATRIX_MAX_AGE = int(os.getenv("COMPLETION_MATRIX_MAX_AGE", "300"))
+"""int: Seconds after which a completion matrix is rebuilt, to pick up completions made by other processes."""
+
+
+class CompletionMatrix:
+    """
+    Completion state of a course as a students x lessons boolean array.
+    Built from the progressions once, then kept current cell by cell as lessons are completed,
+    so every statistic is a vectorized reduction over the array instead of a scan of `lesson_progressions`.
+    """
+
+    def __init__(
+            self, lessons: Sequence[Any], student_ids: Sequence[int], completions: Sequence[Tuple[int, int]]
+    ):
+        """
+        `lessons` expose `id`, `title` and `prerequisite_id`; `completions` are (user ID, lesson ID) pairs.
+        Completions of users or lessons outside the course are ignored.
+        """
+        self.lesson_ids = [lesson.id for lesson in lessons]
+        self.titles = [lesson.title for lesson in lessons]
+        self.prerequisite_ids = [lesson.prerequisite_id for lesson in lessons]
+        self.student_ids = list(student_ids)
+        self._lesson_index = {lesson_id: index for index, lesson_id in enumerate(self.lesson_ids)}
+        self._student_index = {student_id: index for index, student_id in enumerate(self.student_ids)}
+        self.completed = np.zeros((len(self.student_ids), len(self.lesson_ids)), dtype=np.bool_)
+        self.built_at = time.monotonic()
+
+        if len(completions) and self.completed.size:
+            pairs = np.asarray(completions, dtype=np.int64).reshape(-1, 2)
+            students = self._positions(self.student_ids, pairs[:, 0])
+            lessons = self._positions(self.lesson_ids, pairs[:, 1])
+            known = (students >= 0) & (lessons >= 0)
+            self.completed[students[known], lessons[known]] = True
+
+    @staticmethod
+    def _positions(ids: Sequence[int], values: np.ndarray) -> np.ndarray:
+        """Position of each value in `ids`, or -1 when absent, with one binary search per value."""
+        ids = np.asarray(ids, dtype=np.int64)
+        order = np.argsort(ids, kind="stable")
+        found = np.searchsorted(ids, values, sorter=order).clip(max=len(ids) - 1)
+        positions = order[found]
+        return np.where(ids[positions] == values, positions, -1)
+
+    @property
+    def expired(self) -> bool:
+        """Whether the matrix is older than `COMPLETION_MATRIX_MAX_AGE`."""
+        return time.monotonic() - self.built_at > COMPLETION_MATRIX_MAX_AGE
+
+    def mark(self, user_id: int, lesson_id: int) -> bool:
+        """Mark a lesson as completed by a student. Returns False if either is unknown to the matrix."""
+        student = self._student_index.get(user_id)
+        lesson = self._lesson_index.get(lesson_id)
+        if student is None or lesson is None:
+            return False
+        self.completed[student, lesson] = True
+        return True
+
+    def lesson_counts(self) -> np.ndarray:
+        """Number of students who completed each lesson."""
+        return self.completed.sum(axis=0)
+
+    def student_counts(self) -> np.ndarray:
+        """Number of lessons each student completed."""
+        return self.completed.sum(axis=1)
+
+    def histogram(self, bins: int = 10) -> List[Tuple[float, float, int]]:
+        """Distribution of students by percent complete, as (lower, upper, students) bins over 0-100."""
+        if not self.lesson_ids:
+            return []
+        percents = self.student_counts() * (100.0 / len(self.lesson_ids))
+        counts, edges = np.histogram(percents, bins=bins, range=(0, 100))
+        return [
+            (float(lower), float(upper), int(count))
+            for lower, upper, count in zip(edges[:-1], edges[1:], counts)
+        ]
+
+    def chain(self) -> List[Dict[str, Any]]:
+        """
+        Walk the prerequisite chains from their first lesson, in order.
+        For each lesson, `reached` counts the students who completed it and every lesson before it in its chain,
+        and `drop_off` the students who reached its prerequisite (or, for a first lesson, enrolled) but not it.
+        """
+        children: Dict[int | None, List[int]] = {}
+        for index, prerequisite_id in enumerate(self.prerequisite_ids):
+            parent = self._lesson_index.get(prerequisite_id) if prerequisite_id is not None else None
+            children.setdefault(parent, []).append(index)
+
+        reached = np.zeros_like(self.completed)
+        students = len(self.student_ids)
+        steps, counts = [], {}
+        stack = [(index, None, 0) for index in reversed(children.get(None, []))]
+        while stack:
+            index, parent, depth = stack.pop()
+            if parent is None:
+                reached[:, index] = self.completed[:, index]
+                before = students
+            else:
+                np.logical_and(self.completed[:, index], reached[:, parent], out=reached[:, index])
+                before = counts[parent]
+            count = counts[index] = int(np.count_nonzero(reached[:, index]))
+            steps.append({
+                "lesson_id": self.lesson_ids[index],
+                "prerequisite_id": self.lesson_ids[parent] if parent is not None else None,
+                "depth": depth,
+                "reached": count,
+                "drop_off": before - count,
+            })
+            stack.extend((child, index, depth + 1) for child in reversed(children.get(index, [])))
+        return steps
+
+
+completion_matrices = LRUCache(maxsize=COMPLETION_MATRIX_CACHE_SIZE, name="completion_matrices")
+"""LRUCache: Completion matrix of each course, by course ID, updated whenever a lesson is completed."""
@@ -17,3 +17,10 @@ class ValidationError(Exception):
     def __init__(self, message="Validation error"):
         self.message = message
         super().__init__(self.message)
+
+
+class ConflictError(Exception):
+    """Exception raised when a request conflicts with the current state of a resource."""
+    def __init__(self, message="Conflict"):
+        self.message = message
+        super().__init__(self.message)
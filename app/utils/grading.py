@@ -0,0 +1,58 @@
+from typing import List, Sequence
+
+import numpy as np
+
+_strip = np.frompyfunc(str.strip, 1, 1)
+_casefold = np.frompyfunc(str.casefold, 1, 1)
+
+
+class AnswerGrader:
+    """
+    Batch grader for work answers.
+    A batch of submissions is packed into a (submissions × questions) object array of the answer strings,
+    normalized with str.strip and str.casefold, one Python call per cell as NumPy has no vectorized casefold,
+    then compared column-wise with the key and scored in array operations. Unlike a fixed-width unicode array,
+    whose every cell is as wide as the longest answer, it only holds references to the answers.
+    Scoring is CPU-bound: callers on the event loop should run it in a thread.
+    """
+
+    def __init__(self, answer_key: Sequence[str], case_sensitive: bool = False, strip: bool = True):
+        self.case_sensitive = case_sensitive
+        self.strip = strip
+        self.question_count = len(answer_key)
+        self._key = self.normalize(np.array(answer_key, dtype=object).reshape(1, -1))
+        self._graded_questions = max(int(np.count_nonzero(self._key != "")), 1)
+
+    def normalize(self, answers: np.ndarray) -> np.ndarray:
+        """Apply the normalization rules to every cell of a packed answer array."""
+        if self.strip:
+            answers = _strip(answers)
+        if not self.case_sensitive:
+            answers = _casefold(answers)
+        return answers
+
+    def pack(self, submissions: Sequence[Sequence[str]]) -> np.ndarray:
+        """Pack submissions into a 2D object array, padding missing answers and dropping extra ones."""
+        width = self.question_count
+        rows = [
+            list(answers[:width]) + [""] * (width - len(answers))
+            for answers in submissions
+        ]
+        packed = np.empty((len(rows), width), dtype=object)
+        packed[:] = rows
+        return packed
+
+    def score(self, submissions: Sequence[Sequence[str]]) -> np.ndarray:
+        """
+        Score a batch of submissions, returning the percentage of correct answers for each one.
+        Questions with an empty key are not graded.
+        """
+        if not submissions:
+            return np.zeros(0)
+        answers = self.normalize(self.pack(submissions))
+        correct = (answers == self._key) & (self._key != "")
+        return np.round(correct.sum(axis=1) * 100.0 / self._graded_questions, 2)
+
+    def score_list(self, submissions: Sequence[Sequence[str]]) -> List[float]:
+        """Score a batch of submissions and return plain floats, ready to be persisted."""
+        return self.score(submissions).tolist()
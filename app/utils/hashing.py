@@ -0,0 +1,150 @@
+import os
+import time
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from fastapi import HTTPException, status
+
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+"""int: Threads hashing and verifying passwords; 0 runs them on the event loop."""
+
+LOGIN_CONCURRENCY = int(os.getenv("LOGIN_CONCURRENCY", "8"))
+"""int: Maximum number of logins verified at the same time per worker."""
+
+LOGIN_MAX_WAITING = int(os.getenv("LOGIN_MAX_WAITING", "256"))
+"""int: Maximum number of logins waiting for a slot before new ones are refused with a 503."""
+
+
+class PasswordHashPool:
+    """
+    Bounded thread pool for password hashing and verification.
+    Argon2 and bcrypt release the GIL while hashing, so the event loop keeps serving other requests
+    while a login is verified. Tracks the queue depth and the time spent waiting and hashing;
+    the counters updated from the pool's threads are guarded by a lock.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor: ThreadPoolExecutor | None = None
+        self.in_flight = 0
+        self.running = 0
+        self.max_queue_depth = 0
+        self.completed = 0
+        self.wait_seconds = 0.0
+        self.hash_seconds = 0.0
+        self._lock = threading.Lock()
+
+    async def run(self, function: Callable[..., Any], *args: Any) -> Any:
+        """Run a hashing function on the pool, or inline when the pool has no workers."""
+        if self.workers <= 0:
+            start = time.perf_counter()
+            try:
+                return function(*args)
+            finally:
+                self.completed += 1
+                self.hash_seconds += time.perf_counter() - start
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+
+        submitted = time.perf_counter()
+
+        def timed():
+            started = time.perf_counter()
+            with self._lock:
+                self.running += 1
+            try:
+                return function(*args)
+            finally:
+                finished = time.perf_counter()
+                with self._lock:
+                    self.running -= 1
+                    self.wait_seconds += started - submitted
+                    self.hash_seconds += finished - started
+
+        self.in_flight += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.in_flight - self.workers)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, timed)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+
+    @property
+    def queue_depth(self) -> int:
+        """Hashing jobs waiting for a thread."""
+        return max(self.in_flight - self.running, 0)
+
+    def stats(self) -> Dict[str, Any]:
+        """Current queue depth and cumulative timings."""
+        return {
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "completed": self.completed,
+            "mean_wait_ms": round(self.wait_seconds * 1000 / self.completed, 3) if self.completed else 0.0,
+            "mean_hash_ms": round(self.hash_seconds * 1000 / self.completed, 3) if self.completed else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        """Stop the pool's threads; a later job starts a new pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+class LoginLimiter:
+    """
+    Concurrency cap for the login route. Logins beyond `concurrency` wait for a slot,
+    and once `max_waiting` are waiting new ones are refused at once instead of piling up.
+    """
+
+    def __init__(self, concurrency: int, max_waiting: int):
+        self.concurrency = concurrency
+        self.max_waiting = max_waiting
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold a login slot, raising a 503 with Retry-After when too many logins are waiting."""
+        if self.waiting >= self.max_waiting:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many logins in progress, please retry shortly.",
+                headers={"Retry-After": "1"}
+            )
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Current and cumulative state of the login route."""
+        return {
+            "concurrency": self.concurrency,
+            "active": self.active,
+            "waiting": self.waiting,
+            "rejected": self.rejected,
+        }
+
+
+password_hash_pool = PasswordHashPool(workers=PASSWORD_HASH_WORKERS)
+"""PasswordHashPool: Pool every password hash and verification of the worker runs on."""
+
+login_limiter = LoginLimiter(concurrency=LOGIN_CONCURRENCY, max_waiting=LOGIN_MAX_WAITING)
+"""LoginLimiter: Concurrency cap of the login route."""
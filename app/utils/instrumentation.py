@@ -0,0 +1,174 @@
+import os
+import time
+import logging
+from contextvars import ContextVar
+from typing import Any, Dict, List
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.utils.metrics import http_request_duration, http_request_statements
+from app.utils.tracing import record_statement
+
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "500"))
+"""float: Requests slower than this many milliseconds are logged as slow, with their statements."""
+
+SLOW_REQUEST_STATEMENTS = int(os.getenv("SLOW_REQUEST_STATEMENTS", "50"))
+"""int: Requests issuing more SQL statements than this are logged as slow, with their statements."""
+
+SLOW_REQUEST_CAPTURE = int(os.getenv("SLOW_REQUEST_CAPTURE", "200"))
+"""int: Maximum number of statements kept per request for the slow request log."""
+
+request_logger = logging.getLogger("app.requests")
+"""Logger: Logger of the per-request statistics and of the slow request log."""
+
+
+class QueryStats:
+    """
+    SQL statistics of a single request: statement count, total database time, rows fetched
+    and the slowest statement. The first statements are kept, without their parameters, for the slow request log.
+    """
+
+    __slots__ = ("statements", "db_seconds", "rows", "slowest_sql", "slowest_seconds", "captured")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.rows = 0
+        self.slowest_sql: str | None = None
+        self.slowest_seconds = 0.0
+        self.captured: List[tuple[str, float, int]] = []
+
+    def record(self, sql: str, seconds: float, rows: int) -> None:
+        """Record an executed statement."""
+        self.statements += 1
+        self.db_seconds += seconds
+        self.rows += rows
+        if seconds >= self.slowest_seconds:
+            self.slowest_sql, self.slowest_seconds = sql, seconds
+        if len(self.captured) < SLOW_REQUEST_CAPTURE:
+            self.captured.append((sql, seconds, rows))
+
+
+query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+"""ContextVar: SQL statistics of the request being served, or None outside of a request."""
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """
+    Time every statement the engine executes and record it in the current request's statistics,
+    and in its trace when the request is sampled.
+    Statements run outside of a request, by the workers for instance, are not recorded.
+    """
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany): # noqa
+        if query_stats.get() is not None:
+            conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany): # noqa
+        stats = query_stats.get()
+        if stats is None or not conn.info.get("query_started"):
+            return
+        started = conn.info["query_started"].pop()
+        seconds = time.perf_counter() - started
+        rows = 0
+        if cursor.description is not None:
+            # The async adapters buffer the whole result set on execute; DBAPI rowcount is -1 for SELECTs on SQLite
+            buffered = getattr(cursor, "_rows", None)
+            rows = len(buffered) if buffered is not None else max(cursor.rowcount, 0)
+        stats.record(statement, seconds, rows)
+        record_statement(statement, started, seconds, rows)
+
+
+class QueryStatsMiddleware:
+    """
+    ASGI middleware collecting the SQL statistics and latency of each HTTP request.
+    Latency and statement counts are observed per route template for `/metrics`. The statistics are returned
+    in a `Server-Timing` header and logged as structured fields on the `app.requests` logger,
+    and requests over the SLOW_REQUEST_MS or SLOW_REQUEST_STATEMENTS thresholds are logged with their statements.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = query_stats.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(stats, time.perf_counter() - started).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            query_stats.reset(token)
+            seconds = time.perf_counter() - started
+            route = getattr(scope.get("route"), "path", "unmatched")
+            http_request_duration.observe(seconds, scope["method"], route, str(status_code))
+            http_request_statements.observe(stats.statements, scope["method"], route)
+            log_request(scope, status_code, stats, seconds)
+
+
+def server_timing(stats: QueryStats, seconds: float) -> str:
+    """Format the statistics of a request as a `Server-Timing` header value."""
+    return (
+        f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.statements} statements, {stats.rows} rows", '
+        f"db-slowest;dur={stats.slowest_seconds * 1000:.2f}, "
+        f"app;dur={seconds * 1000:.2f}"
+    )
+
+
+def request_fields(scope: Dict[str, Any], status_code: int, stats: QueryStats, seconds: float) -> Dict[str, Any]:
+    """Structured log fields of a request."""
+    route = scope.get("route")
+    return {
+        "method": scope["method"],
+        "path": scope["path"],
+        "route": getattr(route, "path", None),
+        "status": status_code,
+        "duration_ms": round(seconds * 1000, 2),
+        "db_statements": stats.statements,
+        "db_ms": round(stats.db_seconds * 1000, 2),
+        "db_rows": stats.rows,
+        "db_slowest_ms": round(stats.slowest_seconds * 1000, 2),
+        "db_slowest_sql": stats.slowest_sql,
+    }
+
+
+def log_request(scope: Dict[str, Any], status_code: int, stats: QueryStats, seconds: float) -> None:
+    """Log the statistics of a request, and its statements when it crossed a slow request threshold."""
+    fields = request_fields(scope, status_code, stats, seconds)
+    summary = " ".join(f"{key}={value}" for key, value in fields.items() if key != "db_slowest_sql")
+    if seconds * 1000 < SLOW_REQUEST_MS and stats.statements <= SLOW_REQUEST_STATEMENTS:
+        request_logger.info(f"request {summary}", extra={"request": fields})
+        return
+
+    statements = [
+        {"sql": sql, "duration_ms": round(duration * 1000, 2), "rows": rows}
+        for sql, duration, rows in stats.captured
+    ]
+    listing = "\n".join(
+        f"  {statement['duration_ms']:>8.2f} ms {statement['rows']:>6} rows  {' '.join(statement['sql'].split())}"
+        for statement in statements
+    )
+    omitted = stats.statements - len(statements)
+    if omitted:
+        listing += f"\n  ... {omitted} more statements"
+    request_logger.warning(
+        f"slow request {summary}\n{listing}",
+        extra={"request": fields, "statements": statements}
+    )
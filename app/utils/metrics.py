@@ -0,0 +1,210 @@
+import time
+import functools
+import inspect
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+from app.utils.cache import caches
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+"""tuple: Default histogram buckets, in seconds."""
+
+Labels = Tuple[str, ...]
+
+
+class Counter:
+    """Monotonic counter with labels. Increments are plain dictionary updates, with no lock."""
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Labels, float] = {}
+        metrics.register(self)
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        """Increment the counter of a label set."""
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def samples(self) -> Iterable[Tuple[str, Labels, float]]:
+        for labels, value in self._values.items():
+            yield self.name + "_total", labels, value
+
+
+class Histogram:
+    """
+    Histogram with labels and fixed buckets. An observation is a bisect and two increments;
+    buckets are stored per bucket and only made cumulative when scraped.
+    """
+
+    type = "histogram"
+
+    def __init__(
+            self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Labels, List[float]] = {}
+        metrics.register(self)
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Record an observation for a label set."""
+        series = self._series.get(labels)
+        if series is None:
+            # Bucket counts, then +Inf, then the sum
+            series = self._series[labels] = [0.0] * (len(self.buckets) + 2)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def samples(self) -> Iterable[Tuple[str, Labels, float]]:
+        for labels, series in self._series.items():
+            cumulative = 0.0
+            for bound, count in zip((*self.buckets, float("inf")), series):
+                cumulative += count
+                yield self.name + "_bucket", labels + (_format_value(bound),), cumulative
+            yield self.name + "_sum", labels, series[-1]
+            yield self.name + "_count", labels, cumulative
+
+    def sample_labelnames(self, sample: str) -> Labels:
+        return self.labelnames + ("le",) if sample.endswith("_bucket") else self.labelnames
+
+
+class CallbackMetric:
+    """Gauge or counter whose values are read from `collect` when scraped, so the hot path pays nothing."""
+
+    def __init__(
+            self, name: str, documentation: str, labelnames: Sequence[str],
+            collect: Callable[[], Iterable[Tuple[Labels, float]]], metric_type: str = "gauge"
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.type = metric_type
+        self._collect = collect
+        metrics.register(self)
+
+    def samples(self) -> Iterable[Tuple[str, Labels, float]]:
+        sample = self.name + "_total" if self.type == "counter" else self.name
+        for labels, value in self._collect():
+            yield sample, labels, value
+
+
+class MetricsRegistry:
+    """Metrics of the worker process, rendered in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+
+    def register(self, metric: Any) -> None:
+        """Register a metric, replacing any metric registered under its name before."""
+        self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text format (version 0.0.4)."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for sample, labels, value in metric.samples():
+                names = metric.sample_labelnames(sample) if hasattr(metric, "sample_labelnames") else metric.labelnames
+                if labels:
+                    label_text = ",".join(f'{name}="{_escape(label)}"' for name, label in zip(names, labels))
+                    lines.append(f"{sample}{{{label_text}}} {_format_value(value)}")
+                else:
+                    lines.append(f"{sample} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+metrics = MetricsRegistry()
+"""MetricsRegistry: Registry served by the `/metrics` endpoint."""
+
+
+# Application Metrics
+# ------------------------------------------------------------------------------
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "Latency of HTTP requests by route template.", ("method", "route", "status")
+)
+"""Histogram: Request latency, observed by the query statistics middleware."""
+
+http_request_statements = Histogram(
+    "http_request_db_statements", "SQL statements issued per HTTP request by route template.", ("method", "route"),
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500)
+)
+"""Histogram: SQL statements per request, observed by the query statistics middleware."""
+
+bo_method_duration = Histogram(
+    "bo_method_duration_seconds", "Latency of business object methods.", ("bo", "method")
+)
+"""Histogram: Business object method latency, observed by `timed_methods`."""
+
+app_exceptions = Counter(
+    "app_exceptions", "Application exceptions turned into HTTP errors, by exception class.", ("exception",)
+)
+"""Counter: Custom exceptions handled by the application's exception handlers."""
+
+
+def _cache_samples(attribute: str) -> Callable[[], Iterable[Tuple[Labels, float]]]:
+    def collect():
+        for name, cache in list(caches.items()):
+            if attribute == "size":
+                if hasattr(cache, "__len__"):
+                    yield (name,), len(cache)
+            else:
+                yield (name,), getattr(cache, attribute)
+    return collect
+
+
+CallbackMetric("cache_hits", "Cache lookups answered from the cache.", ("cache",), _cache_samples("hits"), "counter")
+CallbackMetric("cache_misses", "Cache lookups that missed.", ("cache",), _cache_samples("misses"), "counter")
+CallbackMetric("cache_entries", "Entries held by in-process caches.", ("cache",), _cache_samples("size"))
+
+
+def register_pool_metrics(engine: Any) -> None:
+    """Export the checked-out and overflow connection counts of an engine's pool, when the pool tracks them."""
+    pool = engine.pool
+    if not hasattr(pool, "checkedout"):
+        return
+    CallbackMetric(
+        "db_pool_checked_out", "Database connections checked out of the pool.", (), lambda: [((), pool.checkedout())]
+    )
+    CallbackMetric(
+        "db_pool_overflow", "Database connections open beyond the pool size.", (), lambda: [((), max(pool.overflow(), 0))]
+    )
+    CallbackMetric("db_pool_size", "Configured size of the database connection pool.", (), lambda: [((), pool.size())])
+
+
+def timed_methods(cls):
+    """
+    Class decorator observing the latency of the public coroutine methods of a business object
+    in `bo_method_duration_seconds`. Static and class methods are left as they are.
+    """
+    for name, attribute in list(vars(cls).items()):
+        if name.startswith("_") or not inspect.iscoroutinefunction(attribute):
+            continue
+        setattr(cls, name, _timed(attribute, cls.__name__, name))
+    return cls
+
+
+def _timed(method: Callable, bo: str, name: str) -> Callable:
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            bo_method_duration.observe(time.perf_counter() - started, bo, name)
+    return wrapper
@@ -0,0 +1,122 @@
+import os
+import json
+import dataclasses
+from typing import Any, Callable, Dict
+
+from app.utils.cache import LRUCache, register_cache
+
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+"""int: Maximum number of authenticated principals kept in memory per worker; 0 disables the cache."""
+
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "30"))
+"""float: Seconds a cached principal is trusted."""
+
+PRINCIPAL_CACHE_URL = os.getenv("PRINCIPAL_CACHE_URL")
+"""str: Redis URL of a cache shared by every worker (requires the `redis` package); unset keeps the cache in-process."""
+
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+"""int: Number of worker processes serving the application, as read by uvicorn and gunicorn."""
+
+
+class LocalPrincipalCache:
+    """
+    In-process cache of authenticated principals.
+    Entries are stored by user ID and only returned for the token version they were loaded with,
+    so a single delete invalidates a user whatever version their tokens carry.
+    Invalidations are not seen by other processes, so it is only safe with a single worker process.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = LRUCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, user_id: int, token_version: int) -> Any:
+        """Get the principal of a user for a token version, if cached."""
+        principal = self._cache.get(user_id)
+        if principal is None or principal.token_version != token_version:
+            return None
+        return principal
+
+    async def set(self, principal: Any) -> None:
+        """Cache a principal."""
+        self._cache.set(principal.id, principal)
+
+    async def invalidate(self, user_id: int) -> None:
+        """Drop the cached principal of a user."""
+        self._cache.delete(user_id)
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    @property
+    def hits(self) -> int:
+        return self._cache.hits
+
+    @property
+    def misses(self) -> int:
+        return self._cache.misses
+
+    @property
+    def hit_ratio(self) -> float:
+        return self._cache.hit_ratio
+
+
+class RedisPrincipalCache:
+    """
+    Principal cache shared by every worker through Redis, so an invalidation is seen by all of them at once.
+    Principals are stored as JSON under `principal:<user ID>` with the cache's time to live.
+    """
+
+    def __init__(self, url: str, ttl: float, loads: Callable[[Dict[str, Any]], Any]):
+        try:
+            from redis import asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("PRINCIPAL_CACHE_URL is set but the `redis` package is not installed") from e
+        self._redis = redis.from_url(url)
+        self._ttl = max(int(ttl), 1)
+        self._loads = loads
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, user_id: int, token_version: int) -> Any:
+        """Get the principal of a user for a token version, if cached."""
+        data = await self._redis.get(f"principal:{user_id}")
+        if data is not None:
+            fields = json.loads(data)
+            if fields.get("token_version") == token_version:
+                self.hits += 1
+                return self._loads(fields)
+        self.misses += 1
+        return None
+
+    async def set(self, principal: Any) -> None:
+        """Cache a principal."""
+        await self._redis.set(f"principal:{principal.id}", json.dumps(dataclasses.asdict(principal)), ex=self._ttl)
+
+    async def invalidate(self, user_id: int) -> None:
+        """Drop the cached principal of a user."""
+        await self._redis.delete(f"principal:{user_id}")
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def create_principal_cache(loads: Callable[[Dict[str, Any]], Any]):
+    """
+    Create the principal cache configured by the environment and register it for the cache statistics.
+    `loads` rebuilds a principal from its fields, for backends that serialize them.
+    Raises a RuntimeError when several worker processes would each keep their own cache: a user deactivated
+    through one of them would stay authorized on the others until their entry expires.
+    """
+    if PRINCIPAL_CACHE_URL:
+        cache = RedisPrincipalCache(PRINCIPAL_CACHE_URL, ttl=PRINCIPAL_CACHE_TTL, loads=loads)
+    elif WEB_CONCURRENCY > 1 and PRINCIPAL_CACHE_SIZE > 0:
+        raise RuntimeError(
+            f"WEB_CONCURRENCY is {WEB_CONCURRENCY}: set PRINCIPAL_CACHE_URL to share the principal cache "
+            "between workers, or PRINCIPAL_CACHE_SIZE=0 to check every token against the database"
+        )
+    else:
+        cache = LocalPrincipalCache(maxsize=PRINCIPAL_CACHE_SIZE, ttl=PRINCIPAL_CACHE_TTL)
+    register_cache("principals", cache)
+    return cache
@@ -0,0 +1,123 @@
+import os
+import sys
+import time
+import asyncio
+import threading
+from collections import Counter
+from typing import Any, List
+
+PROFILER_MAX_SECONDS = float(os.getenv("PROFILER_MAX_SECONDS", "60"))
+"""float: Longest profile an admin can request."""
+
+PROFILER_INTERVAL_MS = float(os.getenv("PROFILER_INTERVAL_MS", "10"))
+"""float: Milliseconds between two samples; the shortest interval an admin can request."""
+
+PROFILER_MAX_DEPTH = 128
+"""int: Frames kept per sampled stack, from the outermost one."""
+
+HIDDEN_MODULES = frozenset({"app.utils.metrics", "app.utils.tracing"})
+"""frozenset: Modules whose frames are left out of the stacks, like the wrappers of the instrumented methods."""
+
+
+def _frame_name(frame: Any) -> str:
+    """Name of a frame in a collapsed stack: `<module>:<qualified function name>`."""
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def _thread_stack(frame: Any) -> List[str]:
+    """The stack of a thread, from its outermost frame."""
+    names = []
+    while frame is not None:
+        if frame.f_globals.get("__name__") not in HIDDEN_MODULES:
+            names.append(_frame_name(frame))
+        frame = frame.f_back
+    names.reverse()
+    return names[:PROFILER_MAX_DEPTH]
+
+
+def _task_stack(task: asyncio.Task) -> List[str]:
+    """
+    The logical stack of a task: its coroutine, then each coroutine it awaits, down to the one
+    running or to the future it is suspended on.
+    """
+    names = []
+    awaitable = task.get_coro()
+    while awaitable is not None and len(names) < PROFILER_MAX_DEPTH:
+        frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "ag_frame", None) \
+            or getattr(awaitable, "gi_frame", None)
+        if frame is None:
+            if not hasattr(awaitable, "cr_code") and not hasattr(awaitable, "gi_code"):
+                names.append(f"<{type(awaitable).__name__}>")
+            break
+        if frame.f_globals.get("__name__") not in HIDDEN_MODULES:
+            names.append(_frame_name(frame))
+        awaitable = getattr(awaitable, "cr_await", None) or getattr(awaitable, "ag_await", None) \
+            or getattr(awaitable, "gi_yieldfrom", None)
+    return names
+
+
+class SamplingProfiler:
+    """
+    Sampling profiler for a live worker. A daemon thread samples the event loop every `interval` seconds:
+
+    - `cpu` mode samples the stack of the event loop thread, so the time the loop spends
+      running handlers, BO and DAO methods shows up under their frames, and idle time under the selector;
+    - `wall` mode samples the logical stack of every asyncio task, from its coroutine down to
+      what it awaits, so time spent waiting on the database or on a lock is attributed to the awaiting handler.
+
+    The result is a collapsed stack file (`frame;frame;frame count` per line), as read by flamegraph.pl or speedscope.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, mode: str, interval: float, exclude: asyncio.Task | None = None):
+        self.loop = loop
+        self.mode = mode
+        self.interval = interval
+        self.exclude = exclude
+        self.samples = 0
+        self._stacks: Counter[str] = Counter()
+        self._thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+
+    def _run(self) -> None:
+        next_at = time.perf_counter()
+        while not self._stop.wait(max(next_at - time.perf_counter(), 0)):
+            next_at += self.interval
+            if self.mode == "cpu":
+                self._sample_loop_thread()
+            else:
+                self._sample_tasks()
+            self.samples += 1
+
+    def _sample_loop_thread(self) -> None:
+        frame = sys._current_frames().get(self._thread_id) # noqa
+        if frame is not None:
+            self._stacks[";".join(_thread_stack(frame))] += 1
+
+    def _sample_tasks(self) -> None:
+        try:
+            tasks = asyncio.all_tasks(self.loop)
+        except RuntimeError:
+            # The task set changed while it was being copied; skip this sample
+            return
+        for task in tasks:
+            if task is self.exclude or task.done():
+                continue
+            stack = _task_stack(task)
+            if stack:
+                self._stacks[";".join(stack)] += 1
+
+    async def profile(self, seconds: float) -> str:
+        """Sample for `seconds` and return the collapsed stacks, most sampled first."""
+        self._thread.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            self._stop.set()
+            await asyncio.to_thread(self._thread.join)
+        return "".join(f"{stack} {count}\n" for stack, count in self._stacks.most_common())
+
+
+profiler_lock = asyncio.Lock()
+"""asyncio.Lock: Held while a profile runs, so a worker is never profiled twice at once."""
@@ -0,0 +1,42 @@
+from typing import Any, Dict, Iterable, List, Sequence
+
+
+def diff_answers(previous: Sequence[str], current: Sequence[str]) -> Dict[str, Any]:
+    """
+    Build the delta turning `previous` into `current`.
+    `n` is the new number of answers and `c` lists the [index, answer] pairs that changed or were added,
+    so an unchanged question costs nothing and a shortened submission is a single truncation.
+    """
+    changes = [
+        [index, answer]
+        for index, answer in enumerate(current)
+        if index >= len(previous) or previous[index] != answer
+    ]
+    return {"n": len(current), "c": changes}
+
+
+def apply_delta(answers: Sequence[str], delta: Dict[str, Any]) -> List[str]:
+    """Apply a delta built by `diff_answers` to a list of answers, returning a new list."""
+    length = delta["n"]
+    result = list(answers[:length]) + [""] * (length - len(answers))
+    for index, answer in delta["c"]:
+        result[index] = answer
+    return result
+
+
+def replay(revisions: Iterable[Any]) -> List[str]:
+    """
+    Rebuild answers from a revision chain ordered by revision number.
+    The chain must start at a snapshot; each row exposes `is_snapshot` and `content`.
+    """
+    answers: List[str] | None = None
+    for revision in revisions:
+        if revision.is_snapshot:
+            answers = list(revision.content)
+        elif answers is None:
+            raise ValueError("A revision chain must start with a snapshot")
+        else:
+            answers = apply_delta(answers, revision.content)
+    if answers is None:
+        raise ValueError("Empty revision chain")
+    return answers
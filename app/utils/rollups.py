@@ -0,0 +1,73 @@
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from app.models.payments import PaymentTypeEnum
+
+PAYMENT_TYPES = list(PaymentTypeEnum)
+"""list: Payment types, indexed by the code used in the packed grouping keys."""
+
+
+class RollupAccumulator:
+    """
+    Vectorized aggregation of payments into daily rollups per course and payment type.
+    Each chunk of payments is packed into one int64 key per row (course, day, payment type),
+    grouped with `np.unique` and summed with `np.bincount`; money is kept in integer cents.
+    """
+
+    _TYPES = len(PAYMENT_TYPES)
+    _DAYS = 1 << 20  # Day ordinals stay below 2**20 until the year 2870
+
+    def __init__(self):
+        self._totals: Dict[int, List[int]] = {}
+        self._instructors: Dict[int, int] = {}
+
+    def add_chunk(self, rows: Sequence[Any]) -> None:
+        """
+        Add a chunk of payment rows exposing `course_id`, `instructor_id`, `payment_type`,
+        `amount` (per installment), `installments`, `total` and `created_at`.
+        Payments made before their total was recorded count as `amount * installments`.
+        """
+        if not rows:
+            return
+        type_codes = {payment_type: code for code, payment_type in enumerate(PAYMENT_TYPES)}
+        courses = np.fromiter((row.course_id for row in rows), dtype=np.int64, count=len(rows))
+        days = np.fromiter((row.created_at.toordinal() for row in rows), dtype=np.int64, count=len(rows))
+        types = np.fromiter((type_codes[row.payment_type] for row in rows), dtype=np.int64, count=len(rows))
+        cents = np.fromiter((self._cents(row) for row in rows), dtype=np.int64, count=len(rows))
+
+        keys = (courses * self._DAYS + days) * self._TYPES + types
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        counts = np.bincount(inverse, minlength=len(unique_keys))
+        revenue = np.bincount(inverse, weights=cents, minlength=len(unique_keys)).astype(np.int64)
+
+        for key, count, total in zip(unique_keys.tolist(), counts.tolist(), revenue.tolist()):
+            accumulated = self._totals.setdefault(key, [0, 0])
+            accumulated[0] += count
+            accumulated[1] += total
+        self._instructors.update(zip(courses.tolist(), (row.instructor_id for row in rows)))
+
+    @staticmethod
+    def _cents(row: Any) -> int:
+        """Revenue of one payment in cents."""
+        if row.total is not None:
+            return int(Decimal(row.total) * 100)
+        return int(Decimal(row.amount) * 100) * row.installments
+
+    def rollups(self) -> List[Dict[str, Any]]:
+        """Get the accumulated rollups, ready to be inserted."""
+        results = []
+        for key, (count, cents) in self._totals.items():
+            course_and_day, type_code = divmod(key, self._TYPES)
+            course_id, day = divmod(course_and_day, self._DAYS)
+            results.append({
+                "day": date.fromordinal(day),
+                "course_id": course_id,
+                "instructor_id": self._instructors[course_id],
+                "payment_type": PAYMENT_TYPES[type_code],
+                "enrollments": count,
+                "revenue": Decimal(cents) / 100,
+            })
+        return results
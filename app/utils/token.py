@@ -1,10 +1,14 @@
 import os
+from typing import Any, Dict, Optional
 
+import jwt
+from fastapi_users import BaseUserManager, exceptions, models
 from fastapi_users.authentication import (
     BearerTransport,
     JWTStrategy,
     AuthenticationBackend
 )
+from fastapi_users.jwt import generate_jwt
 
 
 # Authentication Configs
@@ -17,9 +21,67 @@ SECRET_KEY = os.getenv("SECRET_KEY")
 
 
 # JWT Strategy
+class ClaimsJWTStrategy(JWTStrategy):
+    """
+    JWT strategy that also signs the user's token version (`ver`), checked against the user's to revoke tokens,
+    and the claims authorization depends on (`user_type`, `is_superuser`, `is_active`), which `current_principal`
+    trusts as long as the version is current.
+    The verification key is prepared once per strategy.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        key = self.decode_key
+        key = key.get_secret_value() if hasattr(key, "get_secret_value") else key
+        self._verify_key = key.encode() if isinstance(key, str) else key
+
+    async def write_token(self, user: models.UP) -> str:
+        """Issue a token carrying the user's ID and authorization claims."""
+        data = {
+            "sub": str(user.id),
+            "aud": self.token_audience,
+            "ver": user.token_version,
+            "user_type": getattr(user.user_type, "value", user.user_type),
+            "is_superuser": user.is_superuser,
+            "is_active": user.is_active,
+        }
+        return generate_jwt(data, self.encode_key, self.lifetime_seconds, algorithm=self.algorithm)
+
+    def read_claims(self, token: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Verify a token and return its claims, or None if it is missing, invalid or expired."""
+        if token is None:
+            return None
+        try:
+            return jwt.decode(token, self._verify_key, audience=self.token_audience, algorithms=[self.algorithm])
+        except jwt.PyJWTError:
+            return None
+
+    async def read_token(
+            self, token: Optional[str], user_manager: BaseUserManager[models.UP, models.ID]
+    ) -> Optional[models.UP]:
+        """
+        Verify a token and return its user, or None if the token is invalid or revoked: its version is behind
+        the user's since a password change or deactivation. Used by the fastapi-users routes (`/my-data`).
+        """
+        claims = self.read_claims(token)
+        if claims is None or claims.get("sub") is None:
+            return None
+        try:
+            user = await user_manager.get(user_manager.parse_id(claims["sub"]))
+        except (exceptions.UserNotExists, exceptions.InvalidID):
+            return None
+        if claims.get("ver", 0) != user.token_version:
+            return None
+        return user
+
+
+jwt_strategy = ClaimsJWTStrategy(secret=SECRET_KEY, lifetime_seconds=3600)
+"""ClaimsJWTStrategy: Strategy shared by every request, so its verification key is only prepared once."""
+
+
 def get_jwt_strategy() -> JWTStrategy:
     """Get the JWT strategy for authentication."""
-    return JWTStrategy(secret=SECRET_KEY, lifetime_seconds=3600)
+    return jwt_strategy
 
 
 # Authentication Backend
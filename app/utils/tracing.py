@@ -0,0 +1,347 @@
+import os
+import json
+import time
+import queue
+import random
+import logging
+import functools
+import inspect
+import threading
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List
+
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.01"))
+"""float: Fraction of requests traced, besides those a trusted upstream asks to trace."""
+
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "")
+"""str: File sampled traces are appended to, one OTLP/JSON export request per line; empty (default) disables tracing."""
+
+TRACE_EXPORT_MAX_BYTES = int(os.getenv("TRACE_EXPORT_MAX_BYTES", str(100 * 1024 * 1024)))
+"""int: Size past which the trace file is rotated to `<path>.1`, replacing the previous one."""
+
+TRACE_EXPORT_QUEUE = int(os.getenv("TRACE_EXPORT_QUEUE", "1000"))
+"""int: Traces waiting to be written; further traces are dropped until the writer catches up."""
+
+TRACE_MAX_PER_SECOND = int(os.getenv("TRACE_MAX_PER_SECOND", "20"))
+"""int: Most traces started per second and worker, whatever the sample rate or the upstreams ask for."""
+
+TRACE_TRUSTED_UPSTREAMS = frozenset(filter(None, os.getenv("TRACE_TRUSTED_UPSTREAMS", "").split(",")))
+"""frozenset: Client addresses (e.g. the gateway) whose sampled `traceparent` header forces a request to be traced."""
+
+TRACE_MAX_SPANS = int(os.getenv("TRACE_MAX_SPANS", "1000"))
+"""int: Maximum number of spans recorded per trace; further spans are counted as dropped."""
+
+SERVICE_NAME = os.getenv("SERVICE_NAME", "course-platform-api")
+"""str: Service name reported in the exported traces."""
+
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+
+class Span:
+    """A timed operation of a trace. Times are kept as `perf_counter_ns` and converted to wall time on export."""
+
+    __slots__ = ("trace", "span_id", "parent_id", "name", "kind", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, trace: "Trace", parent_id: str | None, name: str, kind: int, attributes: Dict[str, Any]):
+        self.trace = trace
+        self.span_id = random.getrandbits(64).to_bytes(8, "big").hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns: int | None = None
+        self.attributes = attributes
+        self.error: str | None = None
+
+    def child(self, name: str, kind: int = SPAN_KIND_INTERNAL, **attributes: Any) -> "Span | None":
+        """Start a child span, or return None when the trace is full."""
+        trace = self.trace
+        if len(trace.spans) >= TRACE_MAX_SPANS:
+            trace.dropped += 1
+            return None
+        span = Span(trace, self.span_id, name, kind, attributes)
+        trace.spans.append(span)
+        return span
+
+    def end(self, error: BaseException | None = None) -> None:
+        """End the span, recording the exception it failed with, if any."""
+        self.end_ns = time.perf_counter_ns()
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+
+    def to_otlp(self) -> Dict[str, Any]:
+        trace = self.trace
+        span = {
+            "traceId": trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(trace.to_unix_ns(self.start_ns)),
+            "endTimeUnixNano": str(trace.to_unix_ns(self.end_ns if self.end_ns is not None else self.start_ns)),
+            "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 0},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+class Trace:
+    """The spans of one sampled request, exported together once its root span ends."""
+
+    __slots__ = ("trace_id", "spans", "dropped", "_unix_ns", "_perf_ns")
+
+    def __init__(self, trace_id: str | None = None):
+        self.trace_id = trace_id or random.getrandbits(128).to_bytes(16, "big").hex()
+        self.spans: List[Span] = []
+        self.dropped = 0
+        self._unix_ns = time.time_ns()
+        self._perf_ns = time.perf_counter_ns()
+
+    def start(self, name: str, parent_id: str | None = None, kind: int = SPAN_KIND_SERVER, **attributes: Any) -> Span:
+        """Start the root span of the trace."""
+        span = Span(self, parent_id, name, kind, attributes)
+        self.spans.append(span)
+        return span
+
+    def to_unix_ns(self, perf_ns: int) -> int:
+        return self._unix_ns + perf_ns - self._perf_ns
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """The trace as an OTLP/JSON `ExportTraceServiceRequest`."""
+        spans = [span.to_otlp() for span in self.spans]
+        if self.dropped and spans:
+            spans[0]["droppedChildSpansCount"] = self.dropped
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+                "scopeSpans": [{"scope": {"name": __name__}, "spans": spans}],
+            }]
+        }
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class FileSpanExporter:
+    """
+    Appends traces to a file as OTLP/JSON lines, a stand-in for an OTLP collector:
+    each line can be replayed as is to a collector's `/v1/traces` HTTP endpoint.
+    Traces are queued and serialized and written by a daemon thread, so the event loop never blocks on the file;
+    when the queue is full, traces are dropped. The file is rotated once it grows past `max_bytes`.
+    """
+
+    def __init__(self, path: str, max_bytes: int = TRACE_EXPORT_MAX_BYTES, max_queued: int = TRACE_EXPORT_QUEUE):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.exported = 0
+        self.dropped = 0
+        self._queue: queue.Queue[Trace | None] = queue.Queue(maxsize=max_queued)
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def export(self, trace: Trace) -> None:
+        """Queue a finished trace to be written."""
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                    self._thread.start()
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        while True:
+            trace = self._queue.get()
+            if trace is None:
+                return
+            lines = [trace]
+            while len(lines) < 100:
+                try:
+                    trace = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if trace is None:
+                    self._write(lines)
+                    return
+                lines.append(trace)
+            self._write(lines)
+
+    def _write(self, traces: List[Trace]) -> None:
+        try:
+            if self.max_bytes and os.path.exists(self.path) and os.path.getsize(self.path) >= self.max_bytes:
+                os.replace(self.path, f"{self.path}.1")
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.writelines(json.dumps(trace.to_otlp(), separators=(",", ":")) + "\n" for trace in traces)
+            self.exported += len(traces)
+        except Exception:  # noqa
+            self.dropped += len(traces)
+            logging.exception(f"Could not write {len(traces)} traces to {self.path}")
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Write the queued traces and stop the writer thread."""
+        if self._thread is None:
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+
+class TraceRateLimit:
+    """Fixed one-second window limiting how many traces are started, so tracing overhead and disk use stay bounded."""
+
+    def __init__(self, per_second: int):
+        self.per_second = per_second
+        self._window = 0
+        self._count = 0
+
+    def allow(self) -> bool:
+        window = int(time.monotonic())
+        if window != self._window:
+            self._window, self._count = window, 0
+        if self._count >= self.per_second:
+            return False
+        self._count += 1
+        return True
+
+
+exporter = FileSpanExporter(TRACE_EXPORT_PATH) if TRACE_EXPORT_PATH else None
+"""FileSpanExporter: Exporter of the sampled traces, or None when tracing is disabled."""
+
+trace_rate_limit = TraceRateLimit(TRACE_MAX_PER_SECOND)
+"""TraceRateLimit: Cap on the traces started by this worker."""
+
+current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+"""ContextVar: Innermost open span of the sampled request being served, or None when it is not traced."""
+
+
+# Instrumentation
+# ------------------------------------------------------------------------------
+def _parse_traceparent(header: str | None) -> tuple[str, str, bool] | None:
+    """Parse a W3C `traceparent` header into (trace ID, parent span ID, sampled)."""
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16 or len(parts[3]) != 2:
+        return None
+    try:
+        sampled = bool(int(parts[3], 16) & 1)
+    except ValueError:
+        return None
+    return parts[1], parts[2], sampled
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware opening the root span of sampled requests, named after the route template.
+    BO and DAO methods and SQL statements run while serving the request are recorded as nested spans.
+    Unsampled requests only pay for the sampling decision. A sampled `traceparent` header only forces tracing
+    when it comes from a trusted upstream, and no more than `TRACE_MAX_PER_SECOND` traces are started per second.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or exporter is None:
+            await self.app(scope, receive, send)
+            return
+
+        parent = None
+        for name, value in scope.get("headers", ()):
+            if name == b"traceparent":
+                parent = _parse_traceparent(value.decode("latin-1"))
+                break
+        forced = parent is not None and parent[2] and (scope.get("client") or ("",))[0] in TRACE_TRUSTED_UPSTREAMS
+        if not (forced or random.random() < TRACE_SAMPLE_RATE) or not trace_rate_limit.allow():
+            await self.app(scope, receive, send)
+            return
+        trace, parent_id = (Trace(parent[0]), parent[1]) if parent is not None else (Trace(), None)
+
+        root = trace.start(scope["method"], parent_id, **{"http.method": scope["method"], "url.path": scope["path"]})
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"traceparent", f"00-{trace.trace_id}-{root.span_id}-01".encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = current_span.set(root)
+        error = None
+        try:
+            await self.app(scope, receive, send_with_status)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            current_span.reset(token)
+            route = getattr(scope.get("route"), "path", None)
+            if route:
+                root.name = f"{scope['method']} {route}"
+                root.attributes["http.route"] = route
+            root.attributes["http.status_code"] = status_code
+            root.end(error)
+            exporter.export(trace)
+
+
+def record_statement(statement: str, started: float, seconds: float, rows: int) -> None:
+    """Record an SQL statement, timed with `perf_counter`, as a child of the current span."""
+    parent = current_span.get()
+    if parent is None:
+        return
+    span = parent.child("db.query", SPAN_KIND_CLIENT, **{"db.statement": statement, "db.rows": rows})
+    if span is not None:
+        span.start_ns = int(started * 1e9)
+        span.end_ns = int((started + seconds) * 1e9)
+
+
+def traced_methods(cls):
+    """
+    Class decorator recording the public coroutine methods of a BO or DAO as spans of the current trace,
+    named `<class>.<method>`. Static and class methods are left as they are.
+    """
+    layer = "bo" if cls.__name__.endswith("BO") else "dao"
+    for name, attribute in list(vars(cls).items()):
+        if name.startswith("_") or not inspect.iscoroutinefunction(attribute):
+            continue
+        setattr(cls, name, _traced(attribute, f"{cls.__name__}.{name}", layer))
+    return cls
+
+
+def _traced(method: Callable, span_name: str, layer: str) -> Callable:
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        parent = current_span.get()
+        if parent is None:
+            return await method(*args, **kwargs)
+        span = parent.child(span_name, layer=layer)
+        if span is None:
+            return await method(*args, **kwargs)
+        token = current_span.set(span)
+        error = None
+        try:
+            return await method(*args, **kwargs)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            current_span.reset(token)
+            span.end(error)
+    return wrapper
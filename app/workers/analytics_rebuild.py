@@ -0,0 +1,29 @@
+"""
+Offline rebuild of the analytics rollups, for use outside the API (cron, maintenance windows):
+    python -m app.workers.analytics_rebuild [--course-id ID]
+"""
+import argparse
+import asyncio
+
+from app.db.database import engine, async_session_maker, create_db_and_tables
+from app.patterns.business_objects.analytics_bo import AnalyticsBO
+from app.patterns.data_access_objects.analytics_dao import AnalyticsDAO
+from app.models import users, messages, notifications, works  # noqa: F401  Registers the remaining mappers
+
+
+async def rebuild(course_id: int | None = None):
+    """Rebuild the rollups in a session of their own and print the result."""
+    await create_db_and_tables()
+    try:
+        async with async_session_maker() as session:
+            result = await AnalyticsBO(AnalyticsDAO(session)).rebuild_rollups(course_id=course_id)
+        print(result.model_dump_json())
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the analytics rollups from the payments table.")
+    parser.add_argument("--course-id", type=int, default=None)
+    args = parser.parse_args()
+    asyncio.run(rebuild(args.course_id))
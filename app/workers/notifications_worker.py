@@ -0,0 +1,159 @@
+import os
+import asyncio
+import logging
+from typing import List
+
+from app.db.database import async_session_maker
+from app.patterns.business_objects.notifications_bo import NotificationBO
+from app.patterns.data_access_objects.notifications_dao import NotificationDAO
+from app.patterns.data_access_objects.courses_dao import CourseDAO
+from app.patterns.data_access_objects.payments_dao import PaymentDAO
+
+NOTIFICATION_WORKERS = int(os.getenv("NOTIFICATION_WORKERS", "4"))
+"""int: Number of background tasks fanning out the notification outbox."""
+
+NOTIFICATION_BATCH_SIZE = int(os.getenv("NOTIFICATION_BATCH_SIZE", "500"))
+"""int: Number of recipients notified per batch."""
+
+NOTIFICATION_POLL_INTERVAL = float(os.getenv("NOTIFICATION_POLL_INTERVAL", "2.0"))
+"""float: Seconds an idle worker waits before polling the outbox again."""
+
+NOTIFICATION_STALE_AFTER = int(os.getenv("NOTIFICATION_STALE_AFTER", "300"))
+"""int: Seconds after which an entry stuck in processing is handed back to the queue."""
+
+NOTIFICATION_REQUEUE_INTERVAL = float(os.getenv("NOTIFICATION_REQUEUE_INTERVAL", "60"))
+"""float: Seconds between two sweeps handing stuck entries back to the queue; 0 only sweeps at startup."""
+
+NOTIFICATION_RECONCILE_INTERVAL = float(os.getenv("NOTIFICATION_RECONCILE_INTERVAL", "3600"))
+"""float: Seconds between two recounts of the unread counters, which fix any drift; 0 disables them."""
+
+
+class NotificationWorkerPool:
+    """Pool of background tasks that fan out pending outbox notifications in batches."""
+
+    def __init__(
+            self,
+            size: int,
+            batch_size: int,
+            poll_interval: float,
+            stale_after: int,
+            requeue_interval: float,
+            reconcile_interval: float,
+    ):
+        self.size = size
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self.requeue_interval = requeue_interval
+        self.reconcile_interval = reconcile_interval
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    def wake(self):
+        """Wake idle workers up, typically right after a new entry is written to the outbox."""
+        self._wakeup.set()
+
+    async def start(self):
+        """Requeue entries abandoned by a previous run and start the workers."""
+        await self._requeue_stale()
+
+        self._tasks = [
+            asyncio.create_task(self._run(), name=f"notification-worker-{i}")
+            for i in range(self.size)
+        ]
+        if self.requeue_interval > 0:
+            self._tasks.append(asyncio.create_task(self._requeue(), name="notification-stale-requeue"))
+        if self.reconcile_interval > 0:
+            self._tasks.append(asyncio.create_task(self._reconcile(), name="notification-counter-reconcile"))
+
+    async def stop(self):
+        """Cancel the workers; in-flight entries resume from their last checkpoint on restart."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _run(self):
+        """
+        Process outbox entries until cancelled, sleeping while the outbox is empty.
+        The wakeup event is cleared right before each claim, so a wake arriving during the claim is never lost,
+        and set again after a successful one, so a wake consumed by one worker still reaches the idle ones.
+        """
+        while True:
+            try:
+                async with async_session_maker() as session:
+                    bo = NotificationBO(
+                        notification_dao=NotificationDAO(session),
+                        payment_dao=PaymentDAO(session),
+                        course_dao=CourseDAO(session),
+                    )
+                    self._wakeup.clear()
+                    processed = await bo.process_next_outbox_entry(batch_size=self.batch_size)
+                if processed:
+                    self._wakeup.set()
+            except asyncio.CancelledError:
+                raise
+            except Exception: # noqa
+                logging.exception("Notification worker failed to process the outbox")
+                processed = False
+
+            if not processed:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _requeue_stale(self):
+        """Hand entries stuck in processing, e.g. by a worker that died mid-run, back to the queue."""
+        async with async_session_maker() as session:
+            bo = NotificationBO(
+                notification_dao=NotificationDAO(session),
+                payment_dao=PaymentDAO(session),
+                course_dao=CourseDAO(session),
+            )
+            requeued = await bo.requeue_stale_entries(stale_after=self.stale_after)
+        if requeued:
+            logging.info(f"Requeued {requeued} stale notification jobs")
+            self._wakeup.set()
+
+    async def _requeue(self):
+        """Requeue stale entries every `requeue_interval` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(self.requeue_interval)
+            try:
+                await self._requeue_stale()
+            except asyncio.CancelledError:
+                raise
+            except Exception: # noqa
+                logging.exception("Notification worker failed to requeue stale outbox entries")
+
+    async def _reconcile(self):
+        """Recount the unread counters every `reconcile_interval` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(self.reconcile_interval)
+            try:
+                async with async_session_maker() as session:
+                    bo = NotificationBO(
+                        notification_dao=NotificationDAO(session),
+                        payment_dao=PaymentDAO(session),
+                        course_dao=CourseDAO(session),
+                    )
+                    fixed = await bo.reconcile_counters(batch_size=self.batch_size)
+            except asyncio.CancelledError:
+                raise
+            except Exception: # noqa
+                logging.exception("Notification worker failed to reconcile the unread counters")
+                continue
+            if fixed:
+                logging.warning(f"Reconciled {fixed} drifted unread notification counters")
+
+
+notification_workers = NotificationWorkerPool(
+    size=NOTIFICATION_WORKERS,
+    batch_size=NOTIFICATION_BATCH_SIZE,
+    poll_interval=NOTIFICATION_POLL_INTERVAL,
+    stale_after=NOTIFICATION_STALE_AFTER,
+    requeue_interval=NOTIFICATION_REQUEUE_INTERVAL,
+    reconcile_interval=NOTIFICATION_RECONCILE_INTERVAL,
+)
+"""NotificationWorkerPool: Background worker pool started with the application."""
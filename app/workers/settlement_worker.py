@@ -0,0 +1,91 @@
+import os
+import socket
+import asyncio
+import logging
+from datetime import date
+
+from app.db.database import async_session_maker
+from app.models.payments import SettlementRun
+from app.patterns.business_objects.installments_bo import InstallmentBO
+from app.patterns.data_access_objects.installments_dao import InstallmentDAO
+from app.utils.exceptions import ConflictError
+
+SETTLEMENT_BATCH_SIZE = int(os.getenv("SETTLEMENT_BATCH_SIZE", "5000"))
+"""int: Number of installments settled per batch (and per checkpoint) of a settlement run."""
+
+SETTLEMENT_LEASE_SECONDS = int(os.getenv("SETTLEMENT_LEASE_SECONDS", "300"))
+"""int: Seconds without a checkpoint after which another worker may take over a settlement run; exceeds one batch."""
+
+
+class SettlementJob:
+    """
+    Background task running one installment settlement at a time.
+    Across workers, the run's lease in the database ensures that only one of them settles it.
+    """
+
+    def __init__(self, batch_size: int, lease_seconds: int):
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"[-64:]
+        self._task: asyncio.Task | None = None
+        self._run_id: int | None = None
+
+    @property
+    def running(self) -> bool:
+        """Whether a settlement run is in progress in this process."""
+        return self._task is not None and not self._task.done()
+
+    async def start(self, as_of: date) -> SettlementRun:
+        """Resume the unfinished settlement run, or start a new one for installments due by `as_of`."""
+        if self.running:
+            raise ConflictError("A settlement run is already in progress")
+        async with async_session_maker() as session:
+            run = await InstallmentBO(InstallmentDAO(session)).open_settlement_run(
+                as_of,
+                owner=self.owner,
+                lease_seconds=self.lease_seconds
+            )
+        self._run_id = run.id
+        self._task = asyncio.create_task(self._run(run.id), name=f"settlement-run-{run.id}")
+        return run
+
+    async def resume(self):
+        """Resume a run interrupted by a previous shutdown, if any, unless another worker already resumed it."""
+        async with async_session_maker() as session:
+            run = await InstallmentDAO(session).get_open_run()
+        if run is not None:
+            try:
+                await self.start(run.as_of)
+            except ConflictError:
+                return
+            logging.info(f"Resuming settlement run {run.id} after installment {run.last_installment_id}")
+
+    async def stop(self):
+        """Cancel the running settlement and release its lease; it resumes from its last checkpoint on restart."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+            try:
+                async with async_session_maker() as session:
+                    await InstallmentBO(InstallmentDAO(session)).release_settlement_run(self._run_id, owner=self.owner)
+            except Exception: # noqa
+                logging.exception(f"Could not release settlement run {self._run_id}; its lease expires on its own")
+
+    async def _run(self, run_id: int):
+        """Settle a run until it finishes or the task is cancelled."""
+        try:
+            async with async_session_maker() as session:
+                await InstallmentBO(InstallmentDAO(session)).settle(
+                    run_id,
+                    batch_size=self.batch_size,
+                    owner=self.owner
+                )
+        except asyncio.CancelledError:
+            raise
+        except Exception: # noqa
+            logging.exception(f"Settlement run {run_id} failed; it will resume from its last checkpoint")
+
+
+settlement_job = SettlementJob(batch_size=SETTLEMENT_BATCH_SIZE, lease_seconds=SETTLEMENT_LEASE_SECONDS)
+"""SettlementJob: Process-wide installment settlement job, resumed at startup and stopped at shutdown."""
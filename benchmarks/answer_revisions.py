@@ -0,0 +1,89 @@
+"""
+Storage benchmark for the work answer revision log: full copies of every submission against
+delta revisions with a snapshot every N revisions, and the replay cost of each interval.
+
+Run from the project root:
+    python -m benchmarks.answer_revisions --answers 1000 --questions 20 --revisions 30
+
+Sizes are those of the JSON documents stored in `work_answer_revisions.content`.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.revisions import diff_answers, apply_delta  # noqa: E402
+
+SNAPSHOT_INTERVALS = (1, 5, 10, 20, 50)
+"""tuple: Intervals measured; an interval of 1 stores every revision as a full copy."""
+
+
+def random_answer(rng: random.Random) -> str:
+    """A free-text answer of a few dozen characters."""
+    return " ".join(rng.choice(("lorem", "ipsum", "dolor", "sit", "amet", "consectetur")) for _ in range(rng.randint(3, 12)))
+
+
+def simulate_history(rng: random.Random, questions: int, revisions: int) -> List[List[str]]:
+    """
+    Simulate a student's resubmissions: the first one answers most questions,
+    later ones edit one to three answers and occasionally fill in a skipped question.
+    """
+    answers = [random_answer(rng) for _ in range(rng.randint(questions // 2, questions))]
+    history = [list(answers)]
+    for _ in range(revisions - 1):
+        for index in rng.sample(range(len(answers)), k=min(len(answers), rng.randint(1, 3))):
+            answers[index] = random_answer(rng)
+        if len(answers) < questions and rng.random() < 0.3:
+            answers.append(random_answer(rng))
+        history.append(list(answers))
+    return history
+
+
+def main(answers: int, questions: int, revisions: int, seed: int) -> None:
+    rng = random.Random(seed)
+    histories = [simulate_history(rng, questions, revisions) for _ in range(answers)]
+    full_size = sum(len(json.dumps(version)) for history in histories for version in history)
+
+    print(f"{answers} answers x {revisions} revisions, up to {questions} questions")
+    print(f"{'interval':>8} {'bytes':>12} {'vs full':>8} {'mean replay':>12} {'replay µs (p50/max)':>20}")
+    for interval in SNAPSHOT_INTERVALS:
+        size, chain_lengths, replay_times = 0, [], []
+        for history in histories:
+            log = []
+            for number, version in enumerate(history, start=1):
+                if (number - 1) % interval == 0:
+                    log.append((True, version))
+                else:
+                    log.append((False, diff_answers(history[number - 2], version)))
+                size += len(json.dumps(log[-1][1]))
+
+            # Rebuild the latest revision from the nearest snapshot, as the API does
+            start = max(number for number, (is_snapshot, _) in enumerate(log) if is_snapshot)
+            began = time.perf_counter()
+            rebuilt = list(log[start][1])
+            for _, delta in log[start + 1:]:
+                rebuilt = apply_delta(rebuilt, delta)
+            replay_times.append((time.perf_counter() - began) * 1_000_000)
+            assert rebuilt == history[-1]
+            chain_lengths.append(len(log) - 1 - start)
+
+        print(
+            f"{interval:>8} {size:>12,} {size / full_size:>8.1%} {statistics.fmean(chain_lengths):>12.1f} "
+            f"{statistics.median(replay_times):>10.1f}/{max(replay_times):.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--answers", type=int, default=1000)
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--revisions", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    main(args.answers, args.questions, args.revisions, args.seed)
@@ -0,0 +1,143 @@
+"""
+Benchmark for work answer submission: the previous SELECT-then-write path against the
+single-statement upsert in `WorkAnswerDAO.submit_or_update_answer`.
+The DAO path also appends to the answer's revision log, which the legacy path never kept.
+
+Run from the project root:
+    python -m benchmarks.answer_submission --students 200 --rounds 5
+
+Uses DATABASE_URL when set (point it at a throwaway MySQL schema for realistic numbers),
+otherwise a local SQLite file.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from typing import Any, Dict, List
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///./benchmark.db")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, event, select  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession  # noqa: E402
+
+from app.db.database import engine, async_session_maker, create_db_and_tables  # noqa: E402
+from app.models import messages, notifications  # noqa: E402,F401  Registers the remaining mappers
+from app.models.courses import Course  # noqa: E402
+from app.models.users import User, UserTypeEnum  # noqa: E402
+from app.models.works import Work, WorkAnswer  # noqa: E402
+from app.patterns.data_access_objects.works_dao import WorkAnswerDAO  # noqa: E402
+
+
+async def legacy_submit_or_update_answer(session: AsyncSession, answer_data: Dict[str, Any]) -> WorkAnswer:
+    """The pre-upsert implementation: SELECT, then UPDATE or INSERT, commit and refresh."""
+    stmt = select(WorkAnswer).where(
+        WorkAnswer.student_id == answer_data["student_id"],
+        WorkAnswer.work_id == answer_data["work_id"]
+    )
+    result = await session.execute(stmt)
+    existing = result.scalars().first()
+
+    if existing:
+        existing.answers = answer_data["answers"]
+        existing.score = None
+        existing.graded_at = None
+        await session.commit()
+        await session.refresh(existing)
+        return existing
+
+    answer = WorkAnswer(**answer_data)
+    session.add(answer)
+    await session.commit()
+    await session.refresh(answer)
+    return answer
+
+
+async def seed(students: int) -> tuple[int, List[int]]:
+    """Create one instructor, one course, one work and `students` students."""
+    run_id = time.time_ns()
+    async with async_session_maker() as session:
+        instructor = User(
+            email=f"bench-instructor-{run_id}@example.com", hashed_password="x",
+            first_name="Bench", last_name="Instructor", user_type=UserTypeEnum.INSTRUCTOR
+        )
+        session.add(instructor)
+        await session.flush()
+        course = Course(title="Benchmark course", price=0, instructor_id=instructor.id)
+        session.add(course)
+        await session.flush()
+        work = Work(title="Benchmark work", questions=["q1", "q2", "q3"], course_id=course.id)
+        session.add(work)
+        users = [
+            User(
+                email=f"bench-student-{run_id}-{i}@example.com", hashed_password="x",
+                first_name="Bench", last_name=str(i), user_type=UserTypeEnum.STUDENT
+            )
+            for i in range(students)
+        ]
+        session.add_all(users)
+        await session.commit()
+        return work.id, [user.id for user in users]
+
+
+async def run_path(name: str, work_id: int, student_ids: List[int], rounds: int, statements: List[int]) -> None:
+    """Submit every student once per round (the first round inserts, later ones update)."""
+    latencies: List[float] = []
+    statements[0] = 0
+
+    for round_number in range(rounds):
+        for student_id in student_ids:
+            answer_data = {
+                "work_id": work_id,
+                "student_id": student_id,
+                "answers": [f"a{round_number}", "b", "c"],
+            }
+            async with async_session_maker() as session:
+                start = time.perf_counter()
+                if name == "legacy":
+                    await legacy_submit_or_update_answer(session, answer_data)
+                else:
+                    await WorkAnswerDAO(session).submit_or_update_answer(answer_data)
+                latencies.append((time.perf_counter() - start) * 1000)
+
+    latencies.sort()
+    total = len(latencies)
+    print(
+        f"{name:>7}: {total} submissions, "
+        f"mean {statistics.fmean(latencies):.3f} ms, "
+        f"p50 {latencies[total // 2]:.3f} ms, "
+        f"p95 {latencies[int(total * 0.95) - 1]:.3f} ms, "
+        f"{statements[0] / total:.1f} statements/submission"
+    )
+
+
+async def main(students: int, rounds: int) -> None:
+    await create_db_and_tables()
+    work_id, student_ids = await seed(students)
+
+    statements = [0]
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def count_statements(*_):
+        statements[0] += 1
+
+    try:
+        for name in ("legacy", "upsert"):
+            async with async_session_maker() as session:
+                await session.execute(delete(WorkAnswer).where(WorkAnswer.work_id == work_id))
+                await session.commit()
+            await run_path(name, work_id, student_ids, rounds, statements)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", count_statements)
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.students, args.rounds))
@@ -0,0 +1,163 @@
+"""
+Benchmark for per-request authentication overhead: `fastapi_users.current_user()`, which loads the user
+and every selectin relationship, against `current_principal()`, on principal cache hits and misses.
+Also times tokens issued without claims.
+
+Run from the project root:
+    python -m benchmarks.auth_overhead --courses 50 --lessons 20 --messages 500 --requests 500
+
+Uses DATABASE_URL when set (point it at a throwaway MySQL schema for realistic numbers),
+otherwise a local SQLite file.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import List
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///./benchmark.db")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+from fastapi import Depends, FastAPI  # noqa: E402
+from fastapi_users.jwt import generate_jwt  # noqa: E402
+from sqlalchemy import event, insert, select  # noqa: E402
+
+from app.db.database import engine, async_session_maker, create_db_and_tables  # noqa: E402
+from app.models import notifications, works  # noqa: E402,F401  Registers the remaining mappers
+from app.models.courses import Course, Lesson, LessonProgression  # noqa: E402
+from app.models.messages import Message  # noqa: E402
+from app.models.payments import Payment, PaymentTypeEnum  # noqa: E402
+from app.models.users import (  # noqa: E402
+    User, UserTypeEnum, Principal, current_principal, fastapi_users, principal_cache
+)
+from app.utils.token import jwt_strategy  # noqa: E402
+
+app = FastAPI()
+
+
+@app.get("/full")
+async def full(user: User = Depends(fastapi_users.current_user())):
+    return {"id": user.id}
+
+
+@app.get("/principal")
+async def principal(user: Principal = Depends(current_principal())):
+    return {"id": user.id}
+
+
+async def seed(courses: int, lessons: int, messages: int) -> User:
+    """A student enrolled in `courses` courses of `lessons` lessons each, who sent `messages` messages."""
+    run_id = time.time_ns()
+    now = datetime.now()
+    async with async_session_maker() as session:
+        instructor = User(
+            email=f"bench-instructor-{run_id}@example.com", hashed_password="x",
+            first_name="Bench", last_name="Instructor", user_type=UserTypeEnum.INSTRUCTOR
+        )
+        student = User(
+            email=f"bench-student-{run_id}@example.com", hashed_password="x",
+            first_name="Bench", last_name="Student", user_type=UserTypeEnum.STUDENT
+        )
+        session.add_all([instructor, student])
+        await session.flush()
+
+        await session.execute(insert(Course.__table__), [
+            {"title": f"Course {i}", "price": 10, "instructor_id": instructor.id, "is_active": True,
+             "created_at": now, "updated_at": now}
+            for i in range(courses)
+        ])
+        course_ids = (await session.execute(
+            select(Course.id).where(Course.instructor_id == instructor.id)
+        )).scalars().all()
+        await session.execute(insert(Lesson.__table__), [
+            {"title": f"Lesson {j}", "lesson_type": "V", "course_id": course_id, "created_at": now, "updated_at": now}
+            for course_id in course_ids
+            for j in range(lessons)
+        ])
+        lesson_ids = (await session.execute(
+            select(Lesson.id).where(Lesson.course_id.in_(course_ids))
+        )).scalars().all()
+        await session.execute(insert(Payment.__table__), [
+            {"user_id": student.id, "course_id": course_id, "payment_type": PaymentTypeEnum.PIX, "amount": 10,
+             "installments": 1, "created_at": now, "updated_at": now}
+            for course_id in course_ids
+        ])
+        await session.execute(insert(LessonProgression.__table__), [
+            {"user_id": student.id, "lesson_id": lesson_id, "completed": False, "created_at": now, "updated_at": now}
+            for lesson_id in lesson_ids
+        ])
+        if course_ids:
+            await session.execute(insert(Message.__table__), [
+                {"content": f"Message {k}", "sender_id": student.id, "course_id": course_ids[k % len(course_ids)],
+                 "created_at": now, "updated_at": now}
+                for k in range(messages)
+            ])
+        await session.commit()
+        return student
+
+
+async def measure(
+        client: httpx.AsyncClient, path: str, token: str, requests: int, statements: List[int],
+        evict: int | None = None, label: str | None = None
+) -> None:
+    """Time `requests` sequential requests to one endpoint, evicting a user's cached principal before each if given."""
+    headers = {"Authorization": f"Bearer {token}"}
+    await client.get(path, headers=headers)  # Warm up
+    statements[0] = 0
+    latencies = []
+    for _ in range(requests):
+        if evict is not None:
+            await principal_cache.invalidate(evict)
+        start = time.perf_counter()
+        response = await client.get(path, headers=headers)
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200, response.text
+    latencies.sort()
+    print(
+        f"{label or path:>18}: mean {statistics.fmean(latencies):8.3f} ms, p50 {latencies[len(latencies) // 2]:8.3f} ms, "
+        f"p95 {latencies[int(len(latencies) * 0.95) - 1]:8.3f} ms, {statements[0] / requests:.1f} statements/request"
+    )
+
+
+async def main(courses: int, lessons: int, messages: int, requests: int) -> None:
+    await create_db_and_tables()
+    student = await seed(courses, lessons, messages)
+    print(f"user with {courses} payments, {courses * lessons} progressions and {messages} messages")
+
+    token = await jwt_strategy.write_token(student)
+    legacy_token = generate_jwt(
+        {"sub": str(student.id), "aud": jwt_strategy.token_audience}, jwt_strategy.encode_key,
+        jwt_strategy.lifetime_seconds, algorithm=jwt_strategy.algorithm
+    )
+
+    statements = [0]
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def count_statements(*_):
+        statements[0] += 1
+
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            await measure(client, "/full", token, requests, statements)
+            await measure(client, "/principal", token, requests, statements, label="principal hit")
+            await measure(client, "/principal", token, requests, statements, evict=student.id, label="principal miss")
+            await measure(client, "/principal", legacy_token, requests, statements, label="claim-less token")
+            print(f"principal cache hit ratio: {principal_cache.hit_ratio:.1%}")
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", count_statements)
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--courses", type=int, default=50)
+    parser.add_argument("--lessons", type=int, default=20)
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.courses, args.lessons, args.messages, args.requests))
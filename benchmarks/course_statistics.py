@@ -0,0 +1,78 @@
+"""
+Benchmark for course completion statistics: answering them from the in-memory completion matrix
+against aggregating the (user, lesson) progression rows in Python, as a scan of `lesson_progressions` would.
+
+Run from the project root:
+    python -m benchmarks.course_statistics --students 10000 --lessons 100
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from collections import Counter
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.completion import CompletionMatrix  # noqa: E402
+
+
+def simulate(rng: random.Random, students: int, lessons: int):
+    """A single prerequisite chain; each student completes a prefix of it of random length."""
+    outline = [
+        SimpleNamespace(id=number, title=f"Lesson {number}", prerequisite_id=number - 1 if number > 1 else None)
+        for number in range(1, lessons + 1)
+    ]
+    completions = [
+        (student, lesson)
+        for student in range(1, students + 1)
+        for lesson in range(1, int(lessons * rng.betavariate(2, 3)) + 1)
+    ]
+    return outline, list(range(1, students + 1)), completions
+
+
+def scan(completions, lessons: int):
+    """Per-lesson and per-student counts and a 10-bin histogram from the raw rows."""
+    per_lesson = Counter(lesson for _, lesson in completions)
+    per_student = Counter(student for student, _ in completions)
+    histogram = Counter(min(int(count * 10 / lessons), 9) for count in per_student.values())
+    return per_lesson, per_student, histogram
+
+
+def timed(function, repeat: int) -> float:
+    """Median wall time of `function` over `repeat` runs, in milliseconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main(students: int, lessons: int, repeat: int, seed: int) -> None:
+    outline, student_ids, completions = simulate(random.Random(seed), students, lessons)
+    print(f"{students:,} students x {lessons} lessons, {len(completions):,} completed progressions")
+
+    build = timed(lambda: CompletionMatrix(outline, student_ids, completions), repeat)
+    matrix = CompletionMatrix(outline, student_ids, completions)
+    stats = timed(lambda: (matrix.lesson_counts(), matrix.student_counts(), matrix.histogram(), matrix.chain()), repeat)
+    mark = timed(lambda: matrix.mark(student_ids[-1], outline[-1].id), repeat)
+    rows = timed(lambda: scan(completions, lessons), repeat)
+
+    print(f"matrix build:           {build:10.3f} ms  (once per cache miss)")
+    print(f"matrix statistics:      {stats:10.3f} ms  (per lesson, per student, histogram, drop-off)")
+    print(f"matrix mark completed:  {mark:10.4f} ms")
+    print(f"row scan (no drop-off): {rows:10.3f} ms  (per request, before any database time)")
+    print(f"matrix size:            {matrix.completed.nbytes / 1024:10.1f} KiB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--students", type=int, default=10_000)
+    parser.add_argument("--lessons", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    main(args.students, args.lessons, args.repeat, args.seed)
@@ -0,0 +1,195 @@
+"""
+Benchmark for the installment settlement job: seeds a ledger of due installments, settles it
+in keyset batches, and checks that a run interrupted halfway resumes from its checkpoint.
+
+Run from the project root:
+    python -m benchmarks.installment_settlement --rows 1000000 --batch-size 5000
+
+Uses DATABASE_URL when set (point it at a throwaway MySQL schema for realistic numbers),
+otherwise a local SQLite file.
+"""
+import argparse
+import asyncio
+import gc
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///./benchmark.db")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, insert, select, update  # noqa: E402
+
+from app.db.database import engine, async_session_maker, create_db_and_tables  # noqa: E402
+from app.models import messages, notifications, works  # noqa: E402,F401  Registers the remaining mappers
+from app.models.courses import Course  # noqa: E402
+from app.models.payments import (  # noqa: E402
+    Payment, PaymentInstallment, PaymentTypeEnum, InstallmentStatusEnum, SettlementRun
+)
+from app.models.users import User, UserTypeEnum  # noqa: E402
+from app.patterns.business_objects.installments_bo import InstallmentBO  # noqa: E402
+from app.patterns.data_access_objects.installments_dao import InstallmentDAO  # noqa: E402
+
+SEED_CHUNK = 10_000
+"""int: Rows written per executemany INSERT while seeding."""
+
+OWNER = "benchmark"
+"""str: Lease owner of the benchmark's runs; the interrupted run is resumed by the same owner."""
+
+
+async def seed(rows: int) -> tuple[int, int]:
+    """
+    Write `rows` installments: one 3x credit card payment per user, monthly due dates from today.
+    Returns the (first, last) installment IDs of the seeded range.
+    """
+    run_id = time.time_ns()
+    payments = (rows + 2) // 3
+    today = date.today()
+
+    async with async_session_maker() as session:
+        instructor = User(
+            email=f"bench-instructor-{run_id}@example.com", hashed_password="x",
+            first_name="Bench", last_name="Instructor", user_type=UserTypeEnum.INSTRUCTOR
+        )
+        session.add(instructor)
+        await session.flush()
+        course = Course(title="Benchmark course", price=300, instructor_id=instructor.id)
+        session.add(course)
+        await session.commit()
+        course_id = course.id
+
+        first_id = last_id = None
+        for start in range(0, payments, SEED_CHUNK):
+            count = min(SEED_CHUNK, payments - start)
+            now = datetime.now()
+            await session.execute(insert(User.__table__), [
+                {
+                    "email": f"bench-{run_id}-{start + i}@example.com", "hashed_password": "x",
+                    "is_active": True, "is_superuser": False, "is_verified": False,
+                    "first_name": "Bench", "last_name": str(start + i), "user_type": UserTypeEnum.STUDENT,
+                    "created_at": now, "updated_at": now,
+                }
+                for i in range(count)
+            ])
+            user_ids = (await session.execute(
+                select(User.id).where(User.email.like(f"bench-{run_id}-%")).order_by(User.id.desc()).limit(count)
+            )).scalars().all()
+            await session.execute(insert(Payment.__table__), [
+                {
+                    "user_id": user_id, "course_id": course_id, "payment_type": PaymentTypeEnum.CREDIT_CARD,
+                    "amount": 100, "installments": 3, "created_at": now, "updated_at": now,
+                }
+                for user_id in user_ids
+            ])
+            payment_ids = (await session.execute(
+                select(Payment.id).where(Payment.course_id == course_id).order_by(Payment.id.desc()).limit(count)
+            )).scalars().all()
+            await session.execute(insert(PaymentInstallment.__table__), [
+                {
+                    "payment_id": payment_id, "number": number, "amount": 100,
+                    "due_date": today + timedelta(days=30 * (number - 1)),
+                    "status": InstallmentStatusEnum.PENDING, "created_at": now, "updated_at": now,
+                }
+                for payment_id in payment_ids
+                for number in (1, 2, 3)
+            ])
+            await session.commit()
+
+        first_id, last_id = (await session.execute(
+            select(func.min(PaymentInstallment.id), func.max(PaymentInstallment.id))
+            .join(Payment, Payment.id == PaymentInstallment.payment_id)
+            .where(Payment.course_id == course_id)
+        )).one()
+        return first_id, last_id
+
+
+async def settle(as_of: date, batch_size: int, stop_after_batches: int | None = None) -> SettlementRun:
+    """Run the settlement job, optionally cancelling it after a number of committed batches."""
+    async with async_session_maker() as session:
+        bo = InstallmentBO(InstallmentDAO(session))
+        run = await bo.open_settlement_run(as_of, owner=OWNER, lease_seconds=300)
+        run_id = run.id
+
+    async def run_job():
+        async with async_session_maker() as job_session:
+            await InstallmentBO(InstallmentDAO(job_session)).settle(run_id, batch_size=batch_size, owner=OWNER)
+
+    task = asyncio.create_task(run_job())
+    if stop_after_batches is not None:
+        while not task.done():
+            await asyncio.sleep(0.01)
+            async with async_session_maker() as session:
+                run = await InstallmentDAO(session).get_run(run_id)
+                if run.batches >= stop_after_batches:
+                    task.cancel()
+                    break
+    await asyncio.gather(task, return_exceptions=True)
+    if stop_after_batches is not None:
+        # A statement cancelled mid-batch holds SQLite's lock until its cursor is collected
+        del task
+        gc.collect()
+
+    async with async_session_maker() as session:
+        return await InstallmentDAO(session).get_run(run_id)
+
+
+async def reset(first_id: int, last_id: int) -> None:
+    """Put the seeded installments back to pending."""
+    async with async_session_maker() as session:
+        await session.execute(
+            update(PaymentInstallment)
+            .where(PaymentInstallment.id.between(first_id, last_id))
+            .values(status=InstallmentStatusEnum.PENDING, settled_at=None)
+        )
+        await session.commit()
+
+
+async def main(rows: int, batch_size: int) -> None:
+    await create_db_and_tables()
+    as_of = date.today() + timedelta(days=60)
+
+    try:
+        started = time.perf_counter()
+        first_id, last_id = await seed(rows)
+        print(f"seeded {last_id - first_id + 1:,} installments in {time.perf_counter() - started:.1f} s")
+
+        started = time.perf_counter()
+        run = await settle(as_of, batch_size)
+        elapsed = time.perf_counter() - started
+        print(
+            f"full run: {run.settled:,} settled in {run.batches} batches, {elapsed:.2f} s, "
+            f"{run.settled / elapsed:,.0f} rows/s"
+        )
+
+        await reset(first_id, last_id)
+        interrupted = await settle(as_of, batch_size, stop_after_batches=max(run.batches // 2, 1))
+        print(f"interrupted after {interrupted.batches} batches at installment {interrupted.last_installment_id}")
+        started = time.perf_counter()
+        resumed = await settle(as_of, batch_size)
+        print(
+            f"resumed run {resumed.id}: {resumed.settled:,} settled in total, "
+            f"{time.perf_counter() - started:.2f} s for the remainder"
+        )
+
+        async with async_session_maker() as session:
+            pending = (await session.execute(
+                select(func.count())
+                .select_from(PaymentInstallment)
+                .where(
+                    PaymentInstallment.id.between(first_id, last_id),
+                    PaymentInstallment.status == InstallmentStatusEnum.PENDING
+                )
+            )).scalar_one()
+        print(f"pending after resume: {pending}")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.batch_size))
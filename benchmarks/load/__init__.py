@@ -0,0 +1,13 @@
+"""
+Load test suite: seeds a database with a synthetic platform (`benchmarks.load.seed`), then drives the real ASGI app
+with concurrent virtual users over a weighted scenario mix (`benchmarks.load.scenarios`) and reports throughput
+and latency percentiles per route as JSON.
+
+Run from the project root:
+    python -m benchmarks.load --users 32 --seconds 30 --output load-report.json
+    python -m benchmarks.load --users 32 --seconds 30 --compare load-report.json
+
+Uses DATABASE_URL when set (point it at a throwaway MySQL schema for realistic numbers),
+otherwise a local SQLite file; "Running the Load Test" in the README lists its limits. Seeding and scenario
+choices are driven by `--seed`, so two runs with the same arguments issue the same requests in the same proportions.
+"""
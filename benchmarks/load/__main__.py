@@ -0,0 +1,166 @@
+"""
+Runs the load test: seeds the database, drives the ASGI app with concurrent virtual users over the scenario mix,
+and reports throughput and p50/p95/p99 latency per route as JSON.
+
+Run from the project root:
+    python -m benchmarks.load --users 32 --seconds 30 --output load-report.json
+"""
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import random
+import time
+from datetime import datetime
+from typing import Any, Dict
+
+import httpx
+import numpy as np
+
+from benchmarks.load.seed import SeedConfig, seed, describe
+from benchmarks.load.scenarios import Recorder, VirtualUser, SCENARIOS, DEFAULT_MIX, parse_mix
+from app.main import app
+from app.db.database import engine, create_db_and_tables
+
+GC_INTERVAL = 1.0
+"""float: Seconds between the garbage collections run on the event loop during a run against SQLite."""
+
+
+async def collect_garbage(interval: float) -> None:
+    """Run a full garbage collection on the event loop thread every `interval` seconds, until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        gc.collect()
+
+
+def summarize(latencies: list[float], errors: int, seconds: float) -> Dict[str, Any]:
+    """Throughput and latency percentiles of a route, in requests per second and milliseconds."""
+    values = np.asarray(latencies)
+    p50, p95, p99 = np.percentile(values, [50, 95, 99]) if len(values) else (0.0, 0.0, 0.0)
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "throughput_rps": round(len(values) / seconds, 2),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "mean_ms": round(float(values.mean()), 3) if len(values) else 0.0,
+        "max_ms": round(float(values.max()), 3) if len(values) else 0.0,
+    }
+
+
+async def run_load(
+        dataset, users: int, seconds: float, warmup: float, mix: Dict[str, float], seed_value: int
+) -> Recorder:
+    """Run `users` virtual users for `warmup` then `seconds` seconds, recording only after the warmup."""
+    recorder = Recorder()
+    names, weights = list(mix), list(mix.values())
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://load") as client:
+        async def virtual_user(index: int, deadline: float):
+            rng = random.Random(seed_value * 1000 + index)
+            user = VirtualUser(client, dataset, recorder, dataset.student_ids[index::users], rng)
+            while time.perf_counter() < deadline:
+                name = rng.choices(names, weights)[0]
+                await SCENARIOS[name](user)
+                if recorder.enabled:
+                    recorder.scenarios[name] = recorder.scenarios.get(name, 0) + 1
+
+        deadline = time.perf_counter() + warmup + seconds
+        tasks = [asyncio.create_task(virtual_user(index, deadline)) for index in range(users)]
+        await asyncio.sleep(warmup)
+        recorder.enabled = True
+        await asyncio.gather(*tasks)
+    return recorder
+
+
+def report(args: argparse.Namespace, config: SeedConfig, dataset, recorder: Recorder, mix: Dict[str, float]) -> Dict:
+    """Build the JSON report of a run."""
+    routes = {
+        route: summarize(latencies, recorder.errors.get(route, 0), args.seconds)
+        for route, latencies in sorted(recorder.latencies.items())
+    }
+    all_latencies = [latency for latencies in recorder.latencies.values() for latency in latencies]
+    return {
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "database": engine.dialect.name,
+        "data": {**vars(config), "rows": describe(config, dataset)},
+        "load": {"users": args.users, "seconds": args.seconds, "warmup": args.warmup, "mix": mix},
+        "totals": summarize(all_latencies, sum(recorder.errors.values()), args.seconds),
+        "routes": routes,
+        "scenarios": recorder.scenarios,
+    }
+
+
+def compare(current: Dict, baseline: Dict) -> None:
+    """Print the change of throughput and latency percentiles per route against a previous report."""
+    print(f"\n{'route':<60} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}   vs {baseline['started_at']}")
+    for route, stats in {"total": current["totals"], **current["routes"]}.items():
+        before = baseline["totals"] if route == "total" else baseline["routes"].get(route)
+        if not before:
+            print(f"{route:<60} {'new':>8}")
+            continue
+        changes = [
+            (stats[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+            for key in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+        ]
+        print(f"{route:<60} " + " ".join(f"{change:>+7.1f}%" for change in changes))
+
+
+async def main(args: argparse.Namespace) -> None:
+    config = SeedConfig.from_arguments(args)
+    mix = parse_mix(args.mix) if args.mix else DEFAULT_MIX
+    # A garbage collection triggered from the aiosqlite worker thread can segfault the interpreter,
+    # so on SQLite the automatic collector is paused and the event loop collects instead
+    collector = None
+    if engine.dialect.name == "sqlite":
+        gc.disable()
+        collector = asyncio.create_task(collect_garbage(GC_INTERVAL))
+    await create_db_and_tables()
+    try:
+        started = time.perf_counter()
+        dataset = await seed(config)
+        print(f"seeded {describe(config, dataset)} in {time.perf_counter() - started:.1f} s")
+
+        recorder = await run_load(dataset, args.users, args.seconds, args.warmup, mix, config.seed)
+        result = report(args, config, dataset, recorder, mix)
+    finally:
+        if collector is not None:
+            collector.cancel()
+            gc.enable()
+        await engine.dispose()
+
+    print(f"\n{'route':<60} {'requests':>9} {'errors':>7} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for route, stats in {**result["routes"], "total": result["totals"]}.items():
+        print(
+            f"{route:<60} {stats['requests']:>9} {stats['errors']:>7} {stats['throughput_rps']:>8.1f} "
+            f"{stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f}"
+        )
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            compare(result, json.load(file))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(result, file, indent=2)
+        print(f"\nreport written to {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=16, help="Concurrent virtual users")
+    parser.add_argument("--seconds", type=float, default=20, help="Measured duration")
+    parser.add_argument("--warmup", type=float, default=3, help="Unmeasured warmup before the measurement")
+    parser.add_argument("--mix", help="Scenario weights, e.g. browse_catalog=40,enroll=5 (default: %s)" % ",".join(
+        f"{name}={weight}" for name, weight in DEFAULT_MIX.items()
+    ))
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--compare", help="Compare against a previous JSON report")
+    SeedConfig.add_arguments(parser)
+    arguments = parser.parse_args()
+
+    # Per-request logs would dominate the measurement
+    logging.getLogger().setLevel(logging.WARNING)
+    logging.getLogger("app.requests").setLevel(logging.ERROR)
+    asyncio.run(main(arguments))
@@ -0,0 +1,181 @@
+"""
+Scenarios of the load test. Each one is a short user journey of one to three requests, run by a virtual user
+on behalf of one of the students it owns; students are split between virtual users so that their progress
+and enrollments never race.
+"""
+import random
+import time
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, Dict, List
+
+import httpx
+
+from app.models.users import UserTypeEnum
+from app.utils.token import jwt_strategy
+from benchmarks.load.seed import Dataset, QUESTIONS_PER_WORK
+
+
+class Recorder:
+    """Latencies, in milliseconds, and error counts per route template, shared by every virtual user."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.scenarios: Dict[str, int] = {}
+        self.enabled = False
+
+    def record(self, route: str, milliseconds: float, ok: bool) -> None:
+        if not self.enabled:
+            return
+        self.latencies.setdefault(route, []).append(milliseconds)
+        if not ok:
+            self.errors[route] = self.errors.get(route, 0) + 1
+
+
+class VirtualUser:
+    """A simulated client running scenarios in a loop for the students it owns."""
+
+    def __init__(
+            self, client: httpx.AsyncClient, dataset: Dataset, recorder: Recorder,
+            student_ids: List[int], rng: random.Random
+    ):
+        self.client = client
+        self.dataset = dataset
+        self.recorder = recorder
+        self.student_ids = student_ids
+        self.rng = rng
+        self._tokens: Dict[int, Dict[str, str]] = {}
+
+    async def headers(self, user_id: int) -> Dict[str, str]:
+        """Authorization header of a seeded user, minted once instead of logging in."""
+        if user_id not in self._tokens:
+            user = SimpleNamespace(
+                id=user_id, token_version=0, user_type=UserTypeEnum.STUDENT, is_superuser=False, is_active=True
+            )
+            self._tokens[user_id] = {"Authorization": f"Bearer {await jwt_strategy.write_token(user)}"}
+        return self._tokens[user_id]
+
+    async def request(self, method: str, route: str, url: str, user_id: int, **kwargs: Any) -> httpx.Response:
+        """Send a request as a user and record its latency under its route template."""
+        headers = await self.headers(user_id)
+        started = time.perf_counter()
+        response = await self.client.request(method, url, headers=headers, **kwargs)
+        self.recorder.record(f"{method} {route}", (time.perf_counter() - started) * 1000, response.status_code < 400)
+        return response
+
+    def pick_student(self) -> int:
+        return self.rng.choice(self.student_ids)
+
+
+async def browse_catalog(user: VirtualUser) -> None:
+    """A student lists the catalog and opens a course."""
+    student_id = user.pick_student()
+    pages = max(len(user.dataset.courses) // 10, 1)
+    await user.request("GET", "/courses/", f"/courses/?page={user.rng.randint(1, pages)}&per_page=10", student_id)
+    course = user.rng.choice(user.dataset.courses)
+    await user.request("GET", "/courses/{course_id}", f"/courses/{course.id}", student_id)
+
+
+async def enroll(user: VirtualUser) -> None:
+    """A student gets the quotes of a course they are not enrolled in, then pays for it."""
+    student_id = user.pick_student()
+    enrolled = user.dataset.enrollments.setdefault(student_id, set())
+    for _ in range(5):
+        course = user.rng.choice(user.dataset.courses)
+        if course.id not in enrolled:
+            break
+    else:
+        return await browse_catalog(user)
+
+    await user.request("GET", "/payments/quote/{course_id}", f"/payments/quote/{course.id}", student_id)
+    response = await user.request(
+        "POST", "/payments/course/{course_id}", f"/payments/course/{course.id}", student_id,
+        json={"payment_type": "P", "amount": f"{course.price:.2f}"}
+    )
+    if response.status_code < 400:
+        enrolled.add(course.id)
+        user.dataset.next_lesson[(student_id, course.id)] = 0
+
+
+async def update_progress(user: VirtualUser) -> None:
+    """A student completes the next lesson of one of their courses, then reloads their progression."""
+    student_id = user.pick_student()
+    pending = [
+        course_id for course_id in user.dataset.enrollments.get(student_id, ())
+        if user.dataset.next_lesson[(student_id, course_id)] < len(user.dataset.course(course_id).lesson_ids)
+    ]
+    if not pending:
+        return await enroll(user)
+
+    course_id = user.rng.choice(sorted(pending))
+    index = user.dataset.next_lesson[(student_id, course_id)]
+    lesson_id = user.dataset.course(course_id).lesson_ids[index]
+    response = await user.request(
+        "PATCH", "/users/my-course-progression/{course_id}/{lesson_id}/",
+        f"/users/my-course-progression/{course_id}/{lesson_id}/", student_id
+    )
+    if response.status_code < 400:
+        user.dataset.next_lesson[(student_id, course_id)] = index + 1
+    await user.request(
+        "GET", "/users/my-course-progression/{course_id}", f"/users/my-course-progression/{course_id}", student_id
+    )
+
+
+async def chat(user: VirtualUser) -> None:
+    """A student reads the chat of one of their courses and posts a message."""
+    student_id = user.pick_student()
+    enrolled = sorted(user.dataset.enrollments.get(student_id, ()))
+    if not enrolled:
+        return await enroll(user)
+
+    course_id = user.rng.choice(enrolled)
+    await user.request("GET", "/messages/course/{course_id}", f"/messages/course/{course_id}", student_id)
+    await user.request(
+        "POST", "/messages/", "/messages/", student_id,
+        json={"content": f"Load test message from {student_id}", "course_id": course_id}
+    )
+
+
+async def submit_answer(user: VirtualUser) -> None:
+    """A student submits, or revises, their answer to a work of one of their courses and reads it back."""
+    student_id = user.pick_student()
+    works = [
+        work_id
+        for course_id in sorted(user.dataset.enrollments.get(student_id, ()))
+        for work_id in user.dataset.course(course_id).work_ids
+    ]
+    if not works:
+        return await browse_catalog(user)
+
+    work_id = user.rng.choice(works)
+    answers = [str(user.rng.randint(1, QUESTIONS_PER_WORK)) for _ in range(QUESTIONS_PER_WORK)]
+    response = await user.request(
+        "POST", "/works/answer", "/works/answer", student_id, json={"work_id": work_id, "answers": answers}
+    )
+    if response.status_code < 400:
+        user.dataset.answered.add((student_id, work_id))
+        await user.request("GET", "/works/{work_id}/my-answer", f"/works/{work_id}/my-answer", student_id)
+
+
+SCENARIOS: Dict[str, Callable[[VirtualUser], Awaitable[None]]] = {
+    "browse_catalog": browse_catalog,
+    "enroll": enroll,
+    "update_progress": update_progress,
+    "chat": chat,
+    "submit_answer": submit_answer,
+}
+"""dict: Scenarios by name."""
+
+DEFAULT_MIX = {"browse_catalog": 40, "update_progress": 25, "chat": 15, "submit_answer": 15, "enroll": 5}
+"""dict: Default relative weight of each scenario."""
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """Parse a scenario mix such as `browse_catalog=40,enroll=5`."""
+    mix = {}
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        if name.strip() not in SCENARIOS:
+            raise ValueError(f"Unknown scenario {name.strip()!r}, expected one of {', '.join(SCENARIOS)}")
+        mix[name.strip()] = float(weight)
+    return mix
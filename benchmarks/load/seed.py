@@ -0,0 +1,285 @@
+"""
+Synthetic data generator for the load test: instructors and their courses, lesson trees of a given depth
+and fan-out chained by prerequisites, students enrolled through payments with part of their lessons completed,
+course chat messages, and works with submitted answers.
+
+Run from the project root to seed without driving any load:
+    python -m benchmarks.load.seed --students 10000 --instructors 50
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from dataclasses import dataclass, field, fields
+from datetime import datetime
+from typing import Any, Dict, List, Set, Tuple
+
+if "DATABASE_URL" not in os.environ:
+    # SQLite stand-in: one connection, so concurrent virtual users queue for it instead of failing
+    # with "database is locked" when their transactions overlap
+    os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///./benchmark.db"
+    os.environ.setdefault("DATABASE_POOL_SIZE", "1")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("TRACE_SAMPLE_RATE", "0")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import func, insert, select  # noqa: E402
+
+from app.db.database import engine, async_session_maker, create_db_and_tables  # noqa: E402
+from app.models import notifications  # noqa: E402,F401  Registers the remaining mappers
+from app.models.courses import Course, Lesson, LessonProgression, LessonTypeEnum  # noqa: E402
+from app.models.messages import Message  # noqa: E402
+from app.models.payments import Payment, PaymentTypeEnum  # noqa: E402
+from app.models.users import User, UserTypeEnum  # noqa: E402
+from app.models.works import Work, WorkAnswer, WorkAnswerRevision  # noqa: E402
+
+SEED_CHUNK = 10_000
+"""int: Rows written per executemany INSERT."""
+
+PRICES = (19.9, 49.9, 99.0, 199.0)
+"""tuple: Course prices drawn from."""
+
+QUESTIONS_PER_WORK = 5
+"""int: Questions of every seeded work."""
+
+
+@dataclass
+class SeedConfig:
+    """Volumes of the synthetic data set; the defaults keep a run on the SQLite stand-in under a minute."""
+    instructors: int = 20
+    courses_per_instructor: int = 5
+    lesson_roots: int = 3
+    lesson_depth: int = 3
+    lesson_fanout: int = 2
+    students: int = 300
+    enrollments_per_student: int = 3
+    completed_ratio: float = 0.3
+    messages_per_course: int = 50
+    works_per_course: int = 2
+    answer_ratio: float = 0.5
+    seed: int = 42
+
+    @classmethod
+    def add_arguments(cls, parser: argparse.ArgumentParser) -> None:
+        """Add one `--option` per volume to an argument parser."""
+        for option in fields(cls):
+            parser.add_argument(f"--{option.name.replace('_', '-')}", type=type(option.default), default=option.default)
+
+    @classmethod
+    def from_arguments(cls, args: argparse.Namespace) -> "SeedConfig":
+        return cls(**{option.name: getattr(args, option.name) for option in fields(cls)})
+
+
+@dataclass
+class CourseData:
+    """A seeded course, with its lessons in prerequisite order."""
+    id: int
+    price: float
+    instructor_id: int
+    lesson_ids: List[int] = field(default_factory=list)
+    work_ids: List[int] = field(default_factory=list)
+
+
+@dataclass
+class Dataset:
+    """What the scenarios need to know about the seeded data, and the state they advance."""
+    instructor_ids: List[int]
+    student_ids: List[int]
+    courses: List[CourseData]
+    enrollments: Dict[int, Set[int]]
+    # Index, in the course's prerequisite order, of the next lesson each enrolled student has to complete
+    next_lesson: Dict[Tuple[int, int], int]
+    answered: Set[Tuple[int, int]] = field(default_factory=set)
+
+    def course(self, course_id: int) -> CourseData:
+        return self._courses_by_id[course_id]
+
+    def __post_init__(self):
+        self._courses_by_id = {course.id: course for course in self.courses}
+
+
+async def _next_ids(session, *models) -> Dict[Any, int]:
+    """First free primary key of each table, so the seeded rows can reference each other without reading IDs back."""
+    ids = {}
+    for model in models:
+        ids[model] = ((await session.execute(select(func.max(model.id)))).scalar() or 0) + 1
+    return ids
+
+
+async def _insert(session, model, rows: List[Dict[str, Any]]) -> None:
+    for start in range(0, len(rows), SEED_CHUNK):
+        await session.execute(insert(model.__table__), rows[start:start + SEED_CHUNK])
+
+
+def _lesson_tree(config: SeedConfig, rng: random.Random, course_id: int, first_id: int, now: datetime):
+    """
+    Lessons of a course: `lesson_roots` modules, each the root of a tree of `lesson_depth` levels
+    where every lesson has `lesson_fanout` children. In depth-first order every lesson requires the previous one.
+    """
+    rows = []
+
+    def add(parent_id: int | None, level: int):
+        lesson_id = first_id + len(rows)
+        rows.append({
+            "id": lesson_id, "course_id": course_id, "parent_id": parent_id,
+            "prerequisite_id": rows[-1]["id"] if rows else None,
+            "title": f"Lesson {len(rows) + 1}", "description": None,
+            "lesson_type": LessonTypeEnum.MODULE if level == 1 else rng.choice(
+                (LessonTypeEnum.VIDEO, LessonTypeEnum.TEXT, LessonTypeEnum.QUIZ)
+            ),
+            "file_path": None, "quiz_data": None, "created_at": now, "updated_at": now,
+        })
+        if level < config.lesson_depth:
+            for _ in range(config.lesson_fanout):
+                add(lesson_id, level + 1)
+
+    for _ in range(config.lesson_roots):
+        add(None, 1)
+    return rows
+
+
+async def seed(config: SeedConfig) -> Dataset:
+    """Write the synthetic data set and return what the scenarios need to know about it."""
+    rng = random.Random(config.seed)
+    run_id = time.time_ns()
+    now = datetime.now()
+
+    async with async_session_maker() as session:
+        ids = await _next_ids(session, User, Course, Lesson, Payment, LessonProgression, Message, Work, WorkAnswer)
+        user_id = ids[User]
+
+        instructor_ids = list(range(user_id, user_id + config.instructors))
+        student_ids = list(range(user_id + config.instructors, user_id + config.instructors + config.students))
+        await _insert(session, User, [
+            {
+                "id": uid, "email": f"load-{run_id}-{uid}@example.com", "hashed_password": "x",
+                "is_active": True, "is_superuser": False, "is_verified": True,
+                "first_name": "Load", "last_name": str(uid),
+                "user_type": UserTypeEnum.INSTRUCTOR if uid < user_id + config.instructors else UserTypeEnum.STUDENT,
+                "token_version": 0, "created_at": now, "updated_at": now,
+            }
+            for uid in instructor_ids + student_ids
+        ])
+
+        courses, course_rows, lesson_rows = [], [], []
+        for instructor_id in instructor_ids:
+            for _ in range(config.courses_per_instructor):
+                course = CourseData(ids[Course] + len(courses), rng.choice(PRICES), instructor_id)
+                courses.append(course)
+                course_rows.append({
+                    "id": course.id, "title": f"Course {course.id}", "description": "Synthetic course",
+                    "price": course.price, "is_active": True, "instructor_id": instructor_id,
+                    "created_at": now, "updated_at": now,
+                })
+                lessons = _lesson_tree(config, rng, course.id, ids[Lesson] + len(lesson_rows), now)
+                course.lesson_ids = [lesson["id"] for lesson in lessons]
+                lesson_rows.extend(lessons)
+        await _insert(session, Course, course_rows)
+        await _insert(session, Lesson, lesson_rows)
+
+        enrollments: Dict[int, Set[int]] = {}
+        next_lesson: Dict[Tuple[int, int], int] = {}
+        payment_rows, progression_rows = [], []
+        for student_id in student_ids:
+            picked = rng.sample(courses, min(config.enrollments_per_student, len(courses)))
+            enrollments[student_id] = {course.id for course in picked}
+            for course in picked:
+                payment_rows.append({
+                    "id": ids[Payment] + len(payment_rows), "user_id": student_id, "course_id": course.id,
+                    "payment_type": PaymentTypeEnum.PIX, "amount": course.price, "installments": 1,
+                    "created_at": now, "updated_at": now,
+                })
+                completed = int(len(course.lesson_ids) * config.completed_ratio * rng.random() * 2)
+                completed = min(completed, len(course.lesson_ids))
+                next_lesson[(student_id, course.id)] = completed
+                first_id = ids[LessonProgression] + len(progression_rows)
+                progression_rows.extend(
+                    {
+                        "id": first_id + index, "user_id": student_id,
+                        "lesson_id": lesson_id, "completed": index < completed, "created_at": now, "updated_at": now,
+                    }
+                    for index, lesson_id in enumerate(course.lesson_ids)
+                )
+        await _insert(session, Payment, payment_rows)
+        await _insert(session, LessonProgression, progression_rows)
+
+        students_by_course: Dict[int, List[int]] = {}
+        for student_id, course_ids in enrollments.items():
+            for course_id in course_ids:
+                students_by_course.setdefault(course_id, []).append(student_id)
+
+        message_rows, work_rows, answer_rows, revision_rows = [], [], [], []
+        dataset = Dataset(instructor_ids, student_ids, courses, enrollments, next_lesson)
+        for course in courses:
+            senders = students_by_course.get(course.id, []) + [course.instructor_id]
+            first_id = ids[Message] + len(message_rows)
+            message_rows.extend(
+                {
+                    "id": first_id + index, "content": f"Message {index} about course {course.id}",
+                    "sender_id": rng.choice(senders), "course_id": course.id, "created_at": now, "updated_at": now,
+                }
+                for index in range(config.messages_per_course)
+            )
+            for _ in range(config.works_per_course):
+                work_id = ids[Work] + len(work_rows)
+                course.work_ids.append(work_id)
+                work_rows.append({
+                    "id": work_id, "title": f"Work {work_id}", "course_id": course.id,
+                    "questions": [f"Question {number}" for number in range(1, QUESTIONS_PER_WORK + 1)],
+                    "answer_key": [str(number) for number in range(1, QUESTIONS_PER_WORK + 1)],
+                    "created_at": now, "updated_at": now,
+                })
+                for student_id in students_by_course.get(course.id, []):
+                    if rng.random() >= config.answer_ratio:
+                        continue
+                    answers = [str(rng.randint(1, QUESTIONS_PER_WORK)) for _ in range(QUESTIONS_PER_WORK)]
+                    answer_id = ids[WorkAnswer] + len(answer_rows)
+                    answer_rows.append({
+                        "id": answer_id, "answers": answers, "student_id": student_id, "work_id": work_id,
+                        "score": None, "graded_at": None, "revision": 1, "created_at": now, "updated_at": now,
+                    })
+                    revision_rows.append({
+                        "answer_id": answer_id, "revision": 1, "is_snapshot": True, "content": answers,
+                        "created_at": now, "updated_at": now,
+                    })
+                    dataset.answered.add((student_id, work_id))
+        await _insert(session, Message, message_rows)
+        await _insert(session, Work, work_rows)
+        await _insert(session, WorkAnswer, answer_rows)
+        await _insert(session, WorkAnswerRevision, revision_rows)
+        await session.commit()
+
+    return dataset
+
+
+def describe(config: SeedConfig, dataset: Dataset) -> Dict[str, int]:
+    """Row counts of a seeded data set."""
+    return {
+        "instructors": len(dataset.instructor_ids),
+        "students": len(dataset.student_ids),
+        "courses": len(dataset.courses),
+        "lessons": sum(len(course.lesson_ids) for course in dataset.courses),
+        "enrollments": len(dataset.next_lesson),
+        "progressions": sum(len(dataset.course(course_id).lesson_ids) for _, course_id in dataset.next_lesson),
+        "messages": len(dataset.courses) * config.messages_per_course,
+        "works": sum(len(course.work_ids) for course in dataset.courses),
+        "answers": len(dataset.answered),
+    }
+
+
+async def main(config: SeedConfig) -> None:
+    await create_db_and_tables()
+    try:
+        started = time.perf_counter()
+        dataset = await seed(config)
+        print(f"seeded {describe(config, dataset)} in {time.perf_counter() - started:.1f} s")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    SeedConfig.add_arguments(parser)
+    asyncio.run(main(SeedConfig.from_arguments(parser.parse_args())))
@@ -0,0 +1,135 @@
+"""
+Load test for the login route: measures the latency of another endpoint (GET /courses/) on its own and
+during a storm of concurrent logins, with password hashing on the event loop and on the hashing pool.
+
+Run from the project root:
+    python -m benchmarks.login_storm --users 200 --storm 64 --background 8 --seconds 5
+
+Uses DATABASE_URL when set (point it at a throwaway MySQL schema for realistic numbers),
+otherwise a local SQLite file.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///./benchmark.db")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+from fastapi_users.password import PasswordHelper  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.db.database import engine, async_session_maker, create_db_and_tables  # noqa: E402
+from app.models.users import User, UserTypeEnum  # noqa: E402
+from app.utils.hashing import password_hash_pool, login_limiter, PASSWORD_HASH_WORKERS  # noqa: E402
+
+PASSWORD = "benchmark-password"
+"""str: Password of every seeded user."""
+
+
+async def seed(users: int) -> List[str]:
+    """Create `users` students sharing one password hash, computed once. Returns their emails."""
+    run_id = time.time_ns()
+    hashed_password = PasswordHelper().hash(PASSWORD)
+    now = datetime.now()
+    emails = [f"bench-{run_id}-{i}@example.com" for i in range(users)]
+    async with async_session_maker() as session:
+        await session.execute(insert(User.__table__), [
+            {
+                "email": email, "hashed_password": hashed_password, "is_active": True, "is_superuser": False,
+                "is_verified": True, "first_name": "Bench", "last_name": str(i), "user_type": UserTypeEnum.STUDENT,
+                "token_version": 0, "created_at": now, "updated_at": now,
+            }
+            for i, email in enumerate(emails)
+        ])
+        await session.commit()
+    return emails
+
+
+def percentiles(latencies: List[float]) -> Dict[str, float]:
+    """p50 and p99 of a list of latencies in milliseconds."""
+    if not latencies:
+        return {"p50": 0.0, "p99": 0.0}
+    latencies = sorted(latencies)
+    return {
+        "p50": latencies[len(latencies) // 2],
+        "p99": latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)],
+    }
+
+
+async def phase(client: httpx.AsyncClient, token: str, emails: List[str], background: int, storm: int, seconds: float):
+    """Drive `background` clients against GET /courses/ and `storm` clients logging in, for `seconds`."""
+    deadline = time.perf_counter() + seconds
+    headers = {"Authorization": f"Bearer {token}"}
+    other: List[float] = []
+    logins: List[float] = []
+    rejected = [0]
+
+    async def browse():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = await client.get("/courses/", headers=headers)
+            other.append((time.perf_counter() - start) * 1000)
+            assert response.status_code == 200, response.text
+
+    async def login(offset: int):
+        index = offset
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = await client.post(
+                "/auth/jwt/login", data={"username": emails[index % len(emails)], "password": PASSWORD}
+            )
+            if response.status_code == 503:
+                rejected[0] += 1
+            else:
+                assert response.status_code == 200, response.text
+                logins.append((time.perf_counter() - start) * 1000)
+            index += storm
+
+    await asyncio.gather(*(browse() for _ in range(background)), *(login(i) for i in range(storm)))
+    return other, logins, rejected[0]
+
+
+async def main(users: int, storm: int, background: int, seconds: float) -> None:
+    await create_db_and_tables()
+    emails = await seed(users)
+
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            response = await client.post("/auth/jwt/login", data={"username": emails[0], "password": PASSWORD})
+            token = response.json()["access_token"]
+
+            print(f"{background} clients on GET /courses/, {storm} clients logging in, {seconds:.0f} s per phase")
+            print(f"{'hashing':>12} {'storm':>6} {'other p50':>10} {'other p99':>10} {'req/s':>8} "
+                  f"{'logins/s':>9} {'login p99':>10} {'rejected':>9}")
+            for workers in (0, PASSWORD_HASH_WORKERS):
+                password_hash_pool.workers = workers
+                for storm_size in (0, storm):
+                    other, logins, rejected = await phase(client, token, emails, background, storm_size, seconds)
+                    other_p, login_p = percentiles(other), percentiles(logins)
+                    print(
+                        f"{'event loop' if workers == 0 else f'{workers} threads':>12} {storm_size:>6} "
+                        f"{other_p['p50']:>8.2f}ms {other_p['p99']:>8.2f}ms {len(other) / seconds:>8.0f} "
+                        f"{len(logins) / seconds:>9.1f} {login_p['p99']:>8.1f}ms {rejected:>9}"
+                    )
+            print(f"pool: {password_hash_pool.stats()}")
+            print(f"login route: {login_limiter.stats()}")
+    finally:
+        password_hash_pool.shutdown()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--storm", type=int, default=64)
+    parser.add_argument("--background", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.storm, args.background, args.seconds))
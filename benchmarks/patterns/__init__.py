@@ -0,0 +1,16 @@
+"""
+Microbenchmarks for the design-pattern hot paths (`app.patterns`): composite render, prerequisite chain
+evaluation, lesson prototype clone, payment strategy dispatch and observer fan-out, each at several sizes.
+Every case reports operations per second and the memory one operation allocates, and is checked against
+a baseline file so a change that slows a path down or makes it allocate more fails the run.
+
+Run from the project root:
+    python -m benchmarks.patterns
+    python -m benchmarks.patterns --filter observer --tolerance 0.3
+    python -m benchmarks.patterns --update-baseline
+
+Nothing touches the database: the cases build transient model instances, as the business objects
+receive them once loaded. Allocations are deterministic, so their gate holds on any machine; throughput
+depends on the machine and how busy it is, so keep a baseline per (quiet) machine and widen `--tolerance`
+on shared runners.
+"""
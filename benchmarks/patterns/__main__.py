@@ -0,0 +1,194 @@
+"""
+Runs the pattern microbenchmarks, prints operations per second and allocations per case,
+and fails when a case regressed against the baseline file beyond the tolerance.
+
+Run from the project root:
+    python -m benchmarks.patterns --tolerance 0.25 --alloc-tolerance 0.1
+"""
+import argparse
+import asyncio
+import gc
+import inspect
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+from benchmarks.patterns.cases import CASES, Case
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+"""str: Baseline file checked in next to the cases."""
+
+ALLOC_SLACK_BYTES = 1024
+"""int: Allocation growth always tolerated, so cases allocating a few hundred bytes do not fail on noise."""
+
+
+async def _timed(operation: Callable[[], Any], loops: int) -> float:
+    if inspect.iscoroutinefunction(operation):
+        started = time.perf_counter()
+        for _ in range(loops):
+            await operation()
+    else:
+        started = time.perf_counter()
+        for _ in range(loops):
+            operation()
+    return time.perf_counter() - started
+
+
+async def _traced(operation: Callable[[], Any]) -> tuple[int, int]:
+    """Bytes allocated at the peak of one call, and bytes still allocated once its result is dropped."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        result = operation()
+        if inspect.isawaitable(result):
+            result = await result
+        peak = tracemalloc.get_traced_memory()[1]
+        del result
+        # The loop keeps the callback that resumed this coroutine, and what it resumed it with, until it yields
+        await asyncio.sleep(0)
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return peak - before, max(retained - before, 0)
+
+
+async def measure(operation: Callable[[], Any], min_time: float, repeat: int) -> Dict[str, Any]:
+    """
+    Throughput and allocations of an operation. The loop count grows 1, 2, 5, 10, ... until a run lasts
+    `min_time` seconds, then the best of `repeat` runs is kept. Allocations are traced over a further call:
+    the peak of memory allocated while it runs, and what is still allocated once its result is dropped.
+    The garbage collector stays enabled, as collections triggered by an operation are part of its cost.
+    """
+    await _timed(operation, 1)
+    loops = 1
+    while True:
+        for multiplier in (1, 2, 5):
+            if await _timed(operation, loops * multiplier) >= min_time:
+                loops *= multiplier
+                break
+        else:
+            loops *= 10
+            continue
+        break
+    best = min([await _timed(operation, loops) for _ in range(repeat)])
+
+    # The first traced call also traces one-off allocations, such as caches filled the first time a line is traced
+    for _ in range(2):
+        peak, retained = await _traced(operation)
+    return {
+        "ops_per_sec": round(loops / best, 2),
+        "us_per_op": round(best / loops * 1e6, 3),
+        "peak_bytes": peak,
+        "retained_bytes": retained,
+    }
+
+
+async def run_cases(cases: List[Case], min_time: float, repeat: int) -> Dict[str, Dict[str, Any]]:
+    """Measure every case, awaiting coroutine operations on the running event loop."""
+    results = {}
+    for case in cases:
+        stats = results[case.name] = await measure(case.setup(), min_time, repeat)
+        print(
+            f"{case.name:<32} {stats['ops_per_sec']:>14,.1f} {stats['us_per_op']:>14,.2f} "
+            f"{stats['peak_bytes'] / 1024:>12,.1f} {stats['retained_bytes'] / 1024:>12,.1f}",
+            flush=True
+        )
+    return results
+
+
+def check(
+        results: Dict[str, Dict[str, Any]], baseline: Dict[str, Any], tolerance: float, alloc_tolerance: float
+) -> List[str]:
+    """
+    Regressions of the results against a baseline: a case whose throughput dropped by more than `tolerance`,
+    or whose peak allocations grew by more than `alloc_tolerance` (and `ALLOC_SLACK_BYTES`).
+    """
+    regressions = []
+    print(f"\n{'case':<32} {'ops/s':>10} {'alloc':>10}   vs baseline of {baseline['created_at']}")
+    for name, stats in results.items():
+        before = baseline["cases"].get(name)
+        if not before:
+            print(f"{name:<32} {'new':>10}")
+            continue
+        speed = stats["ops_per_sec"] / before["ops_per_sec"] - 1
+        growth = stats["peak_bytes"] - before["peak_bytes"]
+        alloc = growth / before["peak_bytes"] if before["peak_bytes"] else 0.0
+        flags = []
+        if speed < -tolerance:
+            flags.append(f"throughput {speed:+.1%} exceeds -{tolerance:.0%}")
+        if alloc > alloc_tolerance and growth > ALLOC_SLACK_BYTES:
+            flags.append(f"peak allocations {alloc:+.1%} exceed +{alloc_tolerance:.0%}")
+        print(f"{name:<32} {speed:>+10.1%} {alloc:>+10.1%}   {'REGRESSION: ' + '; '.join(flags) if flags else 'ok'}")
+        regressions.extend(f"{name}: {flag}" for flag in flags)
+    return regressions
+
+
+def main(args: argparse.Namespace) -> int:
+    cases = [case for case in CASES if not args.filter or any(text in case.name for text in args.filter)]
+    if not cases:
+        print(f"No case matches {args.filter}, expected one of {', '.join(case.name for case in CASES)}")
+        return 2
+
+    print(f"{'case':<32} {'ops/s':>14} {'us/op':>14} {'peak KiB':>12} {'retained KiB':>12}")
+    results = asyncio.run(run_cases(cases, args.min_time, args.repeat))
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cases": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+        print(f"\nreport written to {args.output}")
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+
+    if args.update_baseline:
+        # A filtered run only replaces the cases it measured
+        if baseline:
+            report["cases"] = {**baseline["cases"], **results}
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+            file.write("\n")
+        print(f"\nbaseline written to {args.baseline}")
+        return 0
+
+    if baseline is None:
+        print(f"\nNo baseline at {args.baseline}; run with --update-baseline to create it")
+        return 0
+    regressions = check(results, baseline, args.tolerance, args.alloc_tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s):\n  " + "\n  ".join(regressions))
+        return 1
+    print("\nNo regression")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--filter", action="append", help="Only run cases whose name contains this text (repeatable)")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Shortest duration of one timed run, in seconds")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case, the best one is kept")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline file (default: %(default)s)")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.25, help="Largest tolerated throughput drop, as a fraction (default: 0.25)"
+    )
+    parser.add_argument(
+        "--alloc-tolerance", type=float, default=0.1,
+        help="Largest tolerated growth of peak allocations, as a fraction (default: 0.1)"
+    )
+    parser.add_argument("--update-baseline", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,176 @@
+"""
+Benchmark cases of the pattern modules. Each case builds its inputs once, outside of the measurement,
+and returns the operation to measure: a function, or a coroutine function run on the runner's event loop.
+"""
+import os
+import sys
+from dataclasses import dataclass
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///./benchmark.db")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.models import messages, notifications, works  # noqa: E402,F401  Registers the remaining mappers
+from app.models.courses import Course, Lesson, LessonProgression, LessonTypeEnum  # noqa: E402
+from app.models.payments import Payment, PaymentTypeEnum  # noqa: E402
+from app.schemas.message_schemas import MessageCreate  # noqa: E402
+from app.patterns.chain_of_responsability import ConcreteLessonProgressHandler  # noqa: E402
+from app.patterns.mediator import CourseChatMediator  # noqa: E402
+from app.patterns.observer import NotificationCenter, DispatchMetrics, StudentObserver  # noqa: E402
+from app.patterns.prototype import LessonPrototype  # noqa: E402
+from app.patterns.strategy import payment_strategies  # noqa: E402
+from app.patterns.business_objects.notifications_bo import (  # noqa: E402
+    NOTIFICATION_DISPATCH_CONCURRENCY, NOTIFICATION_DISPATCH_TIMEOUT,
+    NOTIFICATION_DISPATCH_RETRIES, NOTIFICATION_DISPATCH_BACKOFF,
+)
+
+TREE_FANOUT = 10
+"""int: Children of every module of the composite benchmark trees."""
+
+STUDENT_ID = 1
+"""int: Student on whose behalf the chain and mediator cases run."""
+
+
+@dataclass
+class Case:
+    """A benchmark case: `setup` builds the inputs and returns the operation to measure."""
+    name: str
+    setup: Callable[[], Callable[[], Any]]
+    description: str
+
+
+def lesson_tree(nodes: int) -> Lesson:
+    """A transient tree of `nodes` lessons, filled breadth first with `TREE_FANOUT` children per module."""
+    root = Lesson(id=1, title="Lesson 1", lesson_type=LessonTypeEnum.MODULE)
+    modules, created = [root], 1
+    while created < nodes:
+        parent = modules.pop(0)
+        parent.lesson_type = LessonTypeEnum.MODULE
+        for _ in range(min(TREE_FANOUT, nodes - created)):
+            created += 1
+            child = Lesson(
+                id=created, title=f"Lesson {created}", lesson_type=LessonTypeEnum.VIDEO,
+                file_path=f"videos/{created}.mp4"
+            )
+            parent.children.append(child)
+            modules.append(child)
+    return root
+
+
+def composite_render(nodes: int) -> Callable[[], str]:
+    root = lesson_tree(nodes)
+    return lambda: root.to_composite().render()
+
+
+def prerequisite_chain(length: int) -> Callable[[], bool]:
+    """
+    A chain of one handler per lesson of a course where every lesson requires the previous one,
+    evaluated for a student who completed all of them.
+    """
+    lessons = [
+        Lesson(id=index, title=f"Lesson {index}", lesson_type=LessonTypeEnum.TEXT,
+               prerequisite_id=index - 1 if index > 1 else None)
+        for index in range(1, length + 1)
+    ]
+    progress = {
+        lesson.id: LessonProgression(user_id=STUDENT_ID, lesson_id=lesson.id, completed=True) for lesson in lessons
+    }
+    head = handler = ConcreteLessonProgressHandler(lesson=lessons[-1])
+    for lesson in reversed(lessons[:-1]):
+        handler = handler.set_next(ConcreteLessonProgressHandler(lesson=lesson))
+    return lambda: head.handle(user_id=STUDENT_ID, user_progress=progress)
+
+
+def prototype_clone(children: int) -> Callable[[], Lesson]:
+    lesson = Lesson(
+        id=1, title="Module", description="A module", lesson_type=LessonTypeEnum.MODULE, course_id=1,
+        children=[
+            Lesson(id=index + 2, title=f"Lesson {index}", lesson_type=LessonTypeEnum.QUIZ, parent_id=1,
+                   course_id=1, quiz_data={"questions": [f"Question {index}"]})
+            for index in range(children)
+        ]
+    )
+    return lambda: LessonPrototype(lesson=lesson, new_course_id=2).clone()
+
+
+def strategy_dispatch(payment_type: PaymentTypeEnum) -> Callable[[], Dict[str, Any]]:
+    amount = Decimal("199.90")
+    return lambda: payment_strategies.process_payment(amount=amount, payment_type=payment_type)
+
+
+def strategy_quote() -> Callable[[], List[Dict[str, Any]]]:
+    price = Decimal("199.90")
+    return lambda: payment_strategies.quote(price)
+
+
+def observer_fan_out(subscribers: int) -> Callable[[], Any]:
+    """Attach `subscribers` students to a notification center and notify them, as a notification job batch does."""
+    metrics = DispatchMetrics()
+
+    async def fan_out():
+        notification_center = NotificationCenter(
+            max_concurrency=NOTIFICATION_DISPATCH_CONCURRENCY,
+            timeout=NOTIFICATION_DISPATCH_TIMEOUT,
+            retries=NOTIFICATION_DISPATCH_RETRIES,
+            backoff=NOTIFICATION_DISPATCH_BACKOFF,
+            metrics=metrics,
+        )
+        for student_id in range(subscribers):
+            notification_center.attach(StudentObserver(student_id))
+        return await notification_center.notify("New lesson available")
+
+    return fan_out
+
+
+def mediator_send(enrollments: int) -> Callable[[], Any]:
+    """
+    A student enrolled in `enrollments` courses posts in the last one. The DAOs and user manager are
+    in-memory stand-ins returning already loaded rows, so only the mediator's own work is measured.
+    """
+    courses = [Course(id=index, title=f"Course {index}", instructor_id=0) for index in range(1, enrollments + 1)]
+    payments = [
+        Payment(id=course.id, user_id=STUDENT_ID, course_id=course.id, payment_type=PaymentTypeEnum.PIX, course=course)
+        for course in courses
+    ]
+
+    async def get_course_by_id(course_id: int) -> Course:
+        return courses[course_id - 1]
+
+    async def get_my_courses(user_id: int) -> List[Payment]:
+        return payments
+
+    async def create_message(message_dict: Dict[str, Any]) -> Dict[str, Any]:
+        return message_dict
+
+    mediator = CourseChatMediator(
+        message_dao=SimpleNamespace(create_message=create_message),  # noqa
+        user_manager=SimpleNamespace(get_my_courses=get_my_courses),  # noqa
+        course_dao=SimpleNamespace(get_course_by_id=get_course_by_id),  # noqa
+    )
+    message = MessageCreate(content="Hello", course_id=enrollments)
+
+    async def send():
+        return await mediator.send_message(message, sender_id=STUDENT_ID)
+
+    return send
+
+
+CASES: List[Case] = [
+    *(Case(f"composite_render[{nodes}]", lambda nodes=nodes: composite_render(nodes),
+           f"Lesson.to_composite().render() of a {nodes}-lesson tree") for nodes in (10, 1_000, 100_000)),
+    *(Case(f"chain_evaluate[{length}]", lambda length=length: prerequisite_chain(length),
+           f"Prerequisite chain of {length} handlers, all completed") for length in (10, 100, 500)),
+    *(Case(f"prototype_clone[{children}]", lambda children=children: prototype_clone(children),
+           f"LessonPrototype.clone() of a module with {children} children") for children in (0, 10, 100)),
+    *(Case(f"strategy_dispatch[{payment_type.name}]", lambda payment_type=payment_type: strategy_dispatch(payment_type),
+           f"payment_strategies.process_payment() for {payment_type.name}") for payment_type in PaymentTypeEnum),
+    Case("strategy_quote", strategy_quote, "payment_strategies.quote() over every registered strategy"),
+    *(Case(f"observer_fan_out[{subscribers}]", lambda subscribers=subscribers: observer_fan_out(subscribers),
+           f"NotificationCenter attach and notify of {subscribers} students") for subscribers in (10, 1_000, 100_000)),
+    *(Case(f"mediator_send[{enrollments}]", lambda enrollments=enrollments: mediator_send(enrollments),
+           f"CourseChatMediator.send_message() by a student with {enrollments} courses") for enrollments in (1, 100)),
+]
+"""list: Every benchmark case, in report order."""
@@ -0,0 +1,106 @@
+"""
+Benchmark for the admin user search: seeds a user table, then times a prefix search with its count,
+a cached count, and walking pages by keyset against the same pages by offset.
+
+Run from the project root:
+    python -m benchmarks.user_search --users 1000000 --per-page 50
+
+Uses DATABASE_URL when set (point it at a throwaway MySQL schema for realistic numbers),
+otherwise a local SQLite file.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///./benchmark.db")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert  # noqa: E402
+
+from app.db.database import engine, async_session_maker, create_db_and_tables, UserDatabase  # noqa: E402
+from app.models import messages, notifications, works  # noqa: E402,F401  Registers the remaining mappers
+from app.models.users import User, UserManager, UserTypeEnum, user_counts  # noqa: E402
+
+SEED_CHUNK = 10_000
+"""int: Rows written per executemany INSERT while seeding."""
+
+FIRST_NAMES = ["Ada", "Alan", "Barbara", "Claude", "Donald", "Edsger", "Frances", "Grace", "John", "Ken"]
+"""list: First names cycled through by the seeded users."""
+
+
+async def seed(users: int) -> str:
+    """Write `users` users and return the email prefix they share."""
+    run_id = time.time_ns()
+    async with async_session_maker() as session:
+        for start in range(0, users, SEED_CHUNK):
+            now = datetime.now()
+            await session.execute(insert(User.__table__), [
+                {
+                    "email": f"bench-{run_id}-{n}@example.com", "hashed_password": "x",
+                    "is_active": n % 10 != 0, "is_superuser": False, "is_verified": False,
+                    "first_name": FIRST_NAMES[n % len(FIRST_NAMES)], "last_name": f"User{n}",
+                    "user_type": UserTypeEnum.INSTRUCTOR if n % 50 == 0 else UserTypeEnum.STUDENT,
+                    "created_at": now, "updated_at": now,
+                }
+                for n in range(start, min(start + SEED_CHUNK, users))
+            ])
+            await session.commit()
+    return f"bench-{run_id}"
+
+
+async def timed(label: str, coroutine) -> object:
+    """Await a coroutine and print how long it took."""
+    started = time.perf_counter()
+    result = await coroutine
+    print(f"{label}: {(time.perf_counter() - started) * 1000:.1f} ms")
+    return result
+
+
+async def main(users: int, per_page: int, pages: int) -> None:
+    await create_db_and_tables()
+    try:
+        started = time.perf_counter()
+        prefix = await seed(users)
+        print(f"seeded {users:,} users in {time.perf_counter() - started:.1f} s")
+
+        async with async_session_maker() as session:
+            manager = UserManager(UserDatabase(session, User))
+            await timed("search 'Gra' (first page)", manager.search_users(query="Gra", limit=per_page))
+            total = await timed("count 'Gra'", manager.count_users(query="Gra"))
+            await timed("count 'Gra' (cached)", manager.count_users(query="Gra"))
+            print(f"  {total:,} matches")
+            await timed("search email prefix", manager.search_users(query=prefix, limit=per_page))
+            await timed(
+                "active instructors (first page)",
+                manager.search_users(user_type=UserTypeEnum.INSTRUCTOR, is_active=True, limit=per_page)
+            )
+            user_counts.clear()
+            await timed("count all", manager.count_users())
+
+            offset = max(users - pages * per_page, 0)
+            started = time.perf_counter()
+            for page in range(pages):
+                await manager.search_users(offset=offset + page * per_page, limit=per_page)
+            print(f"{pages} deep pages by offset: {(time.perf_counter() - started) * 1000:.1f} ms")
+
+            after_id = (await manager.search_users(offset=offset - 1, limit=1))[0]["id"] if offset else None
+            started = time.perf_counter()
+            for _ in range(pages):
+                page_users = await manager.search_users(after_id=after_id, limit=per_page)
+                after_id = page_users[-1]["id"]
+            print(f"{pages} deep pages by keyset: {(time.perf_counter() - started) * 1000:.1f} ms")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--per-page", type=int, default=50)
+    parser.add_argument("--pages", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.per_page, args.pages))
@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+# The app reads its configuration at import time, so point it at a throwaway SQLite database first
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/test.db"
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("TRACE_SAMPLE_RATE", "0")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
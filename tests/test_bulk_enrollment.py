@@ -0,0 +1,73 @@
+import asyncio
+
+import httpx
+
+from app.main import app
+from app.db.database import engine, async_session_maker, create_db_and_tables
+from app.models.payments import Payment, PaymentTypeEnum
+from app.patterns.data_access_objects.payments_dao import PaymentDAO
+from app.schemas.payment_schemas import BULK_ENROLLMENT_MAX_ROWS
+
+
+async def register(client: httpx.AsyncClient, email: str, user_type: str) -> int:
+    response = await client.post("/auth/register", json={
+        "email": email, "password": "password123", "first_name": "Bulk", "last_name": "Enrollment",
+        "user_type": user_type,
+    })
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+async def login(client: httpx.AsyncClient, email: str) -> dict:
+    response = await client.post("/auth/jwt/login", data={"username": email, "password": "password123"})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def concurrent_enrollment_is_a_retryable_conflict(monkeypatch):
+    await create_db_and_tables()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        await register(client, "bulk-instructor@example.com", "I")
+        student_id = await register(client, "bulk-student@example.com", "S")
+        instructor = await login(client, "bulk-instructor@example.com")
+        response = await client.post("/courses/", headers=instructor, json={"title": "Bulk", "price": 90})
+        assert response.status_code == 200, response.text
+        course_id = response.json()["id"]
+        url = f"/payments/course/{course_id}/bulk"
+
+        too_many = [{"user_id": student_id, "payment_type": "P"}] * (BULK_ENROLLMENT_MAX_ROWS + 1)
+        response = await client.post(url, headers=instructor, json={"enrollments": too_many})
+        assert response.status_code == 422
+
+        # The student pays on their own between the validation and the insert of the bulk enrollment
+        get_paid_user_ids = PaymentDAO.get_paid_user_ids
+
+        async def paid_meanwhile(self, *args, **kwargs):
+            paid_ids = await get_paid_user_ids(self, *args, **kwargs)
+            monkeypatch.setattr(PaymentDAO, "get_paid_user_ids", get_paid_user_ids)
+            async with async_session_maker() as session:
+                session.add(Payment(
+                    user_id=student_id, course_id=course_id, payment_type=PaymentTypeEnum.PIX, amount=90, total=90
+                ))
+                await session.commit()
+            return paid_ids
+
+        monkeypatch.setattr(PaymentDAO, "get_paid_user_ids", paid_meanwhile)
+        rows = [{"user_id": student_id, "payment_type": "P"}]
+        response = await client.post(url, headers=instructor, json={"enrollments": rows})
+        assert response.status_code == 409, response.text
+
+        response = await client.post(url, headers=instructor, json={"enrollments": rows})
+        assert response.status_code == 200, response.text
+        assert response.json()["results"][0]["status"] == "already_enrolled"
+
+
+def test_concurrent_enrollment_is_a_retryable_conflict(monkeypatch):
+    async def scenario():
+        try:
+            await concurrent_enrollment_is_a_retryable_conflict(monkeypatch)
+        finally:
+            await engine.dispose()
+
+    asyncio.run(scenario())
@@ -0,0 +1,60 @@
+import asyncio
+
+import httpx
+
+from app.main import app
+from app.db.database import engine, create_db_and_tables
+
+
+async def register(client: httpx.AsyncClient, email: str, user_type: str) -> None:
+    response = await client.post("/auth/register", json={
+        "email": email, "password": "password123", "first_name": "Idempotent", "last_name": "Payment",
+        "user_type": user_type,
+    })
+    assert response.status_code == 201, response.text
+
+
+async def login(client: httpx.AsyncClient, email: str) -> dict:
+    response = await client.post("/auth/jwt/login", data={"username": email, "password": "password123"})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def retried_payment_replays_the_original_response():
+    await create_db_and_tables()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        await register(client, "idempotency-instructor@example.com", "I")
+        await register(client, "idempotency-student@example.com", "S")
+        instructor = await login(client, "idempotency-instructor@example.com")
+        student = await login(client, "idempotency-student@example.com")
+        response = await client.post("/courses/", headers=instructor, json={"title": "Idempotent", "price": 120})
+        assert response.status_code == 200, response.text
+        url = f"/payments/course/{response.json()['id']}"
+
+        headers = {**student, "Idempotency-Key": "checkout-1"}
+        first = await client.post(url, headers=headers, json={"payment_type": "C", "amount": 120})
+        assert first.status_code == 200, first.text
+
+        retry = await client.post(url, headers=headers, json={"payment_type": "C", "amount": 120})
+        assert retry.status_code == 200, retry.text
+        assert retry.json() == first.json()
+
+        response = await client.post(url, headers=headers, json={"payment_type": "P", "amount": 120})
+        assert response.status_code == 400, response.text
+        assert response.json()["detail"] == "This Idempotency-Key was already used for a different request"
+
+        # Without the key, the same request is a second payment and is refused
+        response = await client.post(url, headers=student, json={"payment_type": "C", "amount": 120})
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Payment for this course has already been made"
+
+
+def test_retried_payment_replays_the_original_response():
+    async def scenario():
+        try:
+            await retried_payment_replays_the_original_response()
+        finally:
+            await engine.dispose()
+
+    asyncio.run(scenario())
@@ -0,0 +1,56 @@
+import asyncio
+
+from sqlalchemy import update
+
+from app.db.database import engine, async_session_maker, create_db_and_tables
+from app.models.notifications import NotificationCounter
+from app.patterns.business_objects.notifications_bo import NotificationBO
+from app.patterns.data_access_objects.notifications_dao import NotificationDAO
+from app.patterns.data_access_objects.courses_dao import CourseDAO
+from app.patterns.data_access_objects.payments_dao import PaymentDAO
+
+RECIPIENT_ID = 9201
+
+
+async def drifted_counter_is_clamped_and_reconciled():
+    await create_db_and_tables()
+    async with async_session_maker() as session:
+        dao = NotificationDAO(session)
+        bo = NotificationBO(notification_dao=dao, payment_dao=PaymentDAO(session), course_dao=CourseDAO(session))
+        await dao.deliver_to_inbox([
+            {"recipient_id": RECIPIENT_ID, "recipient_type": "student", "message": f"Notification {i}"}
+            for i in range(3)
+        ])
+        inbox = await dao.get_inbox(RECIPIENT_ID)
+        assert (await dao.get_counter(RECIPIENT_ID)).unread_count == 3
+
+        counter = await dao.mark_read_up_to(RECIPIENT_ID, up_to_id=inbox[1].id)
+        assert counter.unread_count == 1
+
+        # A lost update left the counter behind its inbox: reading never takes it below zero
+        await session.execute(
+            update(NotificationCounter).where(NotificationCounter.recipient_id == RECIPIENT_ID).values(unread_count=0)
+        )
+        await session.commit()
+        counter = await dao.mark_read_up_to(RECIPIENT_ID, up_to_id=inbox[0].id)
+        assert counter.unread_count == 0
+
+        await session.execute(
+            update(NotificationCounter).where(NotificationCounter.recipient_id == RECIPIENT_ID).values(unread_count=5)
+        )
+        await session.commit()
+        assert await bo.reconcile_counters(batch_size=2) >= 1
+        counter = await dao.get_counter(RECIPIENT_ID)
+        await session.refresh(counter)
+        assert counter.unread_count == 0
+        assert await bo.reconcile_counters(batch_size=2) == 0
+
+
+def test_drifted_counter_is_clamped_and_reconciled():
+    async def scenario():
+        try:
+            await drifted_counter_is_clamped_and_reconciled()
+        finally:
+            await engine.dispose()
+
+    asyncio.run(scenario())
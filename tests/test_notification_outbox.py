@@ -0,0 +1,99 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+
+from app.db.database import engine, async_session_maker, create_db_and_tables
+from app.models.notifications import NotificationOutbox, OutboxStatusEnum
+from app.patterns.business_objects import notifications_bo
+from app.patterns.business_objects.notifications_bo import NotificationBO
+from app.patterns.data_access_objects.notifications_dao import NotificationDAO
+from app.patterns.data_access_objects.courses_dao import CourseDAO
+from app.patterns.data_access_objects.payments_dao import PaymentDAO
+from app.patterns.observer import StudentObserver
+
+
+def notification_bo(session) -> NotificationBO:
+    return NotificationBO(
+        notification_dao=NotificationDAO(session),
+        payment_dao=PaymentDAO(session),
+        course_dao=CourseDAO(session),
+    )
+
+
+async def failed_entry_is_retried_after_a_backoff():
+    await create_db_and_tables()
+    async with async_session_maker() as session:
+        bo = notification_bo(session)
+        entry = await bo.notification_dao.create_outbox_entry({
+            "message": "Unreachable", "recipient_type": "student", "recipient_id": 9001, "course_id": 9001,
+        })
+        entry_id = entry.id
+
+        started = datetime.now()
+        assert await bo.process_next_outbox_entry(batch_size=10) is False
+
+        entry = await bo.notification_dao.get_outbox_entry(entry_id)
+        assert entry.status == OutboxStatusEnum.PENDING
+        assert entry.attempts == 1
+        assert entry.last_error
+        assert entry.available_at >= started + timedelta(seconds=bo.retry_backoff(1))
+
+        # Still backing off: nothing to claim, so a worker goes back to sleep instead of spinning
+        assert await bo.notification_dao.claim_next_outbox_entry() is None
+        assert bo.retry_backoff(2) == 2 * bo.retry_backoff(1)
+
+        await session.execute(
+            update(NotificationOutbox).where(NotificationOutbox.id == entry_id).values(available_at=None)
+        )
+        await session.commit()
+        assert await bo.process_next_outbox_entry(batch_size=10) is False
+        entry = await bo.notification_dao.get_outbox_entry(entry_id)
+        assert entry.attempts == 2
+
+
+async def stale_processing_entry_is_requeued():
+    await create_db_and_tables()
+    async with async_session_maker() as session:
+        bo = notification_bo(session)
+        entry = await bo.notification_dao.create_outbox_entry({
+            "message": "Abandoned", "recipient_type": "student", "recipient_id": 9002, "course_id": 9002,
+        })
+        entry_id = entry.id
+        await session.execute(
+            update(NotificationOutbox)
+            .where(NotificationOutbox.id == entry_id)
+            .values(status=OutboxStatusEnum.PROCESSING, updated_at=datetime.now() - timedelta(minutes=10))
+        )
+        await session.commit()
+
+        assert await bo.requeue_stale_entries(stale_after=60) == 1
+        entry = await bo.notification_dao.get_outbox_entry(entry_id)
+        await session.refresh(entry)
+        assert entry.status == OutboxStatusEnum.PENDING
+
+
+def test_failed_entry_is_retried_after_a_backoff(monkeypatch):
+    async def unreachable(self, message):
+        raise ConnectionError("Inbox unreachable")
+
+    monkeypatch.setattr(StudentObserver, "update", unreachable)
+    monkeypatch.setattr(notifications_bo, "NOTIFICATION_DISPATCH_RETRIES", 0)
+
+    async def scenario():
+        try:
+            await failed_entry_is_retried_after_a_backoff()
+        finally:
+            await engine.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_stale_processing_entry_is_requeued():
+    async def scenario():
+        try:
+            await stale_processing_entry_is_requeued()
+        finally:
+            await engine.dispose()
+
+    asyncio.run(scenario())
@@ -0,0 +1,88 @@
+import asyncio
+
+import httpx
+import pytest
+from sqlalchemy import update
+
+from app.main import app
+from app.db.database import engine, async_session_maker, create_db_and_tables
+from app.models import users
+from app.models.users import User
+from app.utils import cache, principals
+from app.utils.principals import LocalPrincipalCache, create_principal_cache
+
+
+async def register(client: httpx.AsyncClient, email: str, superuser: bool = False) -> int:
+    response = await client.post("/auth/register", json={
+        "email": email, "password": "password123", "first_name": "Cached", "last_name": "Principal", "user_type": "S",
+    })
+    assert response.status_code == 201, response.text
+    user_id = response.json()["id"]
+    if superuser:
+        async with async_session_maker() as session:
+            await session.execute(update(User).where(User.id == user_id).values(is_superuser=True))
+            await session.commit()
+    return user_id
+
+
+async def login(client: httpx.AsyncClient, email: str) -> dict:
+    response = await client.post("/auth/jwt/login", data={"username": email, "password": "password123"})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def role_changes_are_enforced_on_every_worker(monkeypatch):
+    # Two worker processes, each with the cache they are allowed to run with when no shared cache is configured
+    worker_a = LocalPrincipalCache(maxsize=0, ttl=30)
+    worker_b = LocalPrincipalCache(maxsize=0, ttl=30)
+
+    await create_db_and_tables()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        student_id = await register(client, "principal-student@example.com")
+        staff_id = await register(client, "principal-staff@example.com", superuser=True)
+        await register(client, "principal-admin@example.com", superuser=True)
+        student = await login(client, "principal-student@example.com")
+        staff = await login(client, "principal-staff@example.com")
+        admin = await login(client, "principal-admin@example.com")
+
+        monkeypatch.setattr(users, "principal_cache", worker_b)
+        assert (await client.get("/notifications/unread-count", headers=student)).status_code == 200
+        assert (await client.get("/notifications/unread-count", headers=staff)).status_code == 200
+
+        monkeypatch.setattr(users, "principal_cache", worker_a)
+        names = {"first_name": "Cached", "last_name": "Principal"}
+        response = await client.patch(f"/my-data/{student_id}", headers=admin, json={**names, "is_active": False})
+        assert response.status_code == 200, response.text
+        response = await client.patch(f"/my-data/{staff_id}", headers=admin, json={**names, "is_superuser": False})
+        assert response.status_code == 200, response.text
+
+        monkeypatch.setattr(users, "principal_cache", worker_b)
+        assert (await client.get("/notifications/unread-count", headers=student)).status_code == 401
+        assert (await client.get("/notifications/unread-count", headers=staff)).status_code == 401
+        assert (await client.get("/notifications/unread-count", headers=admin)).status_code == 200
+
+        staff = await login(client, "principal-staff@example.com")
+        assert (await client.get("/notifications/unread-count", headers=staff)).status_code == 200
+
+
+def test_role_changes_are_enforced_on_every_worker(monkeypatch):
+    async def scenario():
+        try:
+            await role_changes_are_enforced_on_every_worker(monkeypatch)
+        finally:
+            await engine.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_per_process_cache_is_refused_with_several_workers(monkeypatch):
+    monkeypatch.setattr(principals, "WEB_CONCURRENCY", 4)
+    monkeypatch.setattr(principals, "PRINCIPAL_CACHE_URL", None)
+    monkeypatch.setitem(cache.caches, "principals", users.principal_cache)
+
+    with pytest.raises(RuntimeError):
+        create_principal_cache(loads=dict)
+
+    monkeypatch.setattr(principals, "PRINCIPAL_CACHE_SIZE", 0)
+    assert isinstance(create_principal_cache(loads=dict), LocalPrincipalCache)
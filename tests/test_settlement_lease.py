@@ -0,0 +1,71 @@
+import asyncio
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import insert, select, func
+
+from app.db.database import engine, async_session_maker, create_db_and_tables
+from app.models.payments import PaymentInstallment, InstallmentStatusEnum
+from app.patterns.business_objects.installments_bo import InstallmentBO
+from app.patterns.data_access_objects.installments_dao import InstallmentDAO
+from app.utils.exceptions import ConflictError
+
+
+async def seed_due_installments(count: int):
+    now = datetime.now()
+    async with async_session_maker() as session:
+        await session.execute(insert(PaymentInstallment.__table__), [
+            {
+                "payment_id": 9100 + number, "number": 1, "amount": 100, "due_date": date.today(),
+                "status": InstallmentStatusEnum.PENDING, "created_at": now, "updated_at": now,
+            }
+            for number in range(count)
+        ])
+        await session.commit()
+
+
+async def count_due_installments() -> int:
+    async with async_session_maker() as session:
+        return await session.scalar(select(func.count()).where(
+            PaymentInstallment.status == InstallmentStatusEnum.PENDING, PaymentInstallment.due_date <= date.today()
+        ))
+
+
+async def lost_lease_stops_the_old_holder():
+    await create_db_and_tables()
+    await seed_due_installments(4)
+    due = await count_due_installments()
+
+    async with async_session_maker() as first, async_session_maker() as second:
+        first_bo, second_bo = InstallmentBO(InstallmentDAO(first)), InstallmentBO(InstallmentDAO(second))
+
+        run = await first_bo.open_settlement_run(date.today(), owner="worker-a", lease_seconds=300)
+        run_id = run.id
+        with pytest.raises(ConflictError):
+            await second_bo.open_settlement_run(date.today(), owner="worker-b", lease_seconds=300)
+
+        # worker-a stops checkpointing, so its lease expires and worker-b takes the run over
+        await asyncio.sleep(0.01)
+        taken_over = await second_bo.open_settlement_run(date.today(), owner="worker-b", lease_seconds=0)
+        assert taken_over.id == run_id
+
+        stale = await first_bo.settle(run_id, batch_size=2, owner="worker-a")
+        assert stale.owner == "worker-b"
+        assert stale.settled == 0
+        assert stale.finished_at is None
+
+        done = await second_bo.settle(run_id, batch_size=2, owner="worker-b")
+        assert done.settled == due
+        assert await count_due_installments() == 0
+        assert done.finished_at is not None
+        assert done.owner is None
+
+
+def test_lost_lease_stops_the_old_holder():
+    async def scenario():
+        try:
+            await lost_lease_stops_the_old_holder()
+        finally:
+            await engine.dispose()
+
+    asyncio.run(scenario())
@@ -0,0 +1,48 @@
+import asyncio
+
+import httpx
+
+from app.main import app
+from app.db.database import engine, create_db_and_tables
+
+
+async def login(client: httpx.AsyncClient, email: str, password: str) -> dict:
+    response = await client.post("/auth/jwt/login", data={"username": email, "password": password})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def password_change_revokes_tokens_on_my_data_routes():
+    await create_db_and_tables()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post("/auth/register", json={
+            "email": "revoked@example.com", "password": "password123",
+            "first_name": "Old", "last_name": "Token", "user_type": "S",
+        })
+        assert response.status_code == 201, response.text
+        old_headers = await login(client, "revoked@example.com", "password123")
+        assert (await client.get("/my-data/me", headers=old_headers)).status_code == 200
+
+        names = {"first_name": "Old", "last_name": "Token"}
+        response = await client.patch("/my-data/me", headers=old_headers, json={**names, "password": "password456"})
+        assert response.status_code == 200, response.text
+
+        assert (await client.get("/my-data/me", headers=old_headers)).status_code == 401
+        response = await client.patch(
+            "/my-data/me", headers=old_headers, json={**names, "email": "stolen@example.com"}
+        )
+        assert response.status_code == 401
+
+        new_headers = await login(client, "revoked@example.com", "password456")
+        assert (await client.get("/my-data/me", headers=new_headers)).status_code == 200
+
+
+def test_password_change_revokes_tokens_on_my_data_routes():
+    async def scenario():
+        try:
+            await password_change_revokes_tokens_on_my_data_routes()
+        finally:
+            await engine.dispose()
+
+    asyncio.run(scenario())